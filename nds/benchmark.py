@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark cho romwad_2way_tool.py / gxt2txt.py trên dữ liệu giả lập (synthetic).
+
+  python benchmark.py --size-mb 64 --blocks 300
+  python benchmark.py --size-mb 16 --str-len 0:400 --len-dist exp --pad-ratio 0.5 --json bench.json
+  python benchmark.py --only scan,parse_gxt,import --compare bench.json --tolerance 0.2
+  python benchmark.py --gxt-dir ../GXT            (thêm benchmark gxt2txt trên TXT thật)
+  python benchmark.py --only gxt2txt --gxt-dir ../GXT
+
+Dữ liệu sinh ra (trong thư mục tạm, theo --seed):
+  - ROM.WAD giả: rác xen kẽ các DS_GXT (align 0x200, đệm 0xAD), thêm chữ ký DS_GXT giả.
+    --blocks số DS_GXT, --str-len MIN:MAX + --len-dist uniform|exp độ dài string,
+    --pad-ratio phần đệm 0xAD sau mỗi DS_GXT so với kích thước của nó (mặc định: 0 hoặc 0x200 ngẫu nhiên).
+  - --gxt-files file .gxt (gxt2txt) và 1 font BIN kiểu CBinFile (glyph 0x20..).
+
+Mỗi benchmark chạy trong 1 process riêng (đo được peak RSS của riêng nó), lấy thời gian tốt nhất
+của --repeat lần. --json ghi kết quả; --compare so với file JSON cũ và trả mã thoát 1 nếu benchmark
+nào chậm hơn quá --tolerance (peak RSS tăng quá --tolerance cũng tính là chậm).
+"""
+
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import struct
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import romwad_2way_tool as rw
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# codepoint hay gặp: A-Z, a-z (0x5C..0x75), space, ~n~, tag 0xFFxx, chữ Việt
+_CP_POOL = (
+    list(range(0x41, 0x5B)) + list(range(0x5C, 0x76)) * 3 + [0x20] * 8 +
+    [0x0A, 0x2E, 0x2C, 0x21, 0xFF00, 0xFF0C, 0x1EA1, 0x1EC7, 0x00E0, 0x0111]
+)
+
+# =======================
+#  Sinh dữ liệu
+# =======================
+def _str_len(rng: random.Random, min_len: int, max_len: int, dist: str) -> int:
+    if dist == "exp":
+        # nhiều string ngắn, ít string dài (giống text nhiệm vụ / hội thoại)
+        mean = max((max_len - min_len) / 4, 1)
+        return min(max_len, min_len + int(rng.expovariate(1 / mean)))
+    return rng.randint(min_len, max_len)
+
+def make_gxt(rng: random.Random, num: int, max_len: int = 80, min_len: int = 0, dist: str = "uniform") -> bytes:
+    out = bytearray(rw.SIG + struct.pack("<H", num))
+    for i in range(num):
+        cps = [rng.choice(_CP_POOL) for _ in range(_str_len(rng, min_len, max_len, dist))]
+        if i == num - 1:
+            cps.append(0)
+        out += struct.pack(f"<H{len(cps)}H", len(cps), *cps)
+    return bytes(out)
+
+def make_wad(size: int, blocks: int, seed: int = 0, str_len: tuple[int, int] = (0, 80),
+             len_dist: str = "uniform", pad_ratio: float | None = None) -> bytes:
+    """
+    WAD giả: dữ liệu rác xen kẽ các DS_GXT (align 0x200, đệm 0xAD phía sau),
+    thêm vài chữ ký DS_GXT giả để scanner phải loại bỏ.
+    pad_ratio: đệm 0xAD ~ pad_ratio * kích thước DS_GXT; None: thêm 0 hoặc 0x200 ngẫu nhiên.
+    """
+    rng = random.Random(seed)
+    gap = max(size // max(blocks, 1), rw.ALIGN)
+    wad = bytearray()
+    for b in range(blocks):
+        wad += rng.randbytes(rng.randint(gap // 2, gap))
+        if b % 5 == 0:
+            wad += rw.SIG + b"\xff\xff"
+        wad += b"\x00" * (-len(wad) % rw.ALIGN)
+        gxt = make_gxt(rng, rng.randint(1, 200), str_len[1], str_len[0], len_dist)
+        wad += gxt
+        extra = rng.choice((0, rw.ALIGN)) if pad_ratio is None else rw.align_up(int(len(gxt) * pad_ratio))
+        wad += bytes([rw.PAD_BYTE]) * (-len(wad) % rw.ALIGN + extra)
+        wad += b"\x01"
+    if len(wad) < size:
+        wad += rng.randbytes(size - len(wad))
+    return bytes(wad)
+
+def make_gxt_files(out_dir: Path, files: int, seed: int = 0, str_len: tuple[int, int] = (0, 80),
+                   len_dist: str = "uniform") -> list[Path]:
+    """File .gxt cho gxt2txt (cùng định dạng DS_GXT)."""
+    rng = random.Random(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(files):
+        path = out_dir / f"B{i:04d}.gxt"
+        path.write_bytes(make_gxt(rng, rng.randint(1, 200), str_len[1], str_len[0], len_dist))
+        paths.append(path)
+    return paths
+
+def make_font_bin(path: Path, glyphs: int = 0x60 + 0x1E0, height: int = 12, seed: int = 0) -> Path:
+    """Font BIN kiểu CBinFile: u16 số glyph, u16 chiều cao, (width, x, y) u16 mỗi glyph."""
+    rng = random.Random(seed)
+    out = bytearray(struct.pack("<HH", glyphs, height))
+    for i in range(glyphs):
+        out += struct.pack("<HHH", rng.randint(3, height), (i % 16) * height, (i // 16) * height)
+    path.write_bytes(out)
+    return path
+
+# =======================
+#  Benchmark
+# =======================
+def _timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def peak_rss_kb() -> int | None:
+    """Peak RSS của process hiện tại (KiB); None nếu không đo được (Windows)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+def _mb(n: int) -> float:
+    return n / (1024 * 1024)
+
+def _result(name: str, secs: float, nbytes: int | None = None, items: int | None = None, **extra) -> dict:
+    r = {"name": name, "seconds": secs}
+    if nbytes is not None:
+        r["mb_per_s"] = _mb(nbytes) / secs
+    if items is not None:
+        r["items"] = items
+        r["items_per_s"] = items / secs
+    r.update(extra)
+    return r
+
+def bench_scan(wad: bytes, repeat: int = 3) -> dict:
+    secs = _timeit(lambda: rw.scan_gxt_offsets(wad), repeat)
+    return _result("scan_gxt_offsets", secs, len(wad), blocks=len(rw.scan_gxt_offsets(wad)))
+
+def _blocks(wad: bytes) -> list[tuple[int, int]]:
+    return rw.scan_gxt_blocks(wad)
+
+def bench_parse(wad: bytes, repeat: int = 3) -> dict:
+    blocks = _blocks(wad)
+    secs = _timeit(lambda: [rw.parse_gxt(wad, off, packed=True) for off, _ in blocks], repeat)
+    strings = sum(rw.parse_gxt(wad, off, packed=True)["num"] for off, _ in blocks)
+    return _result("parse_gxt", secs, sum(end - off for off, end in blocks), strings)
+
+def _all_strings(wad: bytes) -> list:
+    return [rw.parse_gxt(wad, off, packed=True)["cps"] for off, _ in _blocks(wad)]
+
+def bench_build(wad: bytes, repeat: int = 3) -> dict:
+    blocks = [list(s) for s in _all_strings(wad)]
+    secs = _timeit(lambda: [rw.build_gxt(s) for s in blocks], repeat)
+    return _result("build_gxt", secs, sum(len(rw.build_gxt(s)) for s in blocks), sum(map(len, blocks)))
+
+def _all_texts(wad: bytes) -> list[str]:
+    texts = []
+    for strings in _all_strings(wad):
+        texts += [rw.string_to_txt(cps, i == len(strings) - 1) for i, cps in enumerate(strings)]
+    return texts
+
+def bench_encode(wad: bytes, repeat: int = 3) -> list[dict]:
+    texts = _all_texts(wad)
+    nbytes = sum(len(t.encode("utf-8")) for t in texts)
+    return [
+        _result("encode_text_to_symbols", _timeit(lambda: [rw.encode_text_to_symbols(t) for t in texts], repeat),
+                nbytes, len(texts)),
+        _result("encode_text_to_units", _timeit(lambda: [rw.encode_text_to_units(t) for t in texts], repeat),
+                nbytes, len(texts)),
+    ]
+
+def bench_write_txt(wad: bytes, repeat: int = 3) -> dict:
+    blocks = _blocks(wad)
+    with tempfile.TemporaryDirectory() as tmp:
+        def run():
+            for i, (off, end) in enumerate(blocks):
+                rw.write_txt(Path(tmp) / f"{i:04d}.txt", i, off, end, end, rw.parse_gxt(wad, off, packed=True)["cps"])
+        secs = _timeit(run, repeat)
+        nbytes = sum(p.stat().st_size for p in Path(tmp).iterdir())
+    return _result("write_txt", secs, nbytes, len(blocks))
+
+def bench_export(wad_path: Path, repeat: int = 3, jobs: int = 1) -> dict:
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        secs = _timeit(lambda: rw.export_rom_wad(str(wad_path), tmp, jobs=jobs), repeat)
+        blocks = len(json.loads((Path(tmp) / "_manifest.json").read_text(encoding="utf-8")))
+        rw.shutdown_pool()
+    return _result("export_rom_wad", secs, wad_path.stat().st_size, blocks, jobs=jobs)
+
+def bench_import(wad_path: Path, repeat: int = 3, jobs: int = 1) -> dict:
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        txt_dir, out = Path(tmp) / "txt", Path(tmp) / "rom_nw.wad"
+        rw.export_rom_wad(str(wad_path), str(txt_dir), jobs=jobs)
+        secs = _timeit(lambda: rw.import_rom_wad(str(wad_path), str(txt_dir), str(out), jobs=jobs,
+                                                 incremental=False), repeat)
+        blocks = len(json.loads((txt_dir / "_manifest.json").read_text(encoding="utf-8")))
+        rw.shutdown_pool()
+    return _result("import_rom_wad", secs, wad_path.stat().st_size, blocks, jobs=jobs)
+
+def bench_gxt_files(gxt_dir: Path, repeat: int = 3) -> list[dict]:
+    """CGXTFile.read / write_to_text_file (gxt2txt.py) trên các .gxt giả."""
+    import gxt2txt
+
+    gxt2txt.show_warn_message = False
+    gxts = sorted(str(p) for p in gxt_dir.glob("*.gxt"))
+    nbytes = sum(os.path.getsize(f) for f in gxts)
+    files = [gxt2txt.CGXTFile(f) for f in gxts]
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "out.txt")
+        return [
+            _result("CGXTFile.read", _timeit(lambda: [gxt2txt.CGXTFile().read(f) for f in gxts], repeat),
+                    nbytes, len(gxts)),
+            _result("CGXTFile.write_to_text_file", _timeit(lambda: [g.write_to_text_file(out) for g in files], repeat),
+                    nbytes, len(files)),
+        ]
+
+def bench_font(font_path: Path, wad: bytes, repeat: int = 3) -> list[dict]:
+    """CBinFile.read (gxt2txt.py) + text_width: load_font và đo độ rộng mọi string."""
+    import gxt2txt
+    import text_width
+
+    texts = _all_texts(wad)
+    font = text_width.load_font(font_path)
+    return [
+        _result("CBinFile.read", _timeit(lambda: gxt2txt.CBinFile(str(font_path)), repeat),
+                font_path.stat().st_size, 1),
+        _result("text_width.load_font", _timeit(lambda: text_width.load_font(font_path), repeat),
+                font_path.stat().st_size, 1),
+        _result("text_width.check_text", _timeit(lambda: [text_width.check_text(t, font, 240) for t in texts], repeat),
+                sum(len(t.encode("utf-8")) for t in texts), len(texts)),
+    ]
+
+def baseline_read_gxt(path: str) -> list[str]:
+    """Đường đọc .gxt cũ của CGXTFile.read: 1 read() cho độ dài + 1 read() cho mỗi string."""
+    with open(path, "rb") as f:
+        _, num = struct.unpack("<6sH", f.read(8))
+        strings = []
+        for _ in range(num):
+            n = struct.unpack("<H", f.read(2))[0]
+            strings.append(f.read(n * 2).decode("utf-16-le"))
+    return strings
+
+def baseline_read_text_lines(path: str) -> list[str]:
+    """
+    Đường đọc TXT cũ của read_from_text_file (read_whole_line): 1 read() + os.path.getsize cho mỗi
+    ký tự UTF-16. Bản cũ mở file ở chế độ text rồi gọi .decode() nên không chạy được nguyên trạng;
+    ở đây giữ nguyên cách đọc từng ký tự nhưng trên file nhị phân.
+    """
+    lines = []
+    with open(path, "rb") as f:
+        if f.read(2) != b"\xff\xfe":
+            f.seek(0)
+        while f.tell() < os.path.getsize(path):
+            line = ""
+            while True:
+                ch = f.read(2).decode("utf-16-le", errors="ignore")
+                if not ch or ch in "\r\n":
+                    break
+                line += ch
+            if ch == "\r":
+                f.read(2)
+            if not line.startswith(";;;"):
+                lines.append(line)
+    return lines
+
+def bench_gxt2txt(gxt_dir: str, repeat: int = 3) -> list[dict]:
+    """
+    Đọc mọi *.txt (định dạng GXT của gxt2txt) trong gxt_dir, ghi ra .gxt tạm,
+    rồi đo read_from_text_file và CGXTFile.read trên toàn bộ, so với đường đọc cũ
+    (baseline_read_text_lines / baseline_read_gxt, kết quả "*.baseline", "speedup" = baseline / mới).
+    Tên kết quả có tiền tố "gxt2txt." để không trùng với bench_gxt_files.
+    """
+    import gxt2txt
+
+    gxt2txt.show_warn_message = False
+    txts = sorted(Path(gxt_dir).glob("*.txt"))
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        gxts = []
+        for t in txts:
+            g = gxt2txt.CGXTFile()
+            if g.read_from_text_file(str(t)):
+                gxts.append(str(Path(tmp) / (t.stem + ".gxt")))
+                g.write(gxts[-1])
+
+        txt_files = [str(t) for t in txts]
+        for name, files, fn, baseline in (
+            ("gxt2txt.read_from_text_file", txt_files, lambda f: gxt2txt.CGXTFile().read_from_text_file(f),
+             baseline_read_text_lines),
+            ("gxt2txt.CGXTFile.read", gxts, lambda f: gxt2txt.CGXTFile().read(f), baseline_read_gxt),
+        ):
+            mb = sum(Path(f).stat().st_size for f in files) / (1024 * 1024)
+            base = _timeit(lambda: [baseline(f) for f in files], repeat)
+            secs = _timeit(lambda: [fn(f) for f in files], repeat)
+            results.append({"name": name, "files": len(files), "seconds": secs, "mb_per_s": mb / secs,
+                            "speedup": base / secs})
+            results.append({"name": name + ".baseline", "files": len(files), "seconds": base, "mb_per_s": mb / base})
+    return results
+
+# tên -> hàm chạy trong process con: fn(paths, repeat, jobs) -> list[dict]
+BENCHES = {
+    "scan": lambda p, r, j: [bench_scan(p["wad"].read_bytes(), r)],
+    "parse_gxt": lambda p, r, j: [bench_parse(p["wad"].read_bytes(), r)],
+    "build_gxt": lambda p, r, j: [bench_build(p["wad"].read_bytes(), r)],
+    "encode": lambda p, r, j: bench_encode(p["wad"].read_bytes(), r),
+    "write_txt": lambda p, r, j: [bench_write_txt(p["wad"].read_bytes(), r)],
+    "export": lambda p, r, j: [bench_export(p["wad"], r, j)],
+    "import": lambda p, r, j: [bench_import(p["wad"], r, j)],
+    "gxt_files": lambda p, r, j: bench_gxt_files(p["gxt_dir"], r),
+    "font": lambda p, r, j: bench_font(p["font"], p["wad"].read_bytes(), r),
+    # dữ liệu thật, chỉ chạy khi có --gxt-dir
+    "gxt2txt": lambda p, r, j: bench_gxt2txt(p["gxt_txt"], r),
+}
+
+def _run_in_child(name: str, paths: dict, repeat: int, jobs: int) -> list[dict]:
+    base = peak_rss_kb()
+    results = BENCHES[name](paths, repeat, jobs)
+    peak = peak_rss_kb()
+    for r in results:
+        r["bench"] = name
+        r["peak_rss_kb"] = peak
+        r["rss_base_kb"] = base
+    return results
+
+def run_benches(names: list[str], paths: dict, repeat: int = 3, jobs: int = 1) -> list[dict]:
+    """Mỗi benchmark 1 process mới (spawn) => peak RSS không bị benchmark trước đẩy lên."""
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for name in names:
+        with ProcessPoolExecutor(1, mp_context=ctx) as ex:
+            results += ex.submit(_run_in_child, name, paths, repeat, jobs).result()
+    return results
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Các benchmark chậm hơn (hoặc tốn RSS hơn) baseline quá tolerance."""
+    old = {r["name"]: r for r in baseline}
+    slower = []
+    for r in results:
+        b = old.get(r["name"])
+        if b is None:
+            continue
+        if r["seconds"] > b["seconds"] * (1 + tolerance):
+            slower.append(f"{r['name']}: {b['seconds']*1000:.1f} -> {r['seconds']*1000:.1f} ms")
+        if r.get("peak_rss_kb") and b.get("peak_rss_kb") and r["peak_rss_kb"] > b["peak_rss_kb"] * (1 + tolerance):
+            slower.append(f"{r['name']}: peak RSS {b['peak_rss_kb']} -> {r['peak_rss_kb']} KiB")
+    return slower
+
+def print_result(r: dict):
+    parts = [f"{r['seconds']*1000:9.1f} ms"]
+    if "mb_per_s" in r:
+        parts.append(f"{r['mb_per_s']:8.1f} MB/s")
+    if "items_per_s" in r:
+        parts.append(f"{r['items_per_s']:10.0f}/s")
+    if "speedup" in r:
+        parts.append(f"x{r['speedup']:.1f} so với baseline")
+    if r.get("peak_rss_kb"):
+        parts.append(f"peak RSS {r['peak_rss_kb'] / 1024:.0f} MiB")
+    print(f"{r['name']:<36} " + "  ".join(parts))
+
+def _len_range(s: str) -> tuple[int, int]:
+    a, b = s.split(":")
+    return int(a), int(b)
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark ROM.WAD <-> TXT tool")
+    ap.add_argument("--size-mb", type=int, default=64)
+    ap.add_argument("--blocks", type=int, default=300)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--str-len", type=_len_range, default=(0, 80), metavar="MIN:MAX", help="độ dài string (unit u16)")
+    ap.add_argument("--len-dist", choices=("uniform", "exp"), default="uniform", help="phân bố độ dài string")
+    ap.add_argument("--pad-ratio", type=float, help="đệm 0xAD sau mỗi DS_GXT = tỉ lệ x kích thước DS_GXT")
+    ap.add_argument("--gxt-files", type=int, default=200, help="số file .gxt giả cho gxt2txt")
+    ap.add_argument("--jobs", "-j", type=int, default=1, help="--jobs cho export / import")
+    ap.add_argument("--only", help=f"chỉ chạy các benchmark (phân cách bằng dấu phẩy): {','.join(BENCHES)}")
+    ap.add_argument("--json", help="ghi kết quả ra file JSON")
+    ap.add_argument("--compare", help="file JSON cũ để so sánh")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="mức chậm hơn cho phép khi --compare (mặc định 0.2)")
+    ap.add_argument("--gxt-dir", help="thư mục TXT của gxt2txt (vd ../GXT), bật benchmark gxt2txt")
+    args = ap.parse_args()
+
+    names = args.only.split(",") if args.only else [n for n in BENCHES if n != "gxt2txt" or args.gxt_dir]
+    unknown = [n for n in names if n not in BENCHES]
+    if unknown:
+        ap.error(f"benchmark không có: {', '.join(unknown)}")
+    if "gxt2txt" in names and not args.gxt_dir:
+        ap.error("benchmark gxt2txt cần --gxt-dir")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        paths = {"wad": tmp / "ROM.WAD", "gxt_dir": tmp / "gxt", "font": tmp / "font.bin", "gxt_txt": args.gxt_dir}
+        t0 = time.perf_counter()
+        paths["wad"].write_bytes(make_wad(args.size_mb * 1024 * 1024, args.blocks, args.seed,
+                                          args.str_len, args.len_dist, args.pad_ratio))
+        make_gxt_files(paths["gxt_dir"], args.gxt_files, args.seed, args.str_len, args.len_dist)
+        make_font_bin(paths["font"], seed=args.seed)
+        print(f"[OK] Sinh dữ liệu: {time.perf_counter() - t0:.1f}s")
+        results = run_benches(names, paths, args.repeat, args.jobs)
+
+    for r in results:
+        print_result(r)
+
+    report = {
+        # qua json 1 lần để tuple -> list, so được với params của baseline
+        "params": json.loads(json.dumps({k: v for k, v in vars(args).items() if k not in ("json", "compare", "only")})),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=1), encoding="utf-8")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if baseline.get("params") != report["params"]:
+            print("[~] Tham số khác với baseline, so sánh chỉ mang tính tham khảo")
+        slower = compare(results, baseline["results"], args.tolerance)
+        for s in slower:
+            print(f"[!] Chậm hơn: {s}")
+        sys.exit(1 if slower else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+DS_GXT codec shared by gxt2txt.py (PSP .gxt files) and romwad_2way_tool.py (blocks inside ROM.WAD).
+
+  "DS_GXT", u16 string count, then per string: u16 length in UTF-16 units + the units (LE).
+  The last string carries a terminating null that is counted in its length.
+
+read() walks the length prefixes once, copies the string area into one array('H') and only
+records where each string starts; strings are sliced out (or decoded to str) on access.
+Works on bytes, bytearray, memoryview and mmap. build() takes the strings WITHOUT the last
+terminator (GxtStrings.string() / text() strip it) and adds it back, so read -> build is exact.
+A DS_GXT with no strings has no terminator (ROM.WAD blocks); gxt2txt's .gxt files always end
+with one, build(..., terminate_empty=True) writes it.
+"""
+
+import struct
+import sys
+from array import array
+from typing import Optional, Sequence, Tuple, Union
+
+SIG = b"DS_GXT"
+HEADER = struct.Struct("<6sH")
+LENGTH = struct.Struct("<H")
+
+_LE = sys.byteorder == "little"
+_NULL = b"\0\0"
+
+def units_from_bytes(b) -> array:
+    """ UTF-16LE / u16 LE bytes -> array('H') """
+    units = array("H")
+    units.frombytes(b)
+    if not _LE:
+        units.byteswap()
+    return units
+
+def units_to_bytes(units: array) -> bytes:
+    if not _LE:
+        units = array("H", units)
+        units.byteswap()
+    return units.tobytes()
+
+def units_to_str(units, errors: str = "surrogatepass") -> str:
+    """ u16 units -> str, one code point per unit except valid surrogate pairs """
+    if not isinstance(units, array):
+        units = array("H", units)
+    return units_to_bytes(units).decode("utf-16-le", errors)
+
+def encode_string(s: Union[str, array, Sequence[int]]) -> bytes:
+    if isinstance(s, str):
+        return s.encode("utf-16-le", "surrogatepass")
+    return units_to_bytes(s if isinstance(s, array) else array("H", s))
+
+class GxtStrings:
+    """
+    Every string of one DS_GXT: the string area as one u16 buffer (length prefixes included)
+    plus the start of each string in it. Acts as a sequence of array('H') with the raw units,
+    the terminating null of the last string included.
+    """
+    __slots__ = ("units", "starts")
+
+    def __init__(self, units: array, starts: list):
+        self.units = units
+        self.starts = starts
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, i: int) -> array:
+        st = self.starts[i]
+        return self.units[st:st + self.units[st - 1]]
+
+    def __iter__(self):
+        for i in range(len(self.starts)):
+            yield self[i]
+
+    def string(self, i: int) -> array:
+        """ units of string i as build() expects them: last string without its terminating null """
+        units = self[i]
+        if i == len(self.starts) - 1 and units and units[-1] == 0:
+            return units[:-1]
+        return units
+
+    def text(self, i: int, errors: str = "strict") -> str:
+        return units_to_str(self.string(i), errors)
+
+    def texts(self, errors: str = "strict") -> list:
+        return [self.text(i, errors) for i in range(len(self.starts))]
+
+def string_count(buf, off: int = 0) -> int:
+    return LENGTH.unpack_from(buf, off + 6)[0]
+
+def gxt_end(buf, off: int = 0) -> Optional[int]:
+    """
+    End offset of the DS_GXT at off by following the length prefixes only,
+    None if there is no valid DS_GXT there.
+    """
+    n = len(buf)
+    if off + 8 > n or buf[off:off + 6] != SIG:
+        return None
+    unpack_from = LENGTH.unpack_from
+    p = off + 8
+    for _ in range(unpack_from(buf, off + 6)[0]):
+        if p + 2 > n:
+            return None
+        p += 2 + unpack_from(buf, p)[0] * 2
+        if p > n:
+            return None
+    return p
+
+def read(buf, off: int = 0) -> Optional[Tuple[GxtStrings, int]]:
+    """ (strings, end offset) of the DS_GXT at off, or None (same checks as gxt_end) """
+    n = len(buf)
+    if off + 8 > n or buf[off:off + 6] != SIG:
+        return None
+    unpack_from = LENGTH.unpack_from
+    starts = []
+    p = off + 8
+    for _ in range(unpack_from(buf, off + 6)[0]):
+        if p + 2 > n:
+            return None
+        # unit index right after the length prefix, relative to off + 8
+        starts.append((p - off - 6) >> 1)
+        p += 2 + unpack_from(buf, p)[0] * 2
+        if p > n:
+            return None
+    return GxtStrings(units_from_bytes(buf[off + 8:p]), starts), p
+
+def read_texts(buf, off: int = 0, errors: str = "strict") -> Optional[Tuple[list, int]]:
+    """
+    (GxtStrings.texts(), end offset) of the DS_GXT at off, None like read(). For callers that only
+    want str: the whole string area is decoded once and cut by unit index, which is exact when it
+    decodes to one code point per unit (no surrogates); otherwise each string is decoded on its own.
+    """
+    n = len(buf)
+    if off + 8 > n or buf[off:off + 6] != SIG:
+        return None
+    unpack_from = LENGTH.unpack_from
+    spans = []
+    p = off + 8
+    for _ in range(unpack_from(buf, off + 6)[0]):
+        if p + 2 > n:
+            return None
+        q = p + 2 + unpack_from(buf, p)[0] * 2
+        if q > n:
+            return None
+        spans.append((p + 2 - off - 8, q - off - 8))
+        p = q
+    area = bytes(buf[off + 8:p])
+    if spans:
+        # without the last terminating null, like GxtStrings.string()
+        a, b = spans[-1]
+        if b > a and area[b - 2:b] == _NULL:
+            spans[-1] = (a, b - 2)
+    try:
+        s = area.decode("utf-16-le", errors)
+    except UnicodeDecodeError:
+        s = ""  # a length prefix may look like a lone surrogate: decode per string below
+    if len(s) * 2 == len(area):
+        return [s[a >> 1:b >> 1] for a, b in spans], p
+    return [area[a:b].decode("utf-16-le", errors) for a, b in spans], p
+
+def build(strings: Sequence[Union[str, array, Sequence[int]]], terminate_empty: bool = False) -> bytes:
+    """
+    strings: str (gxt2txt), array('H') / list[int] (romwad_2way_tool), without the terminating
+    null of the last string; nulls anywhere else are kept as given.
+    terminate_empty: with no strings, still end with a u16 0 (what gxt2txt always wrote).
+    """
+    num = len(strings)
+    out = [HEADER.pack(SIG, num)]
+    if not num and terminate_empty:
+        out.append(_NULL)
+    for i, s in enumerate(strings):
+        data = encode_string(s)
+        if i == num - 1:
+            out.append(LENGTH.pack(len(data) // 2 + 1))
+            out.append(data)
+            out.append(_NULL)
+        else:
+            out.append(LENGTH.pack(len(data) // 2))
+            out.append(data)
+    return b"".join(out)
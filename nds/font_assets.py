@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Font trong ROM.WAD theo fonts/report.json: kiểm tra, lấy ra và ghi lại tại đúng offset đã ghi nhận.
+
+  python font_assets.py check ROM.WAD            (hoặc game.nds: ROM.WAD đọc thẳng từ image)
+  python font_assets.py extract ROM.WAD fonts_out
+  python romwad_2way_tool.py import ROM.WAD export_txt --fonts fonts_vi   (font + text cùng 1 lượt)
+
+report.json: mỗi font có name, rom_wad_offset, rom_absolute_offset (trong .nds), size, sha1 của
+bản gốc. Font chỉ được đụng tới khi vùng [rom_wad_offset, +size) trong WAD gốc có đúng sha1 đó
+(WAD bản khác / region khác => bỏ qua, không ghi nhầm chỗ). sha1 tính trên memoryview cắt từ mmap,
+từng khúc, không copy vùng font ra bytes.
+
+Ghi lại (patch_fonts): font mới phải vừa chỗ của font gốc + dải 0xAD ngay sau nó (như max_alloc của
+DS_GXT); phần còn lại của chỗ đó điền 0xAD. Font không có file trong thư mục font => giữ /
+chép lại bản gốc (import tăng dần trên rom_nw.wad cũ vẫn ra đúng). Không có report.json thì
+patch_fonts không đụng tới font nào (chỉ cảnh báo khi có thư mục font).
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+
+import nds_rom
+import wad_io
+
+REPORT = Path(__file__).with_name("fonts") / "report.json"
+_CHUNK = 1 << 16
+_PAD_RUN_RE = re.compile(b"%c*" % wad_io.PAD_BYTE)
+
+class FontAsset:
+    __slots__ = ("name", "off", "abs_off", "size", "sha1")
+
+    def __init__(self, name: str, off: int, abs_off: int | None, size: int, sha1: str):
+        self.name = name
+        self.off = off          # offset trong ROM.WAD
+        self.abs_off = abs_off  # offset trong image .nds (chỉ để đối chiếu)
+        self.size = size
+        self.sha1 = sha1
+
+    @classmethod
+    def from_report(cls, e: dict) -> "FontAsset":
+        num = lambda v: int(v, 0) if isinstance(v, str) else v
+        abs_off = e.get("rom_absolute_offset")
+        return cls(e["name"], num(e["rom_wad_offset"]), num(abs_off) if abs_off is not None else None,
+                   num(e["size"]), e["sha1"].lower())
+
+def load_report(path: str | Path | None = None) -> list[FontAsset]:
+    path = Path(path) if path is not None else REPORT
+    return [FontAsset.from_report(e) for e in json.loads(path.read_text(encoding="utf-8"))]
+
+def sha1_of(buf, off: int = 0, size: int | None = None) -> str:
+    """sha1 của buf[off:off+size] qua memoryview, từng khúc _CHUNK (không copy)."""
+    h = hashlib.sha1()
+    with memoryview(buf) as mv:
+        end = len(mv) if size is None else off + size
+        for p in range(off, end, _CHUNK):
+            h.update(mv[p:min(p + _CHUNK, end)])
+    return h.hexdigest()
+
+def matches(asset: FontAsset, buf) -> bool:
+    """Vùng của asset trong buf (ROM.WAD) còn là font gốc."""
+    return asset.off + asset.size <= len(buf) and sha1_of(buf, asset.off, asset.size) == asset.sha1
+
+def slot_end(asset: FontAsset, buf) -> int:
+    """Chỗ tối đa font được chiếm: hết font gốc + dải 0xAD liền ngay sau."""
+    return _PAD_RUN_RE.match(buf, asset.off + asset.size).end()
+
+def check(wad_path: str | Path, assets: list[FontAsset]) -> list[dict]:
+    base = nds_rom.wad_span(wad_path)[0] if nds_rom.is_nds(wad_path) else None
+    rows = []
+    with wad_io.open_wad(wad_path) as wad:
+        for a in assets:
+            rows.append({
+                "name": a.name, "off": a.off, "size": a.size,
+                "ok": matches(a, wad),
+                "slot": slot_end(a, wad) - a.off if a.off + a.size <= len(wad) else 0,
+                # .nds: vị trí ROM.WAD trong image phải khớp rom_absolute_offset
+                "abs_ok": None if base is None or a.abs_off is None else base + a.off == a.abs_off,
+            })
+    return rows
+
+def extract(wad_path: str | Path, out_dir: str | Path, assets: list[FontAsset]) -> int:
+    """Ghi font gốc ra out_dir/name; bỏ qua font không khớp sha1. Trả về số font đã ghi."""
+    outp = Path(out_dir)
+    outp.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with wad_io.open_wad(wad_path) as wad:
+        for a in assets:
+            if not matches(a, wad):
+                print(f"[!] {a.name}: 0x{a.off:X} không phải font gốc (sha1 khác), bỏ qua")
+                continue
+            with memoryview(wad) as mv:
+                (outp / a.name).write_bytes(mv[a.off:a.off + a.size])
+            n += 1
+    return n
+
+def patch_fonts(data, font_dir: str | Path | None, src=None, assets: list[FontAsset] | None = None
+                ) -> tuple[list[str], list[str], list[tuple[int, int]]]:
+    """
+    Ghi font từ font_dir (file cùng tên trong report.json, thiếu file => font gốc) vào data
+    (bytearray / mmap / memoryview ghi được) tại offset gốc.
+    src: WAD gốc (mặc định data, khi data là bản copy mới của WAD gốc).
+    Trả về (tên font đã ghi, lỗi, vùng có thể đã ghi [(start, end)] cho patch).
+    """
+    src = data if src is None else src
+    if assets is None:
+        if not REPORT.exists():
+            # không biết font nằm ở đâu: bỏ qua font, phần DS_GXT vẫn import bình thường
+            if font_dir:
+                print(f"[!] Không có {REPORT}, bỏ qua font trong {font_dir}")
+            return [], [], []
+        assets = load_report()
+    written: list[str] = []
+    errors: list[str] = []
+    ranges: list[tuple[int, int]] = []
+    fdir = Path(font_dir) if font_dir else None
+    for a in assets:
+        if not matches(a, src):
+            continue
+        end = slot_end(a, src)
+        ranges.append((a.off, end))
+        path = fdir / a.name if fdir else None
+        if path is not None and path.exists():
+            new = path.read_bytes()
+            if a.off + len(new) > end:
+                errors.append(f"{a.name}: 0x{len(new):X} byte > chỗ trống 0x{end - a.off:X} (giữ font gốc)")
+                new = None
+        else:
+            new = None
+        if new is None:
+            with memoryview(src) as mv:
+                new = bytes(mv[a.off:a.off + a.size])
+        elif hashlib.sha1(new).hexdigest() != a.sha1:
+            written.append(a.name)
+        # ghi lại cả chỗ của font (phần sau font mới điền 0xAD): font dài ở lần import trước không để lại rác
+        blob = new + bytes([wad_io.PAD_BYTE]) * (end - a.off - len(new))
+        if bytes(data[a.off:a.off + len(blob)]) != blob:
+            data[a.off:a.off + len(blob)] = blob
+    return written, errors, ranges
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Font trong ROM.WAD theo fonts/report.json")
+    ap.add_argument("--report", help="mặc định fonts/report.json cạnh tool")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("check", help="kiểm tra sha1 font tại offset ghi nhận")
+    p.add_argument("wad", help="ROM.WAD hoặc .nds")
+    p = sub.add_parser("extract", help="lấy font gốc ra thư mục")
+    p.add_argument("wad", help="ROM.WAD hoặc .nds")
+    p.add_argument("out_dir")
+    args = ap.parse_args(argv)
+
+    assets = load_report(args.report)
+    if args.cmd == "extract":
+        n = extract(args.wad, args.out_dir, assets)
+        print(f"[OK] {n}/{len(assets)} font -> {args.out_dir}")
+        return 0 if n == len(assets) else 1
+    bad = 0
+    for r in check(args.wad, assets):
+        state = "OK" if r["ok"] else "KHÁC"
+        where = "" if r["abs_ok"] is None else ("" if r["abs_ok"] else ", offset trong .nds khác report")
+        print(f"[{state}] {r['name']}: off=0x{r['off']:X} size=0x{r['size']:X} chỗ=0x{r['slot']:X}{where}")
+        bad += not r["ok"]
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,14 @@
 import os
+import sys
 import glob
+import argparse
 import struct
-import requests
 from typing import List, Tuple, Dict
 import re
-import msvcrt
+import ds_gxt
+import gxt_symbols
+import gxt_translate
+from gxt_symbols import symbol_to_value
 
 # Global settings
 current_file = ""
@@ -18,17 +22,13 @@ mapping = []
 tags = []
 repair_tags = []
 
-# Symbol mapping from the provided table
-symbol_map = {
-    0x41: 'A', 0x42: 'B', 0x43: 'C', 0x44: 'D', 0x45: 'E', 0x46: 'F', 0x47: 'G',
-    0x48: 'H', 0x49: 'I', 0x4A: 'J', 0x4B: 'K', 0x4C: 'L', 0x4D: 'M', 0x4E: 'N',
-    0x4F: 'O', 0x50: 'P', 0x51: 'Q', 0x52: 'R', 0x53: 'S', 0x54: 'T', 0x55: 'U',
-    0x56: 'V', 0x57: 'W', 0x58: 'X', 0x59: 'Y', 0x5A: 'Z', 0x5C: 'a', 0x5D: 'b',
-    0x5E: 'c', 0x5F: 'd', 0x60: 'e', 0x61: 'f', 0x62: 'g', 0x63: 'h', 0x64: 'i',
-    0x65: 'j', 0x66: 'k', 0x67: 'l', 0x68: 'm', 0x69: 'n', 0x6A: 'o', 0x6B: 'p',
-    0x6C: 'q', 0x6D: 'r', 0x6E: 's', 0x6F: 't', 0x70: 'u', 0x71: 'v', 0x72: 'w',
-    0x73: 'x', 0x74: 'y', 0x75: 'z'
-}
+line_break_re = re.compile('\r[\\s\\S]?|\n')
+astral_re = re.compile('[\U00010000-\U0010FFFF]')
+
+# Symbol mapping from the provided table ("gta cw.tbl")
+symbol_map = gxt_symbols.load_symbol_map()
+symbols_cache = None
+translator = None
 
 def set_current_file(filename: str):
     global current_file
@@ -38,15 +38,6 @@ def show_message(message: str):
     print(f"Message for {current_file}: {message}")
     return False
 
-def read_whole_file(file):
-    output = ""
-    while True:
-        char = file.read(1)
-        if not char:
-            break
-        output += char
-    return output
-
 def skip_bom(file):
     file.seek(0)
     size = os.path.getsize(file.name)
@@ -55,33 +46,21 @@ def skip_bom(file):
         if bom != b'\xFF\xFE':
             file.seek(0)
 
-def read_whole_line(file) -> Tuple[bool, str]:
-    if file.tell() >= os.path.getsize(file.name):
-        return False, ""
-    line = ""
-    while True:
-        char = file.read(1).decode('utf-16-le', errors='ignore')
-        if not char or char in '\r\n':
-            break
-        line += char
-    if char == '\r':
-        file.read(1)  # Skip \n
-    if line.startswith(';;;'):
-        return read_whole_line(file)
-    return True, line
-
-def symbol_to_value(s: str) -> int:
-    if len(s) > 2 and s.startswith('0x'):
-        return int(s[2:], 16)
-    return ord(s[0])
-
-def read_settings_files():
+def split_text_lines(text: str) -> List[str]:
+    # a line ends at '\n' or at '\r' (which also swallows the character after it),
+    # a break at the very end of the text does not start another line
+    lines = line_break_re.split(text)
+    if lines[-1] == "":
+        lines.pop()
+    return lines
+
+def read_settings_files(directory: str = "."):
     global use_mapping, add_translation_line, show_warn_message, add_translated_text
     global translating_api_key, translating_lang, mapping, tags
 
     print("Reading settings ...")
     try:
-        with open("settings.dat", "r", encoding='utf-16-le') as file:
+        with open(os.path.join(directory, "settings.dat"), "r", encoding='utf-16-le') as file:
             skip_bom(file)
             lines = file.readlines()
             i = 0
@@ -140,7 +119,7 @@ def read_settings_files():
 
     print("Reading tags ...")
     try:
-        with open("tags.dat", "r", encoding='utf-16-le') as file:
+        with open(os.path.join(directory, "tags.dat"), "r", encoding='utf-16-le') as file:
             skip_bom(file)
             tags = []
             for line in file:
@@ -161,125 +140,155 @@ def read_settings_files():
     except FileNotFoundError:
         print('File ("tags.dat") not found')
 
+def get_symbols() -> gxt_symbols.SymbolTable:
+    # lookup tables for the current symbol_map / tags / use_mapping, rebuilt when their contents
+    # change: compared against copies, so a replaced (read_settings_files) or edited table is never missed
+    global symbols_cache
+    if symbols_cache is None or symbols_cache[0] != (use_mapping, symbol_map, tags):
+        table = gxt_symbols.SymbolTable(symbol_map, [(tag['symbol'], tag['tagname']) for tag in tags], use_mapping)
+        symbols_cache = ((use_mapping, dict(symbol_map), [dict(tag) for tag in tags]), table)
+    return symbols_cache[1]
+
 def get_tag(symbol: int) -> str:
-    for tag in tags:
-        if tag['symbol'] == symbol:
-            return tag['tagname']
-    return None
-
-def tag_to_symbol(line_number: int, input_str: str, input_pos: int, output: List[str]) -> int:
-    tag = ""
-    tag_closed = False
-    for i in range(input_pos + 1, len(input_str)):
-        if input_str[i] == '~':
-            tag_closed = True
-            break
-        tag += input_str[i]
-    if tag_closed:
-        if tag == 'n':
-            output.append('\n')
-            return 1
-        elif len(tag) == 5 and tag[0] == '#':
-            try:
-                result = int(tag[1:], 16)
-                output.append(chr(result))
-                return 5
-            except ValueError:
-                pass
-        else:
-            for tag_info in tags:
-                if tag_info['tagname'].lower() == tag.lower():
-                    output.append(chr(tag_info['symbol']))
-                    return len(tag_info['tagname'])
-        if len(tag) > 16:
-            warning = f"\n   warning (line {line_number}): possibly a wrong tag ('~{tag[:16]}...')"
-        else:
-            warning = f"\n   warning (line {line_number}): possibly a wrong tag ('~{tag}')"
-        print(warning)
-        if show_warn_message:
-            show_message(warning[4:])
+    return get_symbols().get_tag(symbol)
+
+def tag_to_symbol(line_number: int, input_str: str, input_pos: int, output: List[str],
+                  symbols: gxt_symbols.SymbolTable = None) -> int:
+    end = input_str.find('~', input_pos + 1)
+    if end == -1:
         return 0
+    tag = input_str[input_pos + 1:end]
+    if tag == 'n':
+        output.append('\n')
+        return 1
+    elif len(tag) == 5 and tag[0] == '#':
+        try:
+            result = int(tag[1:], 16)
+            output.append(chr(result))
+            return 5
+        except ValueError:
+            pass
+    else:
+        found = (symbols or get_symbols()).find_tag(tag)
+        if found:
+            output.append(chr(found[0]))
+            return len(found[1])
+    if len(tag) > 16:
+        warning = f"\n   warning (line {line_number}): possibly a wrong tag ('~{tag[:16]}...')"
+    else:
+        warning = f"\n   warning (line {line_number}): possibly a wrong tag ('~{tag}')"
+    print(warning)
+    if show_warn_message:
+        show_message(warning[4:])
     return 0
 
-def replace_text_tags_for_translation(s: str) -> str:
-    global repair_tags
-    repair_tags = []
+def text_line_to_gxt(line: str, line_number: int, symbols: gxt_symbols.SymbolTable = None) -> Tuple[str, bool]:
+    # converts one TXT line; plain runs between '~' are unmapped with one str.translate
+    symbols = symbols or get_symbols()
+    unmap_table = symbols.unmap_table
+    output = []
+    has_warnings = False
+    pos = 0
+    while True:
+        tag_pos = line.find('~', pos)
+        if tag_pos == -1:
+            output.append(line[pos:].translate(unmap_table))
+            break
+        output.append(line[pos:tag_pos].translate(unmap_table))
+        tag_size = tag_to_symbol(line_number, line, tag_pos, output, symbols)
+        if tag_size != 0:
+            pos = tag_pos + tag_size + 2
+        else:
+            output.append('~'.translate(unmap_table))
+            has_warnings = True
+            pos = tag_pos + 1
+    return ''.join(output), has_warnings
+
+def prepare_text_for_translation(s: str, symbols: gxt_symbols.SymbolTable = None) -> Tuple[str, List[Dict[str, str]]]:
+    # known tags become "[N]" placeholders; returns the text and how to put them back
+    repairs = []
     output = []
     s_idx = 0
     while s_idx < len(s):
         if s[s_idx] == '~':
-            tag = ""
-            s_idx += 1
-            while s_idx < len(s) and s[s_idx] != '~':
-                tag += s[s_idx]
-                s_idx += 1
-            if s_idx < len(s):
-                s_idx += 1
-                if tag == 'n':
-                    output.append('\n')
-                elif len(tag) == 5 and tag[0] == '#':
-                    try:
-                        value = int(tag[1:], 16)
-                        output.append(chr(value))
-                    except ValueError:
-                        output.append('~' + tag + '~')
-                else:
-                    found = False
-                    for tag_info in tags:
-                        if tag_info['tagname'].lower() == tag.lower():
-                            newtag = f"[{len(repair_tags)}]"
-                            output.append(newtag)
-                            oldtag = f"~{tag}~"
-                            repair_tags.append({'what': newtag, 'to': oldtag})
-                            found = True
-                            break
-                    if not found:
-                        output.append('~' + tag + '~')
+            end = s.find('~', s_idx + 1)
+            if end == -1:
+                break
+            tag = s[s_idx + 1:end]
+            s_idx = end + 1
+            if tag == 'n':
+                output.append('\n')
+            elif len(tag) == 5 and tag[0] == '#':
+                try:
+                    value = int(tag[1:], 16)
+                    output.append(chr(value))
+                except ValueError:
+                    output.append('~' + tag + '~')
+            elif (symbols or get_symbols()).find_tag(tag):
+                newtag = f"[{len(repairs)}]"
+                output.append(newtag)
+                repairs.append({'what': newtag, 'to': f"~{tag}~"})
+            else:
+                output.append('~' + tag + '~')
         else:
-            output.append(s[s_idx])
-            s_idx += 1
-    return ''.join(output)
+            end = s.find('~', s_idx)
+            if end == -1:
+                end = len(s)
+            output.append(s[s_idx:end])
+            s_idx = end
+    return ''.join(output), repairs
 
-def repair_text_tags_after_translation(s: str) -> str:
-    for repair in repair_tags:
+def repair_translated_text(s: str, repairs: List[Dict[str, str]]) -> str:
+    for repair in repairs:
         s = s.replace(repair['what'], repair['to'])
     return s
 
+def replace_text_tags_for_translation(s: str) -> str:
+    global repair_tags
+    s, repair_tags = prepare_text_for_translation(s)
+    return s
+
+def repair_text_tags_after_translation(s: str) -> str:
+    return repair_translated_text(s, repair_tags)
+
+def translation_enabled() -> bool:
+    return add_translation_line and add_translated_text and bool(translating_api_key)
+
+def get_translator() -> gxt_translate.Translator:
+    global translator
+    if translator is None or translator.lang != translating_lang:
+        backend = gxt_translate.YandexBackend(translating_api_key, translating_lang)
+        translator = gxt_translate.Translator(backend, translating_lang, gxt_translate.TranslationCache())
+    return translator
+
 def translate_plain_text(text: str) -> str:
     if not translating_api_key:
         return text
-    url = f"https://translate.yandex.net/api/v1.5/tr/translate?key={translating_api_key}&text={text}&format=plain"
-    if translating_lang:
-        url += f"&lang={translating_lang}"
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            content = response.text
-            start = content.find("<text>") + 6
-            end = content.find("</text>")
-            if start != -1 and end != -1 and end > start:
-                return content[start:end]
-    except Exception as e:
-        print(f"Translation failed: {e}")
-    return text
+    return get_translator().translate(text)
 
 def get_mapped_symbol(symbol: int) -> int:
-    if use_mapping and symbol in symbol_map:
-        return ord(symbol_map[symbol])
-    return symbol
+    return get_symbols().map_symbol(symbol)
+
+def build_text_translation_table() -> Dict[int, str]:
+    return get_symbols().text_table()
+
+def format_gxt_string(s: str, table: Dict[int, str]) -> str:
+    s = s.translate(table)
+    if not s.isascii():
+        # characters outside the BMP (decoded surrogate pairs) are always above 0xFEEF
+        s = astral_re.sub(lambda m: f"~#{ord(m.group()):X}~", s)
+    return s
 
 def unmap_symbol(symbol: int) -> int:
-    if use_mapping:
-        for k, v in symbol_map.items():
-            if ord(v) == symbol:
-                return k
-    return symbol
+    return get_symbols().unmap_symbol(symbol)
 
 class CGXTFile:
-    def __init__(self, filepath: str = None):
+    def __init__(self, filepath: str = None, symbols: gxt_symbols.SymbolTable = None):
+        # symbols: explicit tables for library use; None follows the settings.dat / tags.dat globals
         self.loaded = False
         self.has_warnings = False
         self.strings: List[str] = []
+        self.symbols = symbols
         if filepath:
             self.read(filepath)
 
@@ -289,29 +298,19 @@ class CGXTFile:
         self.has_warnings = False
         try:
             with open(filepath, "rb") as file:
-                file.seek(0, os.SEEK_END)
-                size = file.tell()
-                if size <= 7:
-                    if show_warn_message:
-                        show_message(f'file "{filepath}" is not a valid gxt file')
-                    return False
-                file.seek(0)
-                header = file.read(8)
-                signature, num_strings = struct.unpack("<6sH", header)
-                if signature != b"DS_GXT":
-                    if show_warn_message:
-                        show_message(f'file "{filepath}" is not a valid gxt file')
-                    return False
-                if num_strings > 0:
-                    self.strings = []
-                    for _ in range(num_strings):
-                        str_length = struct.unpack("<H", file.read(2))[0]
-                        string_data = file.read(str_length * 2).decode('utf-16-le')
-                        self.strings.append(string_data)
-                    self.loaded = True
-                else:
-                    if show_warn_message:
-                        show_message(f'file "{filepath}" is not a valid gxt file')
+                data = file.read()
+            parsed = ds_gxt.read_texts(data)
+            if parsed is None:
+                if show_warn_message:
+                    show_message(f'file "{filepath}" is not a valid gxt file')
+                return False
+            if len(parsed[0]) > 0:
+                # without the last terminating null, which write() adds back
+                self.strings = parsed[0]
+                self.loaded = True
+            else:
+                if show_warn_message:
+                    show_message(f'file "{filepath}" is not a valid gxt file')
         except Exception as e:
             if show_warn_message:
                 show_message(f'failed to open file "{filepath}"')
@@ -323,37 +322,29 @@ class CGXTFile:
         self.strings = []
         self.loaded = False
         self.has_warnings = False
+        symbols = self.symbols or get_symbols()
         try:
-            with open(filepath, "r", encoding='utf-16-le') as file:
-                skip_bom(file)
-                success, line = read_whole_line(file)
-                if not success or line != "GXT":
+            with open(filepath, "rb") as file:
+                data = file.read()
+            if data[:2] == b'\xFF\xFE':
+                data = data[2:]
+            lines = [line for line in split_text_lines(data.decode('utf-16-le', errors='ignore'))
+                     if not line.startswith(';;;')]
+            if not lines or lines[0] != "GXT":
+                if show_warn_message:
+                    show_message(f'file "{filepath}" is not a valid gxt file')
+                return False
+            for line in lines[1:]:
+                current_string, line_warnings = text_line_to_gxt(line, len(self.strings) + 1, symbols)
+                if line_warnings:
+                    self.has_warnings = True
+                if not current_string:
+                    print(f"\n   warning (line {len(self.strings) + 1}): line is empty")
                     if show_warn_message:
-                        show_message(f'file "{filepath}" is not a valid gxt file')
-                    return False
-                while True:
-                    success, line = read_whole_line(file)
-                    if not success:
-                        break
-                    current_string = []
-                    for c_idx, char in enumerate(line, 1):
-                        if char == '~':
-                            tag_size = tag_to_symbol(len(self.strings) + 1, line, c_idx - 1, current_string)
-                            if tag_size != 0:
-                                c_idx += tag_size + 1
-                            else:
-                                current_string.append(chr(unmap_symbol(ord(char))))
-                                self.has_warnings = True
-                        else:
-                            current_string.append(chr(unmap_symbol(ord(char))))
-                    current_string = ''.join(current_string)
-                    if not current_string:
-                        print(f"\n   warning (line {len(self.strings) + 1}): line is empty")
-                        if show_warn_message:
-                            show_message(f"warning (line {len(self.strings) + 1}): line is empty")
-                        self.has_warnings = True
-                    self.strings.append(current_string)
-                self.loaded = True
+                        show_message(f"warning (line {len(self.strings) + 1}): line is empty")
+                    self.has_warnings = True
+                self.strings.append(current_string)
+            self.loaded = True
         except Exception as e:
             if show_warn_message:
                 show_message(f'failed to open file "{filepath}"')
@@ -363,48 +354,43 @@ class CGXTFile:
 
     def write(self, output_filepath: str):
         with open(output_filepath, "wb") as file:
-            file.write(b"DS_GXT")
-            file.write(struct.pack("<H", len(self.strings)))
-            for i, s in enumerate(self.strings):
-                file.write(struct.pack("<H", len(s) + (1 if i == len(self.strings) - 1 else 0)))
-                file.write(s.encode('utf-16-le'))
-            file.write(struct.pack("<H", 0))
+            file.write(ds_gxt.build(self.strings, terminate_empty=True))
 
-    def write_to_text_file(self, output_filepath: str):
-        with open(output_filepath, "wb") as file:
-            file.write(b"\xFF\xFE")
-            with open(output_filepath, "a", encoding='utf-16-le') as file:
-                file.write("GXT")
-                if add_translated_text:
-                    file.write(" | Переведено «Яндекс.Переводчиком»")
-                    if translating_lang:
-                        file.write(f" ({translating_lang})")
-                for i, s in enumerate(self.strings):
-                    if i == 0:
-                        file.write("\r\n")
-                    formatted_str = ""
-                    for c in s:
-                        c_val = ord(c)
-                        if c_val > 0xFEEF:
-                            tag = get_tag(c_val)
-                            if tag:
-                                formatted_str += f"~{tag}~"
-                            else:
-                                formatted_str += f"~#{c_val:X}~"
-                        elif c_val == 0xA:
-                            formatted_str += "~n~"
-                        else:
-                            formatted_str += chr(get_mapped_symbol(c_val))
-                    if add_translation_line:
-                        file.write(";;;")
-                    file.write(formatted_str)
-                    if add_translation_line and add_translated_text:
-                        file.write("\r\n")
-                        translated = translate_plain_text(replace_text_tags_for_translation(formatted_str))
-                        translated = repair_text_tags_after_translation(translated)
-                        file.write(translated)
-                    if i != len(self.strings) - 1:
-                        file.write("\r\n")
+    def translation_sources(self) -> List[str]:
+        # texts write_to_text_file would send to the translator, for batching across files
+        symbols = self.symbols or get_symbols()
+        table = symbols.text_table()
+        return [prepare_text_for_translation(format_gxt_string(s, table), symbols)[0] for s in self.strings]
+
+    def write_to_text_file(self, output_filepath: str, translations: Dict[str, str] = None):
+        symbols = self.symbols or get_symbols()
+        table = symbols.text_table()
+        with open(output_filepath, "w", encoding='utf-16-le', newline='') as file:
+            file.write("\ufeff")
+            file.write("GXT")
+            if add_translated_text:
+                file.write(" | Переведено «Яндекс.Переводчиком»")
+                if translating_lang:
+                    file.write(f" ({translating_lang})")
+            last = len(self.strings) - 1
+            for i, s in enumerate(self.strings):
+                if i == 0:
+                    file.write("\r\n")
+                formatted_str = format_gxt_string(s, table)
+                if add_translation_line:
+                    file.write(";;;")
+                file.write(formatted_str)
+                if add_translation_line and add_translated_text:
+                    file.write("\r\n")
+                    source, repairs = prepare_text_for_translation(formatted_str, symbols)
+                    if translations is None:
+                        translated = translate_plain_text(source)
+                    else:
+                        translated = translations.get(source, source)
+                    translated = repair_translated_text(translated, repairs)
+                    file.write(translated)
+                if i != last:
+                    file.write("\r\n")
 
 class CBinFile:
     def __init__(self, filepath: str = None):
@@ -498,24 +484,104 @@ class CBinFile:
                     if i != len(self.symbols_info) - 1:
                         file.write("\r\n")
 
-def main():
-    os.system("title GTA Chinatown Wars GXT2TXT Converter")
-    print("GTA Chinatown Wars GXT2TXT Converter\n    by DK22\n")
-    read_settings_files()
-    for filepath in glob.glob("*.gxt"):
+def expand_paths(paths: List[str], pattern: str) -> List[str]:
+    # directories expand to their sorted pattern matches, files are kept as given
+    result = []
+    for path in paths:
+        if os.path.isdir(path):
+            result += sorted(glob.glob(os.path.join(path, pattern)))
+        else:
+            result.append(path)
+    return result
+
+def convert_files(filepaths: List[str]) -> int:
+    # GXT -> TXT, one file in memory at a time, each written through a single buffered handle;
+    # returns the number of files that failed
+    gxt_file = CGXTFile()
+    translations = None
+    failed = 0
+    if translation_enabled():
+        # first pass: every distinct string of every file goes to the translator once
+        sources = []
+        for filepath in filepaths:
+            set_current_file(filepath)
+            if gxt_file.read(filepath):
+                sources += gxt_file.translation_sources()
+        print(f"translating {len(set(sources))} distinct strings ... ", end="")
+        translations = get_translator().translate_all(sources)
+        print("done")
+    for filepath in filepaths:
         set_current_file(filepath)
         output_filepath = os.path.splitext(filepath)[0] + ".txt"
         print(f"converting {filepath} ... ", end="")
-        gxt_file = CGXTFile()
         if gxt_file.read(filepath):
-            gxt_file.write_to_text_file(output_filepath)
+            gxt_file.write_to_text_file(output_filepath, translations)
             if gxt_file.has_warnings:
                 print()
             print(f"done ({len(gxt_file.strings)} strings)")
         else:
             print("failed")
-    print("\nConversion done. Press any key to exit.")
-    msvcrt.getch()
+            failed += 1
+    return failed
+
+def build_files(filepaths: List[str]) -> int:
+    # TXT -> GXT next to each TXT; returns the number of files that failed
+    gxt_file = CGXTFile()
+    failed = 0
+    for filepath in filepaths:
+        set_current_file(filepath)
+        output_filepath = os.path.splitext(filepath)[0] + ".gxt"
+        print(f"building {filepath} ... ", end="")
+        if gxt_file.read_from_text_file(filepath):
+            gxt_file.write(output_filepath)
+            if gxt_file.has_warnings:
+                print()
+            print(f"done ({len(gxt_file.strings)} strings)")
+        else:
+            print("failed")
+            failed += 1
+    return failed
+
+def convert_directory(directory: str):
+    convert_files(expand_paths([directory], "*.gxt"))
+
+def wait_for_key():
+    # the console window of the Windows release closes on exit otherwise
+    if os.name == "nt" and sys.stdin.isatty():
+        import msvcrt
+        msvcrt.getch()
+
+def main(argv: List[str] = None):
+    # accepted before or after the subcommand; SUPPRESS keeps the subparser from resetting it
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--settings-dir", default=argparse.SUPPRESS,
+                        help="directory with settings.dat and tags.dat (default .)")
+    ap = argparse.ArgumentParser(description="GTA Chinatown Wars GXT2TXT Converter", parents=[common])
+    sub = ap.add_subparsers(dest="cmd")
+    p = sub.add_parser("convert", help="GXT -> TXT", parents=[common])
+    p.add_argument("paths", nargs="*", default=["."], help=".gxt files or directories (default .)")
+    p = sub.add_parser("build", help="TXT -> GXT", parents=[common])
+    p.add_argument("paths", nargs="*", default=["."], help=".txt files or directories (default .)")
+    args = ap.parse_args(argv)
+    settings_dir = getattr(args, "settings_dir", ".")
+
+    if args.cmd is None:
+        # double-clicked release: convert the current directory and wait
+        if os.name == "nt":
+            os.system("title GTA Chinatown Wars GXT2TXT Converter")
+        print("GTA Chinatown Wars GXT2TXT Converter\n    by DK22\n")
+        read_settings_files(settings_dir)
+        convert_directory(".")
+        print("\nConversion done. Press any key to exit.")
+        wait_for_key()
+        return 0
+
+    read_settings_files(settings_dir)
+    if args.cmd == "convert":
+        failed = convert_files(expand_paths(args.paths, "*.gxt"))
+    else:
+        failed = build_files(expand_paths(args.paths, "*.txt"))
+    return 1 if failed else 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
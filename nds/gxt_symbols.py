@@ -0,0 +1,114 @@
+"""
+Symbol / tag registry shared by gxt2txt.py and romwad_2way_tool.py.
+
+Built once from "gta cw.tbl" (game symbol <-> character), tags.dat (symbol <-> ~tag~)
+and the USE_MAPPING switch of settings.dat, then queried through dict lookups
+and str.translate tables instead of scanning the tables per character.
+"""
+
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TBL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gta cw.tbl")
+
+# Used when "gta cw.tbl" is missing: A-Z keep ASCII, a-z live at 0x5C..0x75
+DEFAULT_SYMBOL_MAP = {**{0x41 + i: chr(0x41 + i) for i in range(26)},
+                      **{0x5C + i: chr(0x61 + i) for i in range(26)}}
+
+tbl_line_re = re.compile(r"^([0-9A-Fa-f]{1,8})=(.)$")
+
+def read_tbl(path: str) -> Dict[int, str]:
+    symbol_map = {}
+    with open(path, "r", encoding="utf-8-sig") as file:
+        for line in file:
+            m = tbl_line_re.match(line.rstrip("\r\n"))
+            if m:
+                symbol_map.setdefault(int(m.group(1), 16), m.group(2))
+    return symbol_map
+
+def load_symbol_map(path: str = TBL_PATH) -> Dict[int, str]:
+    try:
+        return read_tbl(path) or dict(DEFAULT_SYMBOL_MAP)
+    except FileNotFoundError:
+        return dict(DEFAULT_SYMBOL_MAP)
+
+def symbol_to_value(s: str) -> int:
+    if len(s) > 2 and s.startswith('0x'):
+        return int(s[2:], 16)
+    return ord(s[0])
+
+def read_tags(path: str) -> List[Tuple[int, str]]:
+    with open(path, "rb") as file:
+        text = file.read().decode('utf-16-le', errors='ignore').lstrip('\ufeff')
+    tags = []
+    for line in text.splitlines():
+        parts = line.strip().split(maxsplit=1)
+        if len(parts) == 2:
+            tags.append((symbol_to_value(parts[0]), parts[1]))
+    return tags
+
+class SymbolTable:
+    def __init__(self, symbol_map: Optional[Dict[int, str]] = None,
+                 tags: Iterable[Tuple[int, str]] = (), use_mapping: bool = True):
+        self.symbol_map = dict(DEFAULT_SYMBOL_MAP if symbol_map is None else symbol_map)
+        self.use_mapping = use_mapping
+        self.tags = list(tags)
+
+        # the first entry wins everywhere, as with the old linear scans
+        self.char_to_symbol: Dict[int, int] = {}
+        for symbol, char in self.symbol_map.items():
+            self.char_to_symbol.setdefault(ord(char), symbol)
+        self.tag_by_symbol: Dict[int, str] = {}
+        self.tag_by_name: Dict[str, Tuple[int, str]] = {}
+        for symbol, tagname in self.tags:
+            self.tag_by_symbol.setdefault(symbol, tagname)
+            self.tag_by_name.setdefault(tagname.lower(), (symbol, tagname))
+
+        # str.translate tables
+        if use_mapping:
+            self.map_table = {symbol: char for symbol, char in self.symbol_map.items() if ord(char) != symbol}
+            self.unmap_table = {code: symbol for code, symbol in self.char_to_symbol.items() if code != symbol}
+        else:
+            self.map_table = {}
+            self.unmap_table = {}
+        self._text_table: Optional[Dict[int, str]] = None
+
+    @classmethod
+    def from_files(cls, tbl_path: str = TBL_PATH, tags_path: Optional[str] = None,
+                   use_mapping: bool = True) -> "SymbolTable":
+        tags = read_tags(tags_path) if tags_path and os.path.exists(tags_path) else []
+        return cls(load_symbol_map(tbl_path), tags, use_mapping)
+
+    def get_tag(self, symbol: int) -> Optional[str]:
+        return self.tag_by_symbol.get(symbol)
+
+    def find_tag(self, name: str) -> Optional[Tuple[int, str]]:
+        # case-insensitive, returns (symbol, tagname as written in tags.dat)
+        return self.tag_by_name.get(name.lower())
+
+    def map_symbol(self, symbol: int) -> int:
+        if self.use_mapping and symbol in self.symbol_map:
+            return ord(self.symbol_map[symbol])
+        return symbol
+
+    def unmap_symbol(self, code: int) -> int:
+        if self.use_mapping:
+            return self.char_to_symbol.get(code, code)
+        return code
+
+    def text_table(self) -> Dict[int, str]:
+        # GXT -> TXT: tags / ~#HEX~ above 0xFEEF, ~n~ for newline, mapped symbols for the rest
+        if self._text_table is not None:
+            return self._text_table
+        table: Dict[int, str] = dict(self.symbol_map) if self.use_mapping else {}
+        table[0xA] = "~n~"
+        for symbol in range(0xFEF0, 0x10000):
+            table[symbol] = f"~#{symbol:X}~"
+        for symbol, tagname in self.tag_by_symbol.items():
+            if symbol > 0xFEEF and tagname:
+                table[symbol] = f"~{tagname}~"
+        self._text_table = table
+        return table
+
+DEFAULT = SymbolTable(load_symbol_map())
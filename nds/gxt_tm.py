@@ -0,0 +1,234 @@
+"""
+Translation memory for GXT strings, stored in SQLite.
+
+Every distinct source string is stored once with its translation and every
+(file, index) location it occurs at. Exact lookups go through the UNIQUE index
+on the source text, and fuzzy lookups through a trigram index.
+
+  python gxt_tm.py build gxt.tm.db --gxt-dir ../GXT
+  python gxt_tm.py build gxt.tm.db --export ROM.WAD export_txt
+  python gxt_tm.py lookup gxt.tm.db "~#FF00~Khách hàng bị giết."
+  python gxt_tm.py fuzzy gxt.tm.db "Khach hang bi giet" --limit 5
+  python gxt_tm.py dups gxt.tm.db --min 3
+
+Sources:
+  - gxt2txt TXT files: ";;;source" followed by its translation (ADD_TRANSLATION_LINE),
+    other lines are indexed with no translation.
+  - ROM.WAD export (romwad_2way_tool.py): the source is the string in ROM.WAD,
+    the translation is the line of the same index in the TXT.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+GRAM_SIZE = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE,
+    target TEXT,
+    grams INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS locations (
+    file TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    entry INTEGER NOT NULL,
+    PRIMARY KEY (file, idx)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS locations_entry ON locations (entry);
+CREATE TABLE IF NOT EXISTS grams (
+    gram TEXT NOT NULL,
+    entry INTEGER NOT NULL,
+    PRIMARY KEY (gram, entry)
+) WITHOUT ROWID;
+"""
+
+def fold_text(text: str) -> str:
+    # case- and diacritic-insensitive: "Khách hàng" and "khach hang" share every gram
+    text = unicodedata.normalize("NFD", text.lower().replace("đ", "d"))
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+def text_grams(text: str, n: int = GRAM_SIZE) -> set:
+    # padded so short strings still get grams
+    text = f" {fold_text(text)} "
+    if len(text) <= n:
+        return {text}
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+class TranslationMemory:
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _entry_id(self, source: str, target: Optional[str]) -> int:
+        row = self.db.execute("SELECT id, target FROM entries WHERE source = ?", (source,)).fetchone()
+        if row:
+            if target is not None and target != row[1]:
+                self.db.execute("UPDATE entries SET target = ? WHERE id = ?", (target, row[0]))
+            return row[0]
+        grams = text_grams(source)
+        entry = self.db.execute("INSERT INTO entries (source, target, grams) VALUES (?, ?, ?)",
+                                (source, target, len(grams))).lastrowid
+        self.db.executemany("INSERT INTO grams (gram, entry) VALUES (?, ?)", ((g, entry) for g in grams))
+        return entry
+
+    def add_file(self, file: str, pairs: Iterable[Tuple[int, str, Optional[str]]]) -> int:
+        """ (idx, source, target) of one file; replaces what was indexed for it before """
+        self.db.execute("DELETE FROM locations WHERE file = ?", (file,))
+        count = 0
+        for idx, source, target in pairs:
+            entry = self._entry_id(source, target)
+            self.db.execute("INSERT OR REPLACE INTO locations (file, idx, entry) VALUES (?, ?, ?)",
+                            (file, idx, entry))
+            count += 1
+        self.db.commit()
+        return count
+
+    def prune(self):
+        # entries no file refers to any more
+        self.db.execute("DELETE FROM entries WHERE id NOT IN (SELECT entry FROM locations)")
+        self.db.execute("DELETE FROM grams WHERE entry NOT IN (SELECT id FROM entries)")
+        self.db.commit()
+
+    def lookup(self, source: str) -> Optional[str]:
+        row = self.db.execute("SELECT target FROM entries WHERE source = ?", (source,)).fetchone()
+        return row[0] if row else None
+
+    def locations(self, source: str) -> List[Tuple[str, int]]:
+        return self.db.execute(
+            "SELECT l.file, l.idx FROM locations l JOIN entries e ON e.id = l.entry "
+            "WHERE e.source = ? ORDER BY l.file, l.idx", (source,)).fetchall()
+
+    def fuzzy(self, text: str, limit: int = 5, min_score: float = 0.5) -> List[Tuple[float, str, Optional[str]]]:
+        """ [(score, source, target)] by trigram Dice coefficient, best first """
+        grams = list(text_grams(text))
+        marks = ",".join("?" * len(grams))
+        rows = self.db.execute(
+            f"SELECT e.source, e.target, e.grams, COUNT(*) FROM grams g JOIN entries e ON e.id = g.entry "
+            f"WHERE g.gram IN ({marks}) GROUP BY g.entry", grams).fetchall()
+        result = []
+        for source, target, entry_grams, common in rows:
+            score = 2.0 * common / (len(grams) + entry_grams)
+            if score >= min_score:
+                result.append((score, source, target))
+        result.sort(key=lambda r: (-r[0], r[1]))
+        return result[:limit]
+
+    def duplicates(self, min_count: int = 2) -> List[Tuple[str, int]]:
+        return self.db.execute(
+            "SELECT e.source, COUNT(*) AS n FROM locations l JOIN entries e ON e.id = l.entry "
+            "GROUP BY l.entry HAVING n >= ? ORDER BY n DESC, e.source", (min_count,)).fetchall()
+
+    def stats(self) -> Dict[str, int]:
+        one = lambda sql: self.db.execute(sql).fetchone()[0]
+        return {"entries": one("SELECT COUNT(*) FROM entries"),
+                "translated": one("SELECT COUNT(*) FROM entries WHERE target IS NOT NULL"),
+                "locations": one("SELECT COUNT(*) FROM locations"),
+                "files": one("SELECT COUNT(DISTINCT file) FROM locations")}
+
+def read_gxt_text_pairs(path: str) -> Iterator[Tuple[int, str, Optional[str]]]:
+    """ gxt2txt TXT (UTF-16, "GXT" header line) -> (string index, source, translation) """
+    with open(path, "rb") as file:
+        text = file.read().decode("utf-16", errors="replace").lstrip("\ufeff")
+    # only CR LF / LF separate strings (splitlines would also split on \x1c, \u2028 ...)
+    lines = text.replace("\r\n", "\n").split("\n")[1:]
+    if lines and lines[-1] == "":
+        lines.pop()
+    idx = 0
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith(";;;"):
+            target = lines[i + 1] if i + 1 < len(lines) and not lines[i + 1].startswith(";;;") else None
+            yield idx, line[3:], target
+            i += 1 if target is None else 2
+        else:
+            yield idx, line, None
+            i += 1
+        idx += 1
+
+def read_export_pairs(rom_wad_path: str, txt_dir: str) -> Iterator[Tuple[str, List[Tuple[int, str, Optional[str]]]]]:
+    """ ROM.WAD + TXT export of romwad_2way_tool.py -> (TXT name, [(idx, source, translation)]) """
+    import romwad_2way_tool as rw
+
+    txtp = Path(txt_dir)
+    manifest = json.loads((txtp / "_manifest.json").read_text(encoding="utf-8"))
+    with rw.open_wad(rom_wad_path) as data:
+        for m in manifest:
+            info = rw.parse_gxt(data, int(m["off"]), packed=True)
+            txt_file = txtp / m["file"]
+            if info is None:
+                continue
+            kv = rw.read_txt_kv(txt_file) if txt_file.exists() else {}
+            pairs = []
+            for si, cps in enumerate(info["cps"]):
+                pairs.append((si, rw.string_to_txt(cps, si == info["num"] - 1), kv.get(si)))
+            yield m["file"], pairs
+
+def build(db_path: str, gxt_dirs: Iterable[str] = (), export: Optional[Tuple[str, str]] = None) -> Dict[str, int]:
+    with TranslationMemory(db_path) as tm:
+        for directory in gxt_dirs:
+            for path in sorted(Path(directory).glob("*.txt")):
+                tm.add_file(path.name, read_gxt_text_pairs(str(path)))
+        if export:
+            for name, pairs in read_export_pairs(*export):
+                tm.add_file(name, pairs)
+        tm.prune()
+        return tm.stats()
+
+def main():
+    ap = argparse.ArgumentParser(description="GXT translation memory")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("build", help="index TXT files into DB")
+    p.add_argument("db")
+    p.add_argument("--gxt-dir", action="append", default=[], help="gxt2txt TXT directory (repeatable)")
+    p.add_argument("--export", nargs=2, metavar=("ROM_WAD", "TXT_DIR"), help="romwad_2way_tool export")
+    p = sub.add_parser("lookup", help="exact match")
+    p.add_argument("db")
+    p.add_argument("text")
+    p = sub.add_parser("fuzzy", help="trigram match")
+    p.add_argument("db")
+    p.add_argument("text")
+    p.add_argument("--limit", type=int, default=5)
+    p.add_argument("--min-score", type=float, default=0.5)
+    p = sub.add_parser("dups", help="strings occurring in several places")
+    p.add_argument("db")
+    p.add_argument("--min", type=int, default=2)
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        print(build(args.db, args.gxt_dir, tuple(args.export) if args.export else None))
+        return
+    if not os.path.exists(args.db):
+        ap.error(f'"{args.db}" not found')
+    with TranslationMemory(args.db) as tm:
+        if args.cmd == "lookup":
+            print(f"target: {tm.lookup(args.text)}")
+            for file, idx in tm.locations(args.text):
+                print(f"  {file}:{idx}")
+        elif args.cmd == "fuzzy":
+            for score, source, target in tm.fuzzy(args.text, args.limit, args.min_score):
+                print(f"{score:.2f}  {source}" + (f"  =>  {target}" if target is not None else ""))
+        else:
+            for source, n in tm.duplicates(args.min):
+                print(f"{n:4}  {source}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Machine-translation stage for gxt2txt.py (ADD_TRANSLATED_TEXT).
+
+Source strings from every file are collected first, deduplicated, looked up in
+an on-disk cache keyed by (text, lang), and only the misses are sent to the
+backend in batches over one pooled session with a bounded number of workers.
+"""
+
+import json
+import os
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+YANDEX_URL = "https://translate.yandex.net/api/v1.5/tr/translate"
+CACHE_PATH = "translations.cache.json"
+
+# Yandex accepts several "text" fields per request, up to ~10k characters in the body
+MAX_BATCH_STRINGS = 64
+MAX_BATCH_CHARS = 8000
+MAX_WORKERS = 4
+TIMEOUT = 30
+
+class YandexBackend:
+    """
+    Backend interface: translate_batch(texts) -> list of the same length.
+    base_url can point at a local stub server with the same API.
+    """
+    def __init__(self, api_key: str, lang: str = "", base_url: str = YANDEX_URL,
+                 max_workers: int = MAX_WORKERS, timeout: float = TIMEOUT):
+        self.api_key = api_key
+        self.lang = lang
+        self.base_url = base_url
+        self.timeout = timeout
+        # optional dependency, only needed when ONLINE_TRANSLATING_KEY is set
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=2)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def translate_batch(self, texts: List[str]) -> List[str]:
+        data = [("key", self.api_key), ("format", "plain")]
+        if self.lang:
+            data.append(("lang", self.lang))
+        data += [("text", text) for text in texts]
+        # POST form body: URL-encoded by requests, no URL length limit
+        response = self.session.post(self.base_url, data=data, timeout=self.timeout)
+        response.raise_for_status()
+        result = [node.text or "" for node in ET.fromstring(response.content).iter("text")]
+        if len(result) != len(texts):
+            raise ValueError(f"expected {len(texts)} translations, got {len(result)}")
+        return result
+
+    def close(self):
+        self.session.close()
+
+class TranslationCache:
+    """ Persistent {lang: {text: translation}} stored as JSON (UTF-8). """
+    def __init__(self, path: Optional[str] = CACHE_PATH):
+        self.path = path
+        self.entries: Dict[str, Dict[str, str]] = {}
+        self.dirty = False
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    self.entries = json.load(file)
+            except (OSError, ValueError):
+                print(f'Translation cache ("{path}") is unreadable, starting empty')
+                self.entries = {}
+
+    def get(self, text: str, lang: str) -> Optional[str]:
+        return self.entries.get(lang, {}).get(text)
+
+    def put_many(self, pairs: Iterable[Tuple[str, str]], lang: str):
+        with self.lock:
+            self.entries.setdefault(lang, {}).update(pairs)
+            self.dirty = True
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.entries, file, ensure_ascii=False, indent=0, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+def make_batches(texts: List[str], max_strings: int = MAX_BATCH_STRINGS,
+                 max_chars: int = MAX_BATCH_CHARS) -> Iterator[List[str]]:
+    batch: List[str] = []
+    chars = 0
+    for text in texts:
+        if batch and (len(batch) >= max_strings or chars + len(text) > max_chars):
+            yield batch
+            batch, chars = [], 0
+        batch.append(text)
+        chars += len(text)
+    if batch:
+        yield batch
+
+class Translator:
+    def __init__(self, backend, lang: str = "", cache: Optional[TranslationCache] = None,
+                 max_workers: int = MAX_WORKERS):
+        self.backend = backend
+        self.lang = lang
+        self.cache = cache if cache is not None else TranslationCache(None)
+        self.max_workers = max(1, max_workers)
+
+    def translate_all(self, texts: Iterable[str]) -> Dict[str, str]:
+        """
+        Returns {text: translation} for every distinct input. Failed batches
+        are reported and left out, so callers fall back to the source text.
+        """
+        unique = list(dict.fromkeys(texts))
+        result: Dict[str, str] = {}
+        missing: List[str] = []
+        for text in unique:
+            cached = self.cache.get(text, self.lang) if text.strip() else text
+            if cached is None:
+                missing.append(text)
+            else:
+                result[text] = cached
+
+        def run(batch: List[str]) -> List[Tuple[str, str]]:
+            try:
+                pairs = list(zip(batch, self.backend.translate_batch(batch)))
+            except Exception as e:
+                print(f"Translation failed ({len(batch)} strings): {e}")
+                return []
+            self.cache.put_many(pairs, self.lang)
+            return pairs
+
+        if missing:
+            batches = list(make_batches(missing))
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+                for pairs in pool.map(run, batches):
+                    result.update(pairs)
+            self.cache.save()
+        return result
+
+    def translate(self, text: str) -> str:
+        return self.translate_all([text]).get(text, text)
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Giải mã font NDS (nds/fonts/*.bin) + render ảnh xem trước, không cần PIL / numpy.
+
+  python nds_font.py atlas fonts/gtafont.bin gtafont.png [--scale 2]
+  python nds_font.py text fonts/helv_16x16.bin "Xin chao~n~the gioi" out.png
+  python nds_font.py preview fonts/gtafont.bin export_txt preview_png [--max-width 240]
+
+Định dạng (đoán từ 3 font trong fonts/, khớp với *_preview.png):
+  u16 số bảng, u16 số glyph, rồi mỗi bảng: số glyph x (u8 width, u8 cờ, u16 offset).
+  - width: bước tiến (pixel) của glyph. Cờ bit 1: bitmap rộng width-1 cột (cột cuối là khoảng
+    cách, không lưu); bit 0: 2 bit / pixel (4 mức: 0 nền, 1 bóng nhạt, 2, 3 đậm), ngược lại 1 bit.
+  - Bitmap: các dải cao 8 pixel (gtafont 1 dải, *16x16 2 dải); mỗi dải lưu lần lượt từng cột,
+    1 cột = 8 pixel x bpp bit (LSB = hàng trên cùng), dải sau nối tiếp dải trước.
+  - Glyph thấp hơn font (pricedown: dấu câu) chỉ lưu các hàng có; số hàng = byte / cột, phần nằm
+    trong mỗi dải 8 pixel lưu riêng. Cờ bit 0 => canh trên, không => canh dưới.
+  - offset tính từ 1 gốc lệch (0x7C) so với đầu file: gốc = offset nhỏ nhất - hết bảng glyph.
+  - Số byte của glyph = khoảng cách tới offset kế tiếp; số dải + bpp cả font đoán từ đó (infer_layout).
+  - Chỉ dùng bảng đầu (như text_width.py); bảng thứ 2 của font 16x16 chưa rõ ý nghĩa.
+
+Giải mã cả font 1 lần vào 1 bytearray (NdsFont.pixels, mỗi glyph width x height pixel 0..3 theo hàng,
+đã gồm cột khoảng cách): bit -> pixel qua bảng tra 256 phần tử (b"".join(map(...)), chuyển cột ->
+hàng bằng slice bước 8. Render 1 dòng text = nối các slice hàng của glyph (bytes.join), đổi màu bằng
+bytes.translate; ghi PNG xám 8 bit (zlib) hoặc PGM.
+Symbol -> glyph như text_width.py: glyph i <=> symbol 0x20 + i (sau encode_text_to_units).
+"""
+
+from __future__ import annotations
+import argparse
+import struct
+import sys
+import zlib
+from array import array
+from collections import Counter
+from pathlib import Path
+
+import romwad_2way_tool as rw
+
+FIRST_SYMBOL = 0x20
+TAG_FIRST = 0xFEF0
+BAND = 8
+RECORD = struct.Struct("<BBH")
+COLUMNS = 16  # glyph mỗi hàng của atlas
+
+# 1 byte bitmap -> pixel 0..3 của các hàng liên tiếp trong 1 cột
+_EXPAND1 = [bytes(3 if b >> r & 1 else 0 for r in range(8)) for b in range(256)]
+_EXPAND2 = [bytes(b >> (2 * r) & 3 for r in range(4)) for b in range(256)]
+# pixel 0..3 -> mức xám (nền trắng, 3 = đen)
+GRAY = bytes.maketrans(bytes(range(5)), b"\xff\xaa\x55\x00\xd0")
+MISSING = 4  # ô của symbol thiếu glyph
+
+def glyph_sizes(records: list[tuple[int, int, int]], data_end: int) -> list[int]:
+    """Số byte bitmap của từng glyph = khoảng cách tới offset khác kế tiếp (glyph cuối: tới hết file)."""
+    spans = sorted(set(off for _, _, off in records)) + [data_end]
+    nxt = dict(zip(spans, spans[1:]))
+    return [nxt[off] - off for _, _, off in records]
+
+def infer_layout(records: list[tuple[int, int, int]], sizes: list[int]) -> tuple[int, bool]:
+    """
+    (số dải 8 pixel, mọi glyph 2 bit / pixel?) đoán từ kích thước bitmap.
+    Chiều cao = số hàng (byte / cột, theo bpp của cờ) gặp nhiều nhất; có glyph 1 bit cao hơn font
+    => cả font 2 bit / pixel (pricedown: chữ bóng đổ, cờ bit 0 chỉ còn là canh trên).
+    """
+    votes: Counter = Counter()
+    for (w, flags, _), size in zip(records, sizes):
+        cols = _columns(w, flags)
+        if cols and size:
+            votes[size // cols * BAND // (2 if flags & 1 else 1)] += 1
+    if not votes:
+        return 1, False
+    bands = max(1, -(-votes.most_common(1)[0][0] // BAND))
+    return bands, any(rows > bands * BAND for rows in votes)
+
+def _columns(w: int, flags: int) -> int:
+    return max(w - 1, 0) if flags & 2 else w
+
+class NdsFont:
+    """
+    Font NDS đã giải mã: glyph i ở pixels[starts[i]:starts[i] + widths[i] * height], theo hàng.
+
+        font = NdsFont.load("fonts/gtafont.bin")
+        w, rows = font.render_lines(["HELLO"])
+    """
+    __slots__ = ("name", "height", "widths", "starts", "pixels", "first_symbol")
+
+    def __init__(self, name: str, height: int, widths: bytes, starts: array, pixels: bytearray,
+                 first_symbol: int = FIRST_SYMBOL):
+        self.name = name
+        self.height = height
+        self.widths = widths
+        self.starts = starts
+        self.pixels = pixels
+        self.first_symbol = first_symbol
+
+    @classmethod
+    def parse(cls, data: bytes, name: str = "", bands: int | None = None,
+              first_symbol: int = FIRST_SYMBOL) -> "NdsFont":
+        if len(data) < 4:
+            raise ValueError(f"{name}: file font quá ngắn")
+        tables, count = struct.unpack_from("<HH", data)
+        table_end = 4 + 4 * tables * count
+        if not 1 <= tables <= 4 or table_end > len(data):
+            raise ValueError(f"{name}: không phải font NDS")
+        records = list(RECORD.iter_unpack(data[4:4 + 4 * count]))
+        offs = [off for w, _, off in records if w]
+        base = (min(offs) - table_end) if offs else 0
+        sizes = glyph_sizes(records, len(data) + base)
+        guess, all_2bpp = infer_layout(records, sizes)
+        height = (bands or guess) * BAND
+        starts = array("I")
+        pixels = bytearray()
+        for (w, flags, off), size in zip(records, sizes):
+            starts.append(len(pixels))
+            pixels += _decode_glyph(data, off - base, w, flags, size, height, all_2bpp)
+        return cls(name, height, bytes(w for w, _, _ in records), starts, pixels, first_symbol)
+
+    @classmethod
+    def load(cls, path: str | Path, bands: int | None = None) -> "NdsFont":
+        path = Path(path)
+        return cls.parse(path.read_bytes(), path.name, bands)
+
+    def __len__(self) -> int:
+        return len(self.widths)
+
+    def glyph_rows(self, i: int) -> list[memoryview]:
+        w, s = self.widths[i], self.starts[i]
+        mv = memoryview(self.pixels)
+        return [mv[s + r * w:s + (r + 1) * w] for r in range(self.height)]
+
+    def glyph_index(self, sym: int) -> int | None:
+        i = sym - self.first_symbol
+        return i if 0 <= i < len(self.widths) else None
+
+    # ----- render -----
+    def render_units(self, units) -> tuple[int, list[bytes]]:
+        """1 dòng symbol (không có 0x0A) -> (width, các hàng pixel 0..MISSING)."""
+        h = self.height
+        mv = memoryview(self.pixels)
+        widths, starts = self.widths, self.starts
+        parts: list[tuple[int, int]] = []  # (start, width) trong pixels; start < 0: ô thiếu glyph
+        for sym in units:
+            if sym >= TAG_FIRST:
+                continue
+            i = self.glyph_index(sym)
+            if i is None:
+                parts.append((-1, max(4, h // 2)))
+            else:
+                parts.append((starts[i], widths[i]))
+        rows = []
+        for r in range(h):
+            edge = r == 1 or r == h - 2
+            rows.append(b"".join(
+                mv[s + r * w:s + (r + 1) * w] if s >= 0 else _missing_row(w, edge, 0 < r < h - 1)
+                for s, w in parts))
+        return sum(w for _, w in parts), rows
+
+    def render_lines(self, lines: list[str], gap: int = 1, max_width: int | None = None
+                     ) -> tuple[int, list[bytes]]:
+        """
+        Các string TXT (token ~n~, ~#HEX~ ... như import) -> 1 ảnh: (width, hàng pixel).
+        max_width: kẻ vạch dọc tại cột đó để thấy dòng nào vượt.
+        """
+        blocks = []
+        for text in lines:
+            units = rw.encode_text_cached(text)
+            line: list[int] = []
+            for u in list(units) + [0x0A]:
+                if u == 0x0A:
+                    blocks.append(self.render_units(line))
+                    line = []
+                else:
+                    line.append(u)
+        width = max([w for w, _ in blocks] + [max_width + 1 if max_width else 1])
+        out: list[bytes] = []
+        blank = bytes(width)
+        for w, rows in blocks:
+            pad = bytes(width - w)
+            out += [row + pad for row in rows]
+            out += [blank] * gap
+        if max_width:
+            out = [row[:max_width] + (b"\1" if row[max_width] == 0 else row[max_width:max_width + 1])
+                   + row[max_width + 1:] for row in out]
+        return width, out
+
+    def render_atlas(self, columns: int = COLUMNS, pad: int = 2) -> tuple[int, list[bytes]]:
+        """Mọi glyph theo lưới columns cột, mỗi ô rộng = glyph rộng nhất + pad."""
+        cw = max(self.widths, default=1) + pad
+        width = cw * columns
+        out: list[bytes] = []
+        for first in range(0, len(self), columns):
+            cells = [(self.glyph_rows(i), cw - self.widths[i]) for i in range(first, min(first + columns, len(self)))]
+            for r in range(self.height):
+                out.append(b"".join(bytes(rows[r]) + bytes(extra) for rows, extra in cells).ljust(width, b"\0"))
+            out += [bytes(width)] * pad
+        return width, out
+
+def _decode_glyph(data: bytes, pos: int, w: int, flags: int, size: int, height: int,
+                  all_2bpp: bool = False) -> bytes:
+    """Bitmap 1 glyph (size byte) -> w x height pixel 0..3 theo hàng (cột khoảng cách = 0)."""
+    cols = _columns(w, flags)
+    if not cols:
+        return bytes(w * height)
+    bpp = 2 if flags & 1 or all_2bpp else 1
+    per_byte = BAND // bpp
+    # glyph thấp hơn font: cờ bit 0 => canh trên, không => canh dưới (dấu phẩy, gạch ngang ...)
+    glyph_h = min(size // cols * per_byte, height)
+    top = 0 if flags & 1 else height - glyph_h
+    blank = bytes(w)
+    rows = [blank] * top
+    # dải 8 pixel tuyệt đối: phần glyph nằm trong mỗi dải lưu riêng, từng cột
+    for band_top in range(top - top % BAND, top + glyph_h, BAND):
+        n = min(band_top + BAND, top + glyph_h) - max(band_top, top)
+        span = cols * n // per_byte
+        chunk = data[pos:pos + span].ljust(span, b"\0")
+        pos += span
+        # theo cột: n pixel liên tiếp / cột -> hàng j = slice bước n
+        colmajor = b"".join(map((_EXPAND2 if bpp == 2 else _EXPAND1).__getitem__, chunk))
+        spacing = bytes(w - cols)
+        rows += [colmajor[j::n] + spacing for j in range(n)]
+    rows += [blank] * (height - len(rows))
+    return b"".join(rows)
+
+def _missing_row(w: int, edge: bool, inside: bool) -> bytes:
+    """1 hàng của ô rỗng (khung) thay cho symbol thiếu glyph."""
+    if edge:
+        return b"\0" + bytes([MISSING]) * (w - 2) + b"\0"
+    if inside:
+        return b"\0" + bytes([MISSING]) + bytes(w - 4) + bytes([MISSING]) + b"\0"
+    return bytes(w)
+
+# =======================
+#  Ghi ảnh
+# =======================
+def scale_rows(rows: list[bytes], scale: int) -> list[bytes]:
+    if scale <= 1:
+        return rows
+    rep = [bytes([v]) * scale for v in range(256)]
+    out = []
+    for row in rows:
+        big = b"".join(map(rep.__getitem__, row))
+        out += [big] * scale
+    return out
+
+def write_image(path: str | Path, width: int, rows: list[bytes], scale: int = 1):
+    """rows: pixel 0..MISSING -> PNG xám 8 bit (hoặc PGM nếu đuôi .pgm)."""
+    rows = [row.translate(GRAY) for row in scale_rows(rows, scale)]
+    width *= max(scale, 1)
+    path = Path(path)
+    if path.suffix.lower() == ".pgm":
+        path.write_bytes(b"P5 %d %d 255\n" % (width, len(rows)) + b"".join(rows))
+        return
+
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    raw = b"".join(b"\0" + row for row in rows)
+    path.write_bytes(b"\x89PNG\r\n\x1a\n"
+                     + chunk(b"IHDR", struct.pack(">IIBBBBB", width, len(rows), 8, 0, 0, 0, 0))
+                     + chunk(b"IDAT", zlib.compress(raw, 6))
+                     + chunk(b"IEND", b""))
+
+def preview_dir(font: NdsFont, txt_dir: str | Path, out_dir: str | Path, max_width: int | None = None,
+                scale: int = 1) -> int:
+    """Mỗi TXT -> 1 PNG gồm mọi string (tiền tố "N: "). Trả về số string đã render."""
+    import text_width
+    outp = Path(out_dir)
+    outp.mkdir(parents=True, exist_ok=True)
+    n = 0
+    for txt in text_width.iter_txt_files(Path(txt_dir)):
+        strings = text_width.read_strings(txt)
+        if not strings:
+            continue
+        width, rows = font.render_lines([f"{si}: {text}" for si, text in strings.items()], gap=2,
+                                        max_width=max_width)
+        write_image(outp / (txt.stem + ".png"), width, rows, scale)
+        n += len(strings)
+    return n
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Giải mã font NDS, render atlas / text ra PNG")
+    ap.add_argument("--bands", type=int, help="số dải 8 pixel (mặc định đoán từ file)")
+    ap.add_argument("--scale", type=int, default=1, help="phóng to N lần")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("atlas", help="mọi glyph ra 1 ảnh (16 glyph / hàng)")
+    p.add_argument("font")
+    p.add_argument("out")
+    p = sub.add_parser("text", help="render 1 string TXT")
+    p.add_argument("font")
+    p.add_argument("text")
+    p.add_argument("out")
+    p = sub.add_parser("preview", help="render mọi string trong thư mục TXT, 1 PNG / TXT")
+    p.add_argument("font")
+    p.add_argument("txt_dir")
+    p.add_argument("out_dir")
+    p.add_argument("--max-width", type=int, help="kẻ vạch tại độ rộng dòng tối đa")
+    args = ap.parse_args(argv)
+
+    try:
+        font = NdsFont.load(args.font, args.bands)
+    except ValueError as e:
+        print(f"[!] {e}")
+        return 1
+    if args.cmd == "atlas":
+        write_image(args.out, *font.render_atlas(), scale=args.scale)
+        print(f"[OK] {font.name}: {len(font)} glyph, cao {font.height}px -> {args.out}")
+    elif args.cmd == "text":
+        write_image(args.out, *font.render_lines([args.text]), scale=args.scale)
+        print(f"[OK] -> {args.out}")
+    else:
+        n = preview_dir(font, args.txt_dir, args.out_dir, args.max_width, args.scale)
+        print(f"[OK] {n} string -> {args.out_dir}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Đọc / ghi file bên trong image .nds (header + FNT/FAT), không cần unpack ra thư mục.
+
+  python nds_rom.py list game.nds
+  python nds_rom.py extract game.nds ROM.WAD ROM.WAD      (stream ra file, không đọc cả image vào RAM)
+  python nds_rom.py replace game.nds ROM.TOC rom_nw.toc    (ghi đè tại chỗ trong image, sửa FAT)
+
+romwad_2way_tool.py nhận thẳng file .nds thay cho ROM.WAD (export / import / verify / list / plan):
+ROM.WAD được đọc qua mmap của cả image (memoryview cắt đúng vùng file, zero-copy), ROM.TOC đọc từ
+image; import copy .nds gốc rồi vá DS_GXT tại chỗ trong bản copy.
+
+Header (offset trong image): 0x40 FNT offset, 0x44 FNT size, 0x48 FAT offset, 0x4C FAT size.
+  FAT: mỗi file 1 cặp u32 (start, end) tuyệt đối trong image.
+  FNT: bảng thư mục chính (8 byte / thư mục: u32 offset bảng con, u16 file id đầu tiên, u16 thư
+  mục cha), bảng con: byte độ dài (bit 0x80 = thư mục) + tên, thư mục thêm u16 id (0xF000+).
+Thay file chỉ sửa FAT (không nằm trong vùng CRC của header) và chỉ khi file mới vừa chỗ trống
+trước file kế tiếp trong image: không dời file khác.
+"""
+
+from __future__ import annotations
+import argparse
+import mmap
+import shutil
+import struct
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+HEADER_SIZE = 0x200
+FNT_FAT = struct.Struct("<IIII")  # tại 0x40
+FAT_ENTRY = struct.Struct("<II")
+DIR_ENTRY = struct.Struct("<IHH")
+ROOT_DIR = 0xF000
+_CHUNK = 1 << 20
+
+def is_nds(path: str | Path) -> bool:
+    return Path(path).suffix.lower() == ".nds"
+
+def parse_fnt(rom, fnt_off: int, fnt_size: int) -> dict[str, int]:
+    """{đường dẫn "dir/file": file id} từ FNT."""
+    fnt = bytes(rom[fnt_off:fnt_off + fnt_size])
+    files: dict[str, int] = {}
+    stack = [(ROOT_DIR, "")]
+    seen = set()
+    while stack:
+        dir_id, prefix = stack.pop()
+        if dir_id in seen:
+            continue  # FNT hỏng: tránh lặp vô hạn
+        seen.add(dir_id)
+        sub_off, file_id, _ = DIR_ENTRY.unpack_from(fnt, (dir_id - ROOT_DIR) * DIR_ENTRY.size)
+        p = sub_off
+        while p < len(fnt) and fnt[p]:
+            kind, n = fnt[p] & 0x80, fnt[p] & 0x7F
+            name = fnt[p + 1:p + 1 + n].decode("ascii", "replace")
+            p += 1 + n
+            if kind:
+                stack.append((struct.unpack_from("<H", fnt, p)[0], f"{prefix}{name}/"))
+                p += 2
+            else:
+                files[prefix + name] = file_id
+                file_id += 1
+    return files
+
+class NdsImage:
+    """
+    Bảng file của 1 image .nds. rom: bytes / mmap của cả image (chỉ đọc header, FNT, FAT).
+
+        img = NdsImage.open("game.nds")
+        start, end = img.span("ROM.WAD")
+    """
+
+    def __init__(self, rom):
+        if len(rom) < HEADER_SIZE:
+            raise ValueError("Không phải image .nds (quá ngắn)")
+        self.title = bytes(rom[0:12]).rstrip(b"\0").decode("ascii", "replace")
+        self.code = bytes(rom[12:16]).decode("ascii", "replace")
+        self.fnt_off, self.fnt_size, self.fat_off, self.fat_size = FNT_FAT.unpack_from(rom, 0x40)
+        if self.fnt_off + self.fnt_size > len(rom) or self.fat_off + self.fat_size > len(rom):
+            raise ValueError("Header .nds không hợp lệ (FNT/FAT nằm ngoài image)")
+        self.size = len(rom)
+        self.fat = [FAT_ENTRY.unpack_from(rom, self.fat_off + i * FAT_ENTRY.size)
+                    for i in range(self.fat_size // FAT_ENTRY.size)]
+        self.files = parse_fnt(rom, self.fnt_off, self.fnt_size)
+        # tra theo tên file không phân biệt hoa thường, kể cả khi nằm trong thư mục con
+        self._by_name: dict[str, str] = {}
+        for path in self.files:
+            self._by_name.setdefault(path.lower(), path)
+            self._by_name.setdefault(path.rsplit("/", 1)[-1].lower(), path)
+
+    @classmethod
+    def open(cls, path: str | Path) -> "NdsImage":
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return cls(mm)
+
+    def find(self, name: str) -> str | None:
+        """Đường dẫn đầy đủ của file (tên hoặc đường dẫn, không phân biệt hoa thường)."""
+        return self._by_name.get(name.lower())
+
+    def span(self, name: str) -> tuple[int, int]:
+        path = self.find(name)
+        if path is None:
+            raise FileNotFoundError(f"Không có {name} trong image .nds")
+        return self.fat[self.files[path]]
+
+    def room(self, name: str) -> int:
+        """Số byte tối đa file name có thể chiếm mà không đè lên file kế tiếp (hoặc FNT/FAT)."""
+        start, _ = self.span(name)
+        limit = self.size
+        for a, b in self.fat:
+            if b > a and a > start:
+                limit = min(limit, a)
+        for a in (self.fnt_off, self.fat_off):
+            if a > start:
+                limit = min(limit, a)
+        return limit - start
+
+def wad_span(path: str | Path, name: str = "ROM.WAD") -> tuple[int, int]:
+    return NdsImage.open(path).span(name)
+
+def read_file(path: str | Path, name: str) -> bytes | None:
+    """Nội dung 1 file nhỏ trong image (vd ROM.TOC), None nếu không có."""
+    img = NdsImage.open(path)
+    if img.find(name) is None:
+        return None
+    start, end = img.span(name)
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start)
+
+@contextmanager
+def open_file(path: str | Path, name: str, writable: bool = False):
+    """
+    memoryview đúng vùng file name trong mmap của cả image (zero-copy). writable=True: ghi
+    thẳng vào image (chỉ ghi đè, không đổi kích thước file).
+    """
+    start, end = wad_span(path, name)
+    with open(path, "r+b" if writable else "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        view = memoryview(mm)[start:end]
+        try:
+            yield view
+            if writable:
+                mm.flush()
+        finally:
+            view.release()
+            mm.close()
+
+def extract(path: str | Path, name: str, out_path: str | Path) -> int:
+    """Stream file name ra out_path theo từng khúc 1 MiB. Trả về số byte."""
+    start, end = wad_span(path, name)
+    with open(path, "rb") as src, open(out_path, "wb") as dst:
+        src.seek(start)
+        left = end - start
+        while left:
+            chunk = src.read(min(_CHUNK, left))
+            if not chunk:
+                raise ValueError(f"{Path(path).name}: image bị cắt cụt trong {name}")
+            dst.write(chunk)
+            left -= len(chunk)
+    return end - start
+
+def replace(path: str | Path, name: str, src_path: str | Path):
+    """Ghi src_path đè lên file name trong image tại chỗ và sửa end trong FAT."""
+    img = NdsImage.open(path)
+    start, _ = img.span(name)
+    size = Path(src_path).stat().st_size
+    if size > img.room(name):
+        raise ValueError(f"{name}: 0x{size:X} byte > 0x{img.room(name):X} byte trống trong image "
+                         "(cần công cụ đóng gói lại .nds)")
+    with open(path, "r+b") as dst, open(src_path, "rb") as src:
+        dst.seek(start)
+        shutil.copyfileobj(src, dst, _CHUNK)
+        dst.seek(img.fat_off + img.files[img.find(name)] * FAT_ENTRY.size + 4)
+        dst.write(struct.pack("<I", start + size))
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Liệt kê / lấy ra / thay file trong image .nds")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("list", help="liệt kê file (FNT/FAT)")
+    p.add_argument("nds")
+    p = sub.add_parser("extract", help="stream 1 file ra ngoài")
+    p.add_argument("nds")
+    p.add_argument("name")
+    p.add_argument("out")
+    p = sub.add_parser("replace", help="ghi đè 1 file tại chỗ (phải vừa chỗ trống)")
+    p.add_argument("nds")
+    p.add_argument("name")
+    p.add_argument("src")
+    args = ap.parse_args(argv)
+
+    try:
+        if args.cmd == "list":
+            img = NdsImage.open(args.nds)
+            print(f"[OK] {img.title} ({img.code}): {len(img.files)} file")
+            for path, fid in sorted(img.files.items(), key=lambda kv: img.fat[kv[1]][0]):
+                a, b = img.fat[fid]
+                print(f"{fid:5d}  0x{a:08X}-0x{b:08X}  0x{b - a:08X}  {path}")
+        elif args.cmd == "extract":
+            n = extract(args.nds, args.name, args.out)
+            print(f"[OK] {args.name}: 0x{n:X} byte -> {args.out}")
+        else:
+            replace(args.nds, args.name, args.src)
+            print(f"[OK] {args.src} -> {args.name} trong {args.nds}")
+    except (FileNotFoundError, ValueError) as e:
+        print(f"[!] {e}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
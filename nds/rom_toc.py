@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Đọc ROM.TOC (bảng mục lục của ROM.WAD) -> index tên -> (offset, size) cho từng entry.
+
+  python rom_toc.py ROM.WAD [ROM.TOC]          (in layout đoán được + so với scan DS_GXT)
+
+Chưa có tài liệu về định dạng ROM.TOC, nên layout được ĐOÁN từ chính dữ liệu: ROM.TOC là bảng record kích thước cố định (stride), mỗi record có 1 u32
+offset (đơn vị byte hoặc 0x200) trỏ vào ROM.WAD.
+  - Con trỏ: các u32 trong TOC mà (giá trị * đơn vị) rơi đúng chữ ký DS_GXT trong WAD; stride là
+    khoảng cách lớn nhất (<= 64 byte) mà >= 90% các vị trí đó cùng số dư; record đầu / cuối là dải
+    liên tục quanh chúng có offset khác 0 nằm trong WAD. Điểm đầu record (so với con trỏ) chọn theo
+    vị trí nào tìm được tên / size bên dưới.
+  - Size: u32 khác trong record bằng đúng kích thước DS_GXT (byte, hoặc số block 0x200) ở >= 90% entry.
+  - Tên: chuỗi ASCII kết thúc bằng null nằm trong record (cùng vị trí ở >= 90% record), nếu có.
+    Không có tên trong record thì dùng số thứ tự entry ("#00042"), vẫn ổn định giữa các lần build WAD
+    (khác idx theo thứ tự scan).
+Relocator sửa con trỏ / size của block bị dời theo layout này (TocIndex.set_entry).
+Layout không đoán được (vd TOC dùng hash / bảng tên riêng) => TocIndex.load trả về None,
+tool quay về scan cả WAD như cũ (Relocator quay về tìm u32 = offset).
+"""
+
+from __future__ import annotations
+import argparse
+import struct
+import sys
+from array import array
+from collections import Counter
+from pathlib import Path
+
+import ds_gxt
+
+UNITS = (1, 0x200)
+MAX_STRIDE = 64  # byte
+MIN_HITS = 3
+AGREE = 0.9
+
+class TocLayout:
+    __slots__ = ("start", "count", "stride", "ptr", "unit", "size", "size_unit", "name")
+
+    def __init__(self, start: int, count: int, stride: int, ptr: int, unit: int,
+                 size: int | None = None, size_unit: int = 1, name: int | None = None):
+        self.start = start        # byte offset của record đầu trong TOC
+        self.count = count
+        self.stride = stride      # byte mỗi record
+        self.ptr = ptr            # vị trí u32 offset trong record
+        self.unit = unit          # đơn vị offset (1 hoặc 0x200)
+        self.size = size          # vị trí u32 size trong record (None: không có)
+        self.size_unit = size_unit
+        self.name = name          # vị trí tên ASCII trong record (None: không có)
+
+    def to_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+class TocEntry:
+    __slots__ = ("index", "name", "off", "size")
+
+    def __init__(self, index: int, name: str, off: int, size: int | None):
+        self.index = index
+        self.name = name
+        self.off = off
+        self.size = size
+
+def _words(toc: bytes) -> array:
+    words = array("I")
+    words.frombytes(toc[:len(toc) // 4 * 4])
+    if sys.byteorder != "little":
+        words.byteswap()
+    return words
+
+def _is_gxt(wad, off: int) -> bool:
+    return wad[off:off + 6] == ds_gxt.SIG
+
+def _best_stride(hits: list[int]) -> tuple[int, int] | None:
+    """(stride, số dư) theo word: stride lớn nhất mà >= AGREE hit cùng số dư."""
+    for stride in range(MAX_STRIDE // 4, 0, -1):
+        residue, n = Counter(h % stride for h in hits).most_common(1)[0]
+        if n >= AGREE * len(hits):
+            return stride, residue
+    return None
+
+def _record_name(rec: bytes, pos: int) -> str | None:
+    end = rec.find(b"\0", pos)
+    if end <= pos or (pos and rec[pos - 1] != 0):
+        return None
+    name = rec[pos:end]
+    return name.decode("ascii") if all(0x20 < c < 0x7F for c in name) else None
+
+def infer_layout(toc: bytes, wad) -> TocLayout | None:
+    words = _words(toc)
+    n = len(wad)
+    best = None
+    for unit in UNITS:
+        hits = [i for i, v in enumerate(words) if v and v * unit + 8 <= n and _is_gxt(wad, v * unit)]
+        if len(hits) < MIN_HITS or (best and len(hits) <= len(best[1])):
+            continue
+        best = (unit, hits)
+    if best is None:
+        return None
+    unit, hits = best
+    found = _best_stride(hits)
+    if found is None:
+        return None
+    stride, residue = found
+    hits = [h for h in hits if h % stride == residue]
+
+    # dải record liên tục quanh các hit có offset khác 0 nằm trong WAD
+    in_wad = lambda i: 0 <= i < len(words) and 0 < words[i] * unit < n
+    first, last = hits[0], hits[-1]
+    while in_wad(first - stride):
+        first -= stride
+    while in_wad(last + stride):
+        last += stride
+    if not all(in_wad(i) for i in range(first, last + 1, stride)):
+        return None
+    count = (last - first) // stride + 1
+    ends = [(h, ds_gxt.gxt_end(wad, words[h] * unit)) for h in hits]
+    sizes = [(h, end - words[h] * unit) for h, end in ends if end is not None]
+
+    # record bắt đầu ở đâu so với con trỏ: thử mọi vị trí, ưu tiên layout có tên rồi có size
+    best_layout, best_score = None, None
+    for ptr in range(min(stride, first + 1)):
+        layout = TocLayout((first - ptr) * 4, count, stride * 4, ptr * 4, unit)
+        if layout.start + count * layout.stride > len(toc):
+            continue
+        _find_size(layout, words, sizes)
+        _find_name(layout, toc)
+        score = (layout.name is not None, layout.size is not None, -ptr)
+        if best_score is None or score > best_score:
+            best_layout, best_score = layout, score
+    return best_layout
+
+def _find_size(layout: TocLayout, words: array, sizes: list[tuple[int, int]]):
+    """size: u32 trong record = kích thước DS_GXT (byte hoặc block 0x200); sizes: [(word con trỏ, size)]."""
+    stride, ptr = layout.stride // 4, layout.ptr // 4
+    for j in range(stride):
+        if j == ptr or not sizes:
+            continue
+        for size_unit in UNITS:
+            ok = sum(1 for h, size in sizes if h - ptr + j < len(words)
+                     and words[h - ptr + j] == -(-size // size_unit))
+            if ok >= AGREE * len(sizes):
+                layout.size, layout.size_unit = j * 4, size_unit
+                return
+
+def _find_name(layout: TocLayout, toc: bytes):
+    """tên ASCII trong record (bỏ qua các u32 offset / size)"""
+    skip = {layout.ptr + k for k in range(4)} | ({layout.size + k for k in range(4)} if layout.size is not None else set())
+    records = [toc[layout.start + r * layout.stride:layout.start + (r + 1) * layout.stride] for r in range(layout.count)]
+    for pos in range(layout.stride):
+        if pos in skip:
+            continue
+        named = sum(1 for rec in records if _record_name(rec, pos) and not skip & set(range(pos, rec.find(b"\0", pos))))
+        if named >= AGREE * len(records):
+            layout.name = pos
+            return
+
+class TocIndex:
+    """Entry của ROM.TOC theo layout đoán được: tra theo tên / offset O(1)."""
+
+    def __init__(self, layout: TocLayout, entries: list[TocEntry]):
+        self.layout = layout
+        self.entries = entries
+        self.by_name = {e.name: e for e in entries}
+        self.by_off: dict[int, TocEntry] = {}
+        self.at_off: dict[int, list[TocEntry]] = {}  # mọi entry trỏ tới off (kể cả trùng)
+        for e in entries:
+            self.by_off.setdefault(e.off, e)
+            self.at_off.setdefault(e.off, []).append(e)
+
+    @classmethod
+    def parse(cls, toc: bytes, wad) -> "TocIndex | None":
+        layout = infer_layout(toc, wad)
+        if layout is None:
+            return None
+        entries = []
+        for r in range(layout.count):
+            rec = toc[layout.start + r * layout.stride:layout.start + (r + 1) * layout.stride]
+            off = struct.unpack_from("<I", rec, layout.ptr)[0] * layout.unit
+            size = struct.unpack_from("<I", rec, layout.size)[0] * layout.size_unit if layout.size is not None else None
+            name = (_record_name(rec, layout.name) if layout.name is not None else None) or f"#{r:05d}"
+            entries.append(TocEntry(r, name, off, size))
+        return cls(layout, entries)
+
+    @classmethod
+    def load(cls, toc_path: str | Path, wad) -> "TocIndex | None":
+        try:
+            toc = Path(toc_path).read_bytes()
+        except FileNotFoundError:
+            return None
+        return cls.parse(toc, wad)
+
+    def set_entry(self, toc: bytearray, e: TocEntry, off: int, size: int | None = None) -> list[tuple[int, int]]:
+        """
+        Ghi offset (và size nếu layout có trường size) mới của entry e vào toc (bytearray cùng
+        layout). Trả về các vùng [(start, end)] đã ghi trong toc.
+        """
+        lay = self.layout
+        rec = lay.start + e.index * lay.stride
+        if off % lay.unit:
+            raise ValueError(f"offset 0x{off:X} không chia hết đơn vị 0x{lay.unit:X} của ROM.TOC")
+        struct.pack_into("<I", toc, rec + lay.ptr, off // lay.unit)
+        written = [(rec + lay.ptr, rec + lay.ptr + 4)]
+        e.off = off
+        if size is not None and lay.size is not None:
+            struct.pack_into("<I", toc, rec + lay.size, -(-size // lay.size_unit))
+            written.append((rec + lay.size, rec + lay.size + 4))
+            e.size = size
+        return written
+
+    def name_of(self, off: int) -> str | None:
+        e = self.by_off.get(off)
+        return e.name if e else None
+
+    def gxt_entries(self, wad) -> list[TocEntry]:
+        """Entry trỏ vào 1 DS_GXT hợp lệ, theo offset tăng dần."""
+        return sorted((e for e in self.by_off.values() if _is_gxt(wad, e.off) and ds_gxt.gxt_end(wad, e.off)),
+                      key=lambda e: e.off)
+
+def default_toc_path(wad_path: str | Path) -> Path:
+    """ROM.TOC cạnh ROM.WAD (cùng tên, đuôi .TOC / .toc)."""
+    wad_path = Path(wad_path)
+    for suffix in (".TOC", ".toc"):
+        p = wad_path.with_suffix(suffix)
+        if p.exists():
+            return p
+    return wad_path.with_name("ROM.TOC")
+
+def main(argv: list[str] | None = None) -> int:
+    import romwad_2way_tool as rw
+
+    ap = argparse.ArgumentParser(description="Đoán layout ROM.TOC và so với scan DS_GXT của ROM.WAD")
+    ap.add_argument("wad")
+    ap.add_argument("toc", nargs="?", help="mặc định: ROM.TOC cạnh ROM.WAD")
+    ap.add_argument("--entries", action="store_true", help="in mọi entry")
+    args = ap.parse_args(argv)
+
+    toc_path = Path(args.toc) if args.toc else default_toc_path(args.wad)
+    with rw.open_wad(args.wad) as wad:
+        index = TocIndex.load(toc_path, wad)
+        if index is None:
+            print(f"[!] Không đoán được layout của {toc_path}")
+            return 1
+        print(f"[OK] Layout {toc_path.name}: " + ", ".join(f"{k}={v}" for k, v in index.layout.to_dict().items()))
+        if args.entries:
+            for e in index.entries:
+                print(f"{e.index:5d}  {e.name:<24} off=0x{e.off:08X}  size={'?' if e.size is None else f'0x{e.size:X}'}")
+        toc_gxt = {e.off for e in index.gxt_entries(wad)}
+        scan_gxt = {off for off, _ in rw.scan_gxt_blocks(wad)}
+        print(f"[OK] {len(index.entries)} entry, {len(toc_gxt)} DS_GXT theo TOC, {len(scan_gxt)} DS_GXT theo scan")
+        missing = sorted(scan_gxt - toc_gxt)
+        for off in missing[:20]:
+            print(f"[!] DS_GXT 0x{off:X} không có entry trong TOC")
+        if missing:
+            print(f"[!] {len(missing)} DS_GXT nằm ngoài TOC: không dùng --from-toc được cho WAD này")
+            return 1
+        print("[OK] TOC phủ mọi DS_GXT: dùng được --from-toc")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
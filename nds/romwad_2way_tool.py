@@ -11,39 +11,119 @@ Mục tiêu:
   - Tool luôn cập nhật lại length (u16) của string trong DS_GXT (nội bộ file GXT).
   - Khi import, tool chỉ ghi đè trong vùng đệm 0xAD NGAY SAU file DS_GXT (đến trước byte khác 0xAD).
     => Cho phép text dài hơn/nhỏ hơn *miễn là còn đủ padding 0xAD*.
-  - Tool KHÔNG dịch chuyển (move) các chunk khác trong ROM.WAD vì cấu trúc tổng thể của ROM.WAD
-    còn nhiều vùng dữ liệu xen kẽ (không phải toàn 0xAD). Nếu cần "move file" thực sự,
-    phải reverse-engineer thêm index/pointer tổng của WAD.
+  - Mặc định tool KHÔNG dịch chuyển (move) các chunk khác trong ROM.WAD vì cấu trúc tổng thể của ROM.WAD
+    còn nhiều vùng dữ liệu xen kẽ (không phải toàn 0xAD).
+  - relocate=True (cần rom_nw.toc): DS_GXT quá dài được dời sang vùng trống (best-fit: phần 0xAD thừa
+    sau các DS_GXT khác, vùng cũ của block đã dời) hoặc cuối WAD, rồi sửa con trỏ trong rom_nw.toc.
+    Con trỏ (+ trường size) lấy theo layout ROM.TOC đoán được (rom_toc.TocIndex); không đoán được
+    layout thì tìm u32 = offset (byte hoặc đơn vị 0x200) trong ROM.TOC và chỉ dời khi tìm được
+    DUY NHẤT 1 con trỏ. Không có con trỏ => giữ bản gốc như cũ.
 
 Token hỗ trợ trong TXT:
   - ~n~            : newline (0x000A)
   - ~#HEX~         : chèn trực tiếp codepoint u16 (vd ~#FF00~, ~#5C~)
   - <HEX>          : tương tự (~#HEX~) (vd <A9>, <FF0C>)
+  Export ghi ~#HEX~ cho mọi thứ không round-trip được nếu ghi thẳng: null, control, "~" / "<" thật
+  ghép thành token, khoảng trắng ở 2 đầu string (read_txt_kv strip), chữ thường ASCII ngoài bảng.
+  => Export rồi import không sửa TXT ra đúng WAD gốc (kiểm bằng lệnh verify).
 
-Lowercase custom mapping theo bảng bạn đưa:
+Lowercase custom mapping theo bảng bạn đưa ("gta cw.tbl", xem gxt_symbols.py):
   0x5C..0x75  <=>  a..z
 Uppercase giữ ASCII:
   0x41..0x5A  <=>  A..Z
 
+Biểu diễn packed (parse_gxt(..., packed=True)):
+  - Mỗi DS_GXT giữ 1 buffer u16 liên tục (array('H')) + bảng vị trí string (ds_gxt.GxtStrings),
+    thay vì list[list[int]]. Export/Import dùng dạng này. Đọc / build DS_GXT dùng chung codec
+    ds_gxt.py với gxt2txt.py.
+
 Xuất file:
   out_dir/0000_001CD200.txt ...
   out_dir/_manifest.json  (chứa off/raw_end/max_alloc ... dùng cho import)
 
+Import tăng dần (incremental=True, mặc định):
+  - _manifest.json ghi sha1 của từng TXT (lúc export / lúc import) và của vùng DS_GXT đã ghi.
+  - Import lần sau dùng lại rom_nw.wad cũ làm nền, chỉ build + vá các block có TXT thay đổi.
+  - String trùng nhau giữa các block chỉ encode 1 lần (encode_text_cached, LRU ENCODE_CACHE_SIZE string).
+    Translation memory / thống kê string trùng: xem gxt_tm.py.
+
+Song song (--jobs N):
+  - Mỗi block DS_GXT xử lý độc lập trên process pool (parse/decode/ghi TXT, hoặc đọc TXT/encode/build).
+  - Ghi vào rom_nw.wad vẫn do process chính làm theo thứ tự manifest => output giống hệt chạy tuần tự.
+
+Workspace / index cache:
+  - Workspace(ROM.WAD) scan DS_GXT + dải 0xAD 1 lần rồi lưu vào ROM.WAD.gxtidx.json cạnh WAD
+    (kèm size/mtime/sha1 mẫu của WAD để tự bỏ index khi WAD đổi). Export/plan/verify/list dùng index này;
+    plan / verify chỉ đọc index có sẵn, không ghi gì cạnh WAD;
+    strings của từng block chỉ parse khi truy cập (GxtBlock.strings / text()).
+  - ROM.TOC cạnh WAD (layout đoán tự động, xem rom_toc.py): mỗi block có tên entry, ghi vào
+    _manifest.json ("name"); import tìm lại block theo tên nếu offset trong WAD đổi.
+
+Watch (lệnh watch ROM_WAD TXT_DIR):
+  - Import 1 lần rồi giữ ROM.WAD / rom_nw.wad mmap, poll TXT_DIR; mỗi lần lưu TXT chỉ vá block của TXT đó.
+
+CLI / batch (không có lệnh con => menu hỏi đáp như cũ):
+  python romwad_2way_tool.py export ROM.WAD export_txt
+  python romwad_2way_tool.py -j 4 import ROM.WAD export_txt [--out rom_nw.wad --toc rom_nw.toc] [--relocate] [--full]
+  python romwad_2way_tool.py import ROM.WAD export_txt --patch build.wadpatch [--patch-only]  (xem wad_patch.py)
+  python romwad_2way_tool.py import ROM.WAD export_txt --fonts fonts_vi   (font theo fonts/report.json, xem font_assets.py)
+  python romwad_2way_tool.py plan ROM.WAD export_txt [--font fonts/x.bin --max-width 240]
+  python romwad_2way_tool.py -j 4 verify ROM.WAD      (round-trip mọi DS_GXT trong bộ nhớ)
+  python romwad_2way_tool.py list ROM.WAD
+  python romwad_2way_tool.py --from-toc export ROM.WAD export_txt   (DS_GXT theo ROM.TOC, không scan WAD)
+  python romwad_2way_tool.py watch ROM.WAD export_txt
+  python romwad_2way_tool.py export game.nds export_txt        (.nds thay cho ROM.WAD ở mọi lệnh, xem nds_rom.py)
+  python romwad_2way_tool.py import game.nds export_txt [--out game_nw.nds]
+  python romwad_2way_tool.py -j 4 batch jobs.json       (xem load_batch)
+  - Batch chạy mọi task trong 1 process: bảng symbol, cache encode và process pool dùng lại giữa các task.
+  - Mã thoát 1 nếu có task / TXT lỗi (plan: có TXT quá dài, verify: có block không round-trip được).
+
+mmap (mặc định bật, use_mmap=True):
+  - Export đọc ROM.WAD qua mmap, không nạp cả file vào RAM.
+  - Import copy ROM.WAD -> rom_nw.wad (copy ở mức kernel / reflink nếu FS hỗ trợ),
+    rồi mmap bản copy và chỉ ghi đè các vùng DS_GXT được vá.
+  - .nds: mmap cả image, ROM.WAD là memoryview cắt theo FAT; import copy image rồi vá tại chỗ
+    (không tách ROM.WAD / ROM.TOC ra file, không đóng gói lại image).
+
 """
 
 from __future__ import annotations
+import argparse
+import hashlib
 import json
+import os
 import re
+import shutil
 import struct
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
 
-SIG = b"DS_GXT"
-ALIGN = 0x200
-PAD_BYTE = 0xAD
+import ds_gxt
+import font_assets
+import gxt_symbols
+import nds_rom
+import rom_toc
+import wad_io
+import wad_patch
+
+SIG = ds_gxt.SIG
+ALIGN = wad_io.ALIGN
+PAD_BYTE = wad_io.PAD_BYTE
 
 TAG_RE = re.compile(r"~#([0-9A-Fa-f]{1,8})~")
 ALT_TAG_RE = re.compile(r"<([0-9A-Fa-f]{2,8})>")
 
+# bảng symbol dùng chung với gxt2txt.py (đọc từ "gta cw.tbl")
+SYMBOLS = gxt_symbols.DEFAULT
+# remap a..z -> lowercase custom cho cả string 1 lần (str.translate)
+ASCII_TO_LOWER = dict(SYMBOLS.unmap_table)
+
 def align_up(n: int, a: int = ALIGN) -> int:
     return (n + (a - 1)) & ~(a - 1)
 
@@ -59,156 +139,421 @@ def decode_symbol(cp: int) -> str:
     if cp > 0xFEEF:
         return f"~#{cp:X}~"
 
-    # A-Z
-    if 0x41 <= cp <= 0x5A:
-        return chr(cp)
+    # A-Z, a-z (custom 0x5C..0x75) theo "gta cw.tbl"
+    ch = SYMBOLS.symbol_map.get(cp)
+    if ch is not None:
+        return ch
 
-    # a-z (custom)
-    if 0x5C <= cp <= 0x75:
-        return chr(ord('a') + (cp - 0x5C))
+    # chữ thường ASCII không có trong bảng (0x76..0x7A): ghi chr() thì import sẽ remap sang symbol khác
+    if cp in ASCII_TO_LOWER:
+        return f"~#{cp:X}~"
 
     # ASCII printable
     if 0x20 <= cp < 0x7F:
         return chr(cp)
 
-    if cp == 0:
-        return ""
-
-    # fallback
-    if cp <= 0xFF:
-        return f"~#{cp:X}~"
-    try:
-        return chr(cp)
-    except ValueError:
+    # fallback: null, control, surrogate lẻ (không ghi được UTF-8), ký tự xuống dòng của splitlines()
+    if cp <= 0xFF or 0xD800 <= cp < 0xE000 or cp in (0x2028, 0x2029):
         return f"~#{cp:X}~"
+    return chr(cp)
 
-def encode_text_to_symbols(s: str) -> list[int]:
-    cps: list[int] = []
-    i = 0
-    while i < len(s):
-        if s.startswith("~n~", i):
-            cps.append(0x000A)
-            i += 3
-            continue
+units_from_bytes = ds_gxt.units_from_bytes
+units_to_bytes = ds_gxt.units_to_bytes
 
-        m = TAG_RE.match(s, i)
-        if m:
-            cps.append(int(m.group(1), 16))
-            i = m.end()
-            continue
+# Bảng decode dựng 1 lần từ decode_symbol: chỉ chứa các codepoint KHÁC chr(cp)
+# (~n~, ~#HEX~, "", a-z custom ...), dùng cho str.translate.
+DECODE_TABLE = {cp: sym for cp in range(0x10000) if (sym := decode_symbol(cp)) != chr(cp)}
 
-        m2 = ALT_TAG_RE.match(s, i)
-        if m2:
-            cps.append(int(m2.group(1), 16))
-            i = m2.end()
-            continue
+def decode_units(units) -> str:
+    """
+    Decode cả string (array('H') / list[int]) 1 lần: ds_gxt.units_to_str -> str.translate(DECODE_TABLE).
+    Kết quả giống hệt "".join(decode_symbol(cp) for cp in units).
+    """
+    if not isinstance(units, array):
+        units = array("H", units)
+    s = ds_gxt.units_to_str(units)
+    if len(s) != len(units) or "~" in s or "<" in s:
+        # cặp surrogate bị gộp thành 1 ký tự, hoặc có "~" / "<" thật -> decode từng unit
+        return _decode_each(units)
+    return s.translate(DECODE_TABLE)
+
+def _decode_each(units, edge: bool = False) -> str:
+    # edge=True: khoảng trắng 2 đầu string ghi dạng ~#HEX~ (read_txt_kv strip() 2 đầu dòng), làm
+    # TRƯỚC khi xét token vì ~#HEX~ thêm vào có thể ghép với "~" / "<" thật đứng trước thành token.
+    # "~" / "<" thật mà ghép với phần sau thành token (~n~, ~#HEX~, <HEX>) thì ghi ~#7E~ / ~#3C~,
+    # token dài nhất 11 ký tự và mỗi unit decode ra >= 1 ký tự nên chỉ cần xem 12 unit kế tiếp.
+    # Xét từ cuối về đầu: ~#3C~ / ~#7E~ vừa thêm phía sau cũng có thể ghép với "~" phía trước.
+    parts = [decode_symbol(cp) for cp in units]
+    if edge:
+        i, j = 0, len(parts)
+        while i < j and _is_edge_space(parts[i]):
+            parts[i] = f"~#{units[i]:X}~"
+            i += 1
+        while j > i and _is_edge_space(parts[j - 1]):
+            j -= 1
+            parts[j] = f"~#{units[j]:X}~"
+    for i in reversed(range(len(parts))):
+        cp = units[i]
+        if cp in (0x3C, 0x7E) and TOKEN_RE.match("".join(parts[i:i + 12])):
+            parts[i] = f"~#{cp:X}~"
+    return "".join(parts)
+
+def _is_edge_space(ch: str) -> bool:
+    return ch.isspace() or ch == "\ufeff"
 
-        ch = s[i]
-        if 'A' <= ch <= 'Z':
-            cps.append(ord(ch))
-        elif 'a' <= ch <= 'z':
-            cps.append(0x5C + (ord(ch) - ord('a')))
+def string_to_txt(cps, last: bool = False) -> str:
+    """
+    1 string DS_GXT -> giá trị 1 dòng TXT (last: string cuối, bỏ null kết thúc).
+    read_txt_kv strip() 2 đầu dòng nên khoảng trắng ở 2 đầu string được ghi dạng ~#HEX~.
+    """
+    if last and cps and cps[-1] == 0:
+        cps = cps[:-1]
+    s = decode_units(cps)
+    if s and (_is_edge_space(s[0]) or _is_edge_space(s[-1])):
+        # khoảng trắng ở đầu / cuối luôn là 1 unit decode ra đúng 1 ký tự (xem decode_symbol)
+        return _decode_each(cps, edge=True)
+    return s
+
+# 1 regex cho mọi token, thứ tự ưu tiên giống bản cũ: ~n~, ~#HEX~, <HEX>
+TOKEN_RE = re.compile(rf"~n~|{TAG_RE.pattern}|{ALT_TAG_RE.pattern}")
+
+def _split_tokens(s: str):
+    """Tách s thành các đoạn chữ thường (str, đã remap a..z) và codepoint của token (int)."""
+    pos = 0
+    for m in TOKEN_RE.finditer(s):
+        if m.start() > pos:
+            yield s[pos:m.start()].translate(ASCII_TO_LOWER)
+        yield 0x000A if m.lastindex is None else int(m.group(m.lastindex), 16)
+        pos = m.end()
+    if pos < len(s):
+        yield s[pos:].translate(ASCII_TO_LOWER)
+
+def encode_text_to_units(s: str) -> array:
+    """
+    Encode TXT -> array('H'). Đường nhanh: không có ~ hoặc < thì remap cả string 1 lần;
+    ngược lại tách token bằng TOKEN_RE, đoạn chữ thường giữa các token remap theo cả đoạn.
+    """
+    if "~" not in s and "<" not in s:
+        return units_from_bytes(s.translate(ASCII_TO_LOWER).encode("utf-16-le", "surrogatepass"))
+    units = array("H")
+    for part in _split_tokens(s):
+        if isinstance(part, int):
+            units.append(part)
         else:
-            cps.append(ord(ch))
-        i += 1
+            units.extend(units_from_bytes(part.encode("utf-16-le", "surrogatepass")))
+    return units
+
+# string lặp lại giữa các TXT / block (vd "NOT USED", câu nhắc nhiệm vụ) chỉ encode 1 lần;
+# build_gxt không sửa array truyền vào nên dùng chung được (người gọi không được sửa array trả về).
+# Giới hạn số string: watch / batch chạy lâu không giữ mãi mọi bản sửa của mọi string.
+ENCODE_CACHE_SIZE = 1 << 16
+
+@lru_cache(maxsize=ENCODE_CACHE_SIZE)
+def encode_text_cached(s: str) -> array:
+    return encode_text_to_units(s)
+
+def encode_text_to_symbols(s: str) -> list[int]:
+    cps: list[int] = []
+    for part in _split_tokens(s):
+        if isinstance(part, int):
+            cps.append(part)
+        else:
+            cps.extend(map(ord, part))
     return cps
 
 # =======================
 #  DS_GXT parse / build
 # =======================
-def _u16(b: bytes, off: int) -> int:
-    return struct.unpack_from("<H", b, off)[0]
-
-def parse_gxt(buf: bytes, off: int) -> dict | None:
-    if buf[off:off + 6] != SIG:
-        return None
-    if off + 8 > len(buf):
-        return None
+_SIG_RE = re.compile(re.escape(SIG))
+_PAD_RUN_RE = re.compile(b"%c*" % PAD_BYTE)
 
-    num = _u16(buf, off + 6)
-    p = off + 8
-    strings: list[list[int]] = []
-
-    for _ in range(num):
-        if p + 2 > len(buf):
-            return None
-        L = _u16(buf, p)
-        p += 2
-        if p + L * 2 > len(buf):
-            return None
-        if L:
-            cps = list(struct.unpack_from("<" + "H" * L, buf, p))
-        else:
-            cps = []
-        p += L * 2
-        strings.append(cps)
-
-    return {"num": num, "cps": strings, "end": p}
-
-def build_gxt(strings_cps: list[list[int]]) -> bytes:
-    num = len(strings_cps)
-    out = bytearray()
-    out += SIG
-    out += struct.pack("<H", num)
-
-    for i, cps in enumerate(strings_cps):
-        # bỏ null dư ở cuối nếu có
-        while cps and cps[-1] == 0:
-            cps = cps[:-1]
-        if i == num - 1:
-            cps2 = cps + [0]  # last string includes terminating null
-        else:
-            cps2 = cps
+# DS_GXT đọc / ghi bằng codec chung với gxt2txt.py (ds_gxt.py)
+PackedStrings = ds_gxt.GxtStrings
+gxt_end = ds_gxt.gxt_end
+build_gxt = ds_gxt.build
 
-        out += struct.pack("<H", len(cps2))
-        if cps2:
-            out += struct.pack("<" + "H" * len(cps2), *cps2)
+def parse_gxt(buf: bytes, off: int, packed: bool = False) -> dict | None:
+    """
+    packed=True: "cps" là ds_gxt.GxtStrings (1 buffer u16, string cắt ra khi truy cập);
+    packed=False: list[list[int]]. String cuối giữ nguyên null kết thúc.
+    """
+    parsed = ds_gxt.read(buf, off)
+    if parsed is None:
+        return None
+    strings, end = parsed
+    return {"num": len(strings), "cps": strings if packed else [list(cps) for cps in strings], "end": end}
 
-    return bytes(out)
+def scan_gxt_blocks(buf) -> list[tuple[int, int]]:
+    """
+    Tìm mọi chữ ký DS_GXT trong 1 lượt (re.finditer chạy trên bytes/mmap),
+    xác thực bằng gxt_end. Trả về [(off, raw_end), ...]; parse_gxt để dành lúc export.
+    """
+    blocks: list[tuple[int, int]] = []
+    for m in _SIG_RE.finditer(buf):
+        end = gxt_end(buf, m.start())
+        if end is not None:
+            blocks.append((m.start(), end))
+    return blocks
 
 def scan_gxt_offsets(buf: bytes) -> list[int]:
-    offs: list[int] = []
-    start = 0
-    while True:
-        p = buf.find(SIG, start)
-        if p == -1:
-            break
-        info = parse_gxt(buf, p)
-        if info is not None:
-            offs.append(p)
-            start = p + 6
-        else:
-            start = p + 1
-    return offs
+    return [off for off, _ in scan_gxt_blocks(buf)]
 
 def compute_max_alloc_end(buf: bytes, off: int, raw_end: int) -> int:
     """
     max_alloc_end = điểm dừng trước byte != 0xAD, bắt đầu từ aligned_end(raw_end).
     """
     p = align_up(raw_end, ALIGN)
-    n = len(buf)
-    while p < n and buf[p] == PAD_BYTE:
-        p += 1
-    return p
+    if p >= len(buf):
+        return p
+    return _PAD_RUN_RE.match(buf, p).end()
+
+def scan_pad_runs(buf, min_len: int = ALIGN) -> list[tuple[int, int]]:
+    """Mọi dải 0xAD liên tục dài >= min_len trong buf (1 lượt regex): [(start, end), ...]."""
+    return [m.span() for m in re.finditer(b"%c{%d,}" % (PAD_BYTE, min_len), buf)]
+
+open_wad = wad_io.open_wad
+flush_wad = wad_io.flush_wad
+
+# =======================
+#  Workspace (index cache)
+# =======================
+INDEX_SUFFIX = ".gxtidx.json"
+INDEX_VERSION = 2
+_SAMPLE = 1 << 16
+
+def wad_fingerprint(path: Path) -> dict:
+    """size + mtime + sha1 của 64 KiB đầu/cuối: đủ rẻ để kiểm tra mỗi lần mở."""
+    st = path.stat()
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        h.update(f.read(_SAMPLE))
+        if st.st_size > 2 * _SAMPLE:
+            f.seek(-_SAMPLE, 2)
+            h.update(f.read(_SAMPLE))
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sample_sha1": h.hexdigest()}
+
+class GxtBlock:
+    """1 DS_GXT trong WAD; strings chỉ parse khi cần."""
+    __slots__ = ("ws", "idx", "off", "raw_end", "max_end", "num", "_info")
+
+    def __init__(self, ws: "Workspace", idx: int, off: int, raw_end: int, max_end: int, num: int):
+        self.ws = ws
+        self.idx = idx
+        self.off = off
+        self.raw_end = raw_end
+        self.max_end = max_end
+        self.num = num
+        self._info = None
+
+    @property
+    def max_alloc(self) -> int:
+        return self.max_end - self.off
+
+    @property
+    def name(self) -> str | None:
+        """Tên entry trong ROM.TOC (None nếu không có TOC / không đoán được layout)."""
+        toc = self.ws.toc
+        return toc.name_of(self.off) if toc is not None else None
+
+    @property
+    def strings(self) -> PackedStrings:
+        if self._info is None:
+            self._info = parse_gxt(self.ws.data, self.off, packed=True)
+        return self._info["cps"]
+
+    def text(self, si: int) -> str:
+        """String si dạng TXT (như write_txt)."""
+        return string_to_txt(self.strings[si], si == self.num - 1)
+
+    def texts(self) -> list[str]:
+        return [self.text(si) for si in range(self.num)]
+
+class Workspace:
+    """
+    ROM.WAD mở 1 lần + danh sách DS_GXT (off/raw_end/max_end/num) và các dải 0xAD trống,
+    lưu ở file index cạnh WAD (ROM.WAD.gxtidx.json). Index bị bỏ khi size/mtime/sha1 mẫu
+    của WAD khác lúc ghi => lần mở sau (cache nóng) không phải scan lại cả WAD.
+
+        with Workspace("ROM.WAD") as ws:
+            for b in ws: print(b.idx, hex(b.off), b.text(0))
+
+    ROM.TOC (toc_path, mặc định file cạnh WAD, xem rom_toc.py) cho tên từng block (GxtBlock.name,
+    by_name). from_toc=True: lấy danh sách DS_GXT từ các entry của TOC thay vì scan cả WAD
+    (chỉ dùng khi "python rom_toc.py ROM.WAD" báo TOC phủ mọi DS_GXT); dải 0xAD khi đó chỉ scan
+    lúc cần (plan / relocate).
+
+    write_index=False: dùng index có sẵn nếu còn khớp nhưng không ghi / cập nhật file index
+    (plan, verify: không đụng tới thư mục game).
+    """
+
+    def __init__(self, wad_path: str | Path, use_mmap: bool = True, use_index: bool = True,
+                 toc_path: str | Path | None = "auto", from_toc: bool = False, write_index: bool = True):
+        self.path = Path(wad_path)
+        self.index_path = self.path.with_name(self.path.name + INDEX_SUFFIX)
+        self.use_mmap = use_mmap
+        self.use_index = use_index
+        self.write_index = write_index
+        self.nds = nds_rom.is_nds(self.path)
+        if toc_path == "auto":
+            # .nds: ROM.TOC đọc thẳng từ image
+            toc_path = None if self.nds else rom_toc.default_toc_path(self.path)
+        self.toc_path = toc_path
+        self.from_toc = from_toc
+        self._data = None
+        self._ctx = None
+        self._blocks: list[GxtBlock] | None = None
+        self._pad_runs: list[tuple[int, int]] | None = None
+        self._fingerprint: dict | None = None
+        self._source: str | None = None
+        self._toc: rom_toc.TocIndex | None | bool = False  # False: chưa đọc
+        self._by_off: dict[int, GxtBlock] | None = None
+
+    def __enter__(self) -> "Workspace":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._ctx is not None:
+            self._ctx.__exit__(None, None, None)
+            self._ctx = None
+        self._data = None
+        for b in self._blocks or ():
+            b._info = None
+
+    @property
+    def data(self):
+        if self._data is None:
+            if self.use_mmap:
+                self._ctx = open_wad(self.path)
+                self._data = self._ctx.__enter__()
+            elif self.nds:
+                start, end = nds_rom.wad_span(self.path)
+                with open(self.path, "rb") as f:
+                    f.seek(start)
+                    self._data = f.read(end - start)
+            else:
+                self._data = self.path.read_bytes()
+        return self._data
+
+    @property
+    def blocks(self) -> list[GxtBlock]:
+        if self._blocks is None:
+            self._load()
+        return self._blocks
+
+    @property
+    def pad_runs(self) -> list[tuple[int, int]]:
+        if self._blocks is None:
+            self._load()
+        if self._pad_runs is None:
+            # block lấy từ TOC: dải 0xAD chỉ scan khi cần
+            self._pad_runs = scan_pad_runs(self.data)
+            if self.use_index and self.write_index:
+                self._save_index()
+        return self._pad_runs
+
+    @property
+    def toc(self) -> rom_toc.TocIndex | None:
+        if self._toc is False:
+            if self.toc_path:
+                self._toc = rom_toc.TocIndex.load(self.toc_path, self.data)
+            elif self.nds:
+                toc = nds_rom.read_file(self.path, "ROM.TOC")
+                self._toc = rom_toc.TocIndex.parse(toc, self.data) if toc is not None else None
+            else:
+                self._toc = None
+        return self._toc
+
+    def by_off(self, off: int) -> GxtBlock | None:
+        if self._by_off is None:
+            self._by_off = {b.off: b for b in self.blocks}
+        return self._by_off.get(off)
+
+    def by_name(self, name: str) -> GxtBlock | None:
+        entry = self.toc.by_name.get(name) if self.toc is not None else None
+        return self.by_off(entry.off) if entry is not None else None
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def __getitem__(self, idx: int) -> GxtBlock:
+        return self.blocks[idx]
+
+    def __iter__(self):
+        return iter(self.blocks)
+
+    def _load(self):
+        self._fingerprint = wad_fingerprint(self.path)
+        if self.use_index and self._load_index():
+            return
+        data = self.data
+        if self.from_toc and self.toc is not None:
+            spans = [(e.off, gxt_end(data, e.off)) for e in self.toc.gxt_entries(data)]
+            self._source = "toc"
+        else:
+            spans = scan_gxt_blocks(data)
+            self._pad_runs = scan_pad_runs(data)
+            self._source = "scan"
+        self._blocks = [GxtBlock(self, idx, off, raw_end, compute_max_alloc_end(data, off, raw_end), ds_gxt.string_count(data, off))
+                        for idx, (off, raw_end) in enumerate(spans)]
+        if self.use_index and self.write_index:
+            self._save_index()
+
+    def _load_index(self) -> bool:
+        try:
+            idx = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        if idx.get("version") != INDEX_VERSION or idx.get("wad") != self._fingerprint:
+            return False
+        if idx["source"] == "toc" and not self.from_toc:
+            return False  # danh sách từ TOC có thể thiếu block so với scan
+        self._blocks = [GxtBlock(self, i, *b) for i, b in enumerate(idx["blocks"])]
+        self._pad_runs = [tuple(r) for r in idx["pad_runs"]] if idx["pad_runs"] is not None else None
+        self._source = idx["source"]
+        return True
+
+    def _save_index(self):
+        idx = {
+            "version": INDEX_VERSION,
+            "wad": self._fingerprint,
+            "source": self._source,
+            "blocks": [[b.off, b.raw_end, b.max_end, b.num] for b in self._blocks],
+            "pad_runs": self._pad_runs,
+        }
+        try:
+            self.index_path.write_text(json.dumps(idx, separators=(",", ":")), encoding="utf-8")
+        except OSError:
+            pass  # thư mục chỉ đọc: vẫn chạy, chỉ không có cache
 
 # =======================
 #  TXT IO
 # =======================
-def write_txt(out_path: Path, idx: int, off: int, raw_end: int, max_end: int, strings: list[list[int]]):
+def format_txt(idx: int, off: int, raw_end: int, max_end: int, strings: list[list[int]]) -> str:
     lines: list[str] = []
     lines.append(f"; DS_GXT idx={idx} off=0x{off:X} raw_end=0x{raw_end:X} max_end=0x{max_end:X} max_alloc=0x{(max_end-off):X} num={len(strings)}")
+    last = len(strings) - 1
     for si, cps in enumerate(strings):
-        # bỏ null cuối nếu là string cuối
-        if si == len(strings) - 1 and cps and cps[-1] == 0:
-            cps = cps[:-1]
-        s = "".join(decode_symbol(cp) for cp in cps)
-        s = s.replace("\r\n", "\n").replace("\r", "\n").replace("\n", "~n~")
-        lines.append(f"{si}={s}")
-    out_path.write_text("\n".join(lines), encoding="utf-8")
+        lines.append(f"{si}={string_to_txt(cps, si == last)}")
+    return "\n".join(lines)
+
+def write_txt(out_path: Path, idx: int, off: int, raw_end: int, max_end: int, strings: list[list[int]]):
+    out_path.write_text(format_txt(idx, off, raw_end, max_end, strings), encoding="utf-8")
+
+def file_sha1(path: Path) -> str | None:
+    try:
+        return hashlib.sha1(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
 
 def read_txt_kv(txt_path: Path) -> dict[int, str]:
+    return parse_txt_kv(txt_path.read_text(encoding="utf-8", errors="replace"))
+
+def parse_txt_kv(text: str) -> dict[int, str]:
     kv: dict[int, str] = {}
-    for line in txt_path.read_text(encoding="utf-8", errors="replace").splitlines():
+    for line in text.splitlines():
         line = line.strip("\ufeff").rstrip()
         if not line or line.startswith(";") or line.startswith("#"):
             continue
@@ -220,93 +565,254 @@ def read_txt_kv(txt_path: Path) -> dict[int, str]:
             kv[int(k)] = v.strip()
     return kv
 
+# =======================
+#  Relocate (dời DS_GXT quá dài)
+# =======================
+def find_toc_pointers(toc: bytes, off: int) -> list[tuple[int, int]]:
+    """
+    Tìm các u32 (căn 4 byte) trong ROM.TOC có giá trị = off (đơn vị byte) hoặc off / ALIGN.
+    Trả về [(vị trí trong toc, đơn vị), ...].
+    """
+    hits: list[tuple[int, int]] = []
+    for unit in (1, ALIGN):
+        if off % unit:
+            continue
+        needle = struct.pack("<I", off // unit)
+        p = toc.find(needle)
+        while p != -1:
+            if p % 4 == 0:
+                hits.append((p, unit))
+            p = toc.find(needle, p + 1)
+    return hits
+
+class Relocator:
+    """
+    Dời các DS_GXT không vừa max_alloc: cấp chỗ best-fit trong các vùng trống đã biết
+    (add_free), hết chỗ thì nối vào cuối WAD (tail), rồi sửa con trỏ trong toc.
+
+    index: layout ROM.TOC đoán được (rom_toc.TocIndex.parse trên chính toc): con trỏ / size của
+    mọi entry trỏ tới block được sửa theo layout. None: quay về tìm u32 = offset (find_toc_pointers).
+    """
+
+    def __init__(self, toc: bytearray, wad_size: int, index: rom_toc.TocIndex | None = None):
+        self.toc = toc
+        self.wad_size = wad_size
+        self.index = index
+        self.free: list[tuple[int, int]] = []  # [(start, end)], sắp xếp, không chồng nhau
+        self.tail = bytearray()  # dữ liệu nối sau wad_size
+        self.moved: list[tuple[int, int]] = []  # [(off cũ, off mới)]
+        self.written: list[tuple[int, int]] = []  # vùng đã ghi trong WAD (cho patch)
+        self.toc_written: list[tuple[int, int]] = []  # vùng đã sửa trong toc
+
+    def add_free(self, start: int, end: int):
+        start = align_up(start)
+        if end <= start:
+            return
+        runs = self.free + [(start, end)]
+        runs.sort()
+        merged: list[tuple[int, int]] = []
+        for a, b in runs:
+            if merged and a <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+            else:
+                merged.append((a, b))
+        self.free = merged
+
+    def alloc(self, size: int) -> int:
+        best = None
+        for i, (a, b) in enumerate(self.free):
+            if b - a >= size and (best is None or b - a < self.free[best][1] - self.free[best][0]):
+                best = i
+        if best is not None:
+            a, b = self.free[best]
+            self.free[best:best + 1] = [(align_up(a + size), b)] if align_up(a + size) < b else []
+            return a
+        new_off = align_up(self.wad_size + len(self.tail))
+        self.tail += bytes([PAD_BYTE]) * (new_off - self.wad_size - len(self.tail) + size)
+        return new_off
+
+    def relocate(self, data, pending: list[tuple[dict, bytes, str]]):
+        """
+        pending: [(mục manifest, DS_GXT mới, thông báo lỗi quá dài)], block to dời trước.
+        Yield (mục manifest, lỗi hoặc None).
+        """
+        for m, new_gxt, err in sorted(pending, key=lambda t: -len(t[1])):
+            off, raw_end = int(m["off"]), int(m["raw_end"])
+            if self.index is not None:
+                entries = self.index.at_off.get(off, [])
+                if not entries:
+                    yield m, f"{err} - không dời được: không có entry ROM.TOC trỏ tới block"
+                    continue
+            else:
+                ptrs = find_toc_pointers(self.toc, off)
+                if len(ptrs) != 1:
+                    yield m, f"{err} - không dời được: {len(ptrs)} con trỏ trong ROM.TOC"
+                    continue
+            size = align_up(len(new_gxt))
+            new_off = self.alloc(size)
+            blob = new_gxt + bytes([PAD_BYTE]) * (size - len(new_gxt))
+            if new_off >= self.wad_size:
+                t = new_off - self.wad_size
+                self.tail[t:t + size] = blob
+            else:
+                data[new_off:new_off + size] = blob
+                self.written.append((new_off, new_off + size))
+            if self.index is not None:
+                for e in list(entries):
+                    self.toc_written += self.index.set_entry(self.toc, e, new_off, len(new_gxt))
+            else:
+                self._set_scanned(ptrs[0], new_off, raw_end - off, len(new_gxt))
+            self.moved.append((off, new_off))
+            self.add_free(off, off + int(m["max_alloc"]))
+            m["reloc_off"] = new_off
+            yield m, None
+
+    def _set_scanned(self, ptr: tuple[int, int], new_off: int, old_size: int, new_size: int):
+        """Con trỏ tìm bằng find_toc_pointers; u32 ngay sau = kích thước cũ (byte / block 0x200) => trường size."""
+        pos, unit = ptr
+        struct.pack_into("<I", self.toc, pos, new_off // unit)
+        self.toc_written.append((pos, pos + 4))
+        if pos + 8 > len(self.toc):
+            return
+        word = struct.unpack_from("<I", self.toc, pos + 4)[0]
+        for size_unit in (1, ALIGN):
+            if word == -(-old_size // size_unit):
+                struct.pack_into("<I", self.toc, pos + 4, -(-new_size // size_unit))
+                self.toc_written.append((pos + 4, pos + 8))
+                return
+
 # =======================
 #  Export / Import
 # =======================
-def export_rom_wad(rom_wad_path: str, out_dir: str):
+def export_rom_wad(rom_wad_path: str, out_dir: str, use_mmap: bool = True, jobs: int = 1, from_toc: bool = False):
     wad_path = Path(rom_wad_path)
-    data = wad_path.read_bytes()
-
     outp = Path(out_dir)
     outp.mkdir(parents=True, exist_ok=True)
 
-    offsets = scan_gxt_offsets(data)
-    manifest = []
-    for idx, off in enumerate(offsets):
-        info = parse_gxt(data, off)
-        if info is None:
-            continue
-        raw_end = info["end"]
-        max_end = compute_max_alloc_end(data, off, raw_end)
-        fname = f"{idx:04d}_{off:08X}.txt"
-        write_txt(outp / fname, idx, off, raw_end, max_end, info["cps"])
-        manifest.append({
-            "idx": idx,
-            "off": off,
-            "raw_end": raw_end,
-            "max_end": max_end,
-            "max_alloc": max_end - off,
-            "num": info["num"],
-            "file": fname,
-        })
+    with Workspace(wad_path, use_mmap=use_mmap, from_toc=from_toc) as ws:
+        manifest = _export_blocks(ws, outp, jobs)
+        # tên entry trong ROM.TOC: import tìm lại block theo tên nếu offset đổi (_rekey_manifest)
+        for b, m in zip(ws, manifest):
+            if b.name is not None:
+                m["name"] = b.name
 
     (outp / "_manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
     print(f"[OK] Export: {len(manifest)} DS_GXT -> {outp}")
+    return manifest
+
+def _export_blocks(ws: Workspace, outp: Path, jobs: int = 1) -> list[dict]:
+    tasks = [(b.idx, b.off, b.raw_end, b.max_end) for b in ws]
+    return _run_blocks(_export_block, ws.data, tasks, (outp,), ws.path, jobs)
+
+def _export_block(data, task: tuple[int, int, int, int], outp: Path) -> dict:
+    idx, off, raw_end, max_end = task
+    info = parse_gxt(data, off, packed=True)
+    fname = f"{idx:04d}_{off:08X}.txt"
+    write_txt(outp / fname, idx, off, raw_end, max_end, info["cps"])
+    return {
+        "idx": idx,
+        "off": off,
+        "raw_end": raw_end,
+        "max_end": max_end,
+        "max_alloc": max_end - off,
+        "num": info["num"],
+        "file": fname,
+        "txt_sha1": file_sha1(outp / fname),
+    }
 
-def import_rom_wad(rom_wad_path: str, txt_dir: str, out_wad_path: str, out_toc_path: str | None = None):
+def import_rom_wad(rom_wad_path: str, txt_dir: str, out_wad_path: str | None, out_toc_path: str | None = None,
+                   use_mmap: bool = True, jobs: int = 1, incremental: bool = True, relocate: bool = False,
+                   patch_path: str | None = None, font_dir: str | None = None):
+    """
+    relocate=True: con trỏ luôn đọc từ ROM.TOC gốc cạnh ROM.WAD, bản đã sửa con trỏ ghi ra
+    out_toc_path (bắt buộc khi có out_wad_path; ghi đè mỗi lần, kể cả khi không dời block nào).
+    Import có relocate luôn chạy đầy đủ.
+
+    patch_path: ghi thêm patch WADPATCH (so với ROM.WAD / ROM.TOC gốc, xem wad_patch.py).
+    out_wad_path=None (chỉ dùng với patch_path): build trong RAM, không ghi rom_nw.wad.
+
+    rom_wad_path là .nds: out_wad_path là .nds mới (copy image gốc, DS_GXT vá tại chỗ trong vùng
+    ROM.WAD), patch có 1 entry "nds" cho cả image. Không hỗ trợ relocate (ROM.WAD không lớn thêm được).
+
+    font_dir: font thay thế (tên file như fonts/report.json), ghi cùng lượt vá DS_GXT (xem font_assets.py).
+    """
+    if out_wad_path is None and not patch_path:
+        raise ValueError("Cần out_wad_path hoặc patch_path")
     wad_path = Path(rom_wad_path)
-    data = bytearray(wad_path.read_bytes())
+    nds = nds_rom.is_nds(wad_path)
+    if nds and relocate:
+        raise ValueError("relocate không dùng được với .nds: import ra rom_nw.wad rồi đóng gói lại image")
 
     txtp = Path(txt_dir)
     man_path = txtp / "_manifest.json"
     if not man_path.exists():
         raise FileNotFoundError("Thiếu _manifest.json (hãy Export trước).")
     manifest = json.loads(man_path.read_text(encoding="utf-8"))
+    _rekey_manifest(manifest, wad_path)
 
-    replaced = 0
-    errors: list[str] = []
+    relocator = None
+    if relocate:
+        # out_toc_path có thể là kết quả của lần import trước (con trỏ đã dời): không đọc lại
+        toc_path = rom_toc.default_toc_path(wad_path)
+        if not toc_path.exists():
+            raise FileNotFoundError(f"relocate cần ROM.TOC gốc cạnh {wad_path.name} ({toc_path})")
+        if out_wad_path is not None and not out_toc_path:
+            # rom_nw.wad có block đã dời mà không có ROM.TOC sửa con trỏ đi kèm thì game đọc sai
+            raise ValueError("relocate cần out_toc_path (ROM.TOC xuất, vd rom_nw.toc) để ghi con trỏ đã sửa")
+        src_toc = toc_path.read_bytes()
+        with open_wad(wad_path) as src:
+            index = rom_toc.TocIndex.parse(src_toc, src)
+        relocator = Relocator(bytearray(src_toc), wad_path.stat().st_size, index)
 
-    for m in manifest:
-        idx = int(m["idx"])
-        off = int(m["off"])
-        max_alloc = int(m["max_alloc"])
-        num = int(m["num"])
-        txt_file = txtp / m["file"]
-        if not txt_file.exists():
-            continue
-
-        info = parse_gxt(data, off)
-        if info is None:
-            errors.append(f"idx={idx} off=0x{off:X}: không parse được DS_GXT (bỏ qua)")
-            continue
-
-        kv = read_txt_kv(txt_file)
-
-        new_strings: list[list[int]] = []
-        for si in range(num):
-            if si in kv:
-                cps = encode_text_to_symbols(kv[si])
-            else:
-                # giữ nguyên string gốc (trừ null cuối)
-                cps = info["cps"][si]
-                if si == num - 1 and cps and cps[-1] == 0:
-                    cps = cps[:-1]
-            new_strings.append(cps)
-
-        new_gxt = build_gxt(new_strings)
-
-        if len(new_gxt) > max_alloc:
-            errors.append(
-                f"idx={idx} off=0x{off:X}: DS_GXT mới 0x{len(new_gxt):X} > max_alloc 0x{max_alloc:X} ({txt_file.name})"
-            )
-            continue
-
-        patch = new_gxt + bytes([PAD_BYTE]) * (max_alloc - len(new_gxt))
-        data[off:off + max_alloc] = patch
-        replaced += 1
-
-    Path(out_wad_path).write_bytes(data)
-    print(f"[OK] Import: patched {replaced}/{len(manifest)} DS_GXT -> {out_wad_path}")
+    reuse = out_wad_path is not None and use_mmap and incremental and relocator is None and _can_reuse_out_wad(wad_path, Path(out_wad_path))
+    if reuse:
+        # rom_nw.wad cũ vẫn khớp ROM.WAD: chỉ build + vá lại các block có TXT thay đổi
+        with open_wad(wad_path) as src, open_wad(out_wad_path, writable=True) as data:
+            replaced, errors, skipped = _patch_blocks(data, manifest, txtp, wad_path, jobs, src=src)
+            # kể cả khi không có font_dir: font của lần import trước phải được chép lại bản gốc
+            fonts, font_errors, font_ranges = font_assets.patch_fonts(data, font_dir, src=src)
+    elif use_mmap and out_wad_path is not None:
+        # copyfile dùng copy_file_range/sendfile (reflink trên btrfs/xfs) -> không đi qua RAM của tool,
+        # sau đó chỉ các vùng DS_GXT được vá mới bị ghi lại.
+        shutil.copyfile(wad_path, out_wad_path)
+        with open_wad(out_wad_path, writable=True) as data:
+            replaced, errors, skipped = _patch_blocks(data, manifest, txtp, wad_path, jobs, relocator=relocator)
+            fonts, font_errors, font_ranges = _patch_fonts(data, font_dir)
+        if relocator and relocator.tail:
+            with open(out_wad_path, "ab") as f:
+                f.write(relocator.tail)
+    else:
+        image = bytearray(wad_path.read_bytes())
+        data = memoryview(image)[slice(*nds_rom.wad_span(wad_path))] if nds else image
+        replaced, errors, skipped = _patch_blocks(data, manifest, txtp, wad_path, jobs, relocator=relocator)
+        fonts, font_errors, font_ranges = _patch_fonts(data, font_dir)
+        if relocator:
+            data += relocator.tail
+        if out_wad_path is not None:
+            Path(out_wad_path).write_bytes(image)
+    if relocator and out_toc_path:
+        Path(out_toc_path).write_bytes(relocator.toc)
+        if relocator.moved:
+            print(f"[OK] Dời {len(relocator.moved)} DS_GXT quá dài, đã sửa con trỏ trong {out_toc_path}")
+    man_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[OK] Import: patched {replaced}/{len(manifest)} DS_GXT -> {out_wad_path or patch_path}")
+    if fonts:
+        print(f"[OK] Font: {', '.join(fonts)}")
+    errors += font_errors
+    if patch_path:
+        # .nds: vùng vá tính trong ROM.WAD, dời theo vị trí ROM.WAD trong image
+        name, base = ("nds", nds_rom.wad_span(wad_path)[0]) if nds else ("wad", 0)
+        with open_wad(wad_path, whole=True) as src, \
+                (open_wad(out_wad_path, whole=True) if out_wad_path else nullcontext(image)) as dst:
+            ranges = _patch_ranges(manifest, relocator, len(src), len(dst)) + font_ranges
+            ranges = [(a + base, b + base) for a, b in ranges]
+            entries = [(name, src, dst, wad_patch.diff_ranges(src, dst, ranges))]
+            if relocator and relocator.moved:
+                entries.append(("toc", src_toc, relocator.toc, wad_patch.diff_ranges(src_toc, relocator.toc, relocator.toc_written)))
+            wad_patch.write_patch(patch_path, entries)
+        print(f"[OK] Patch: {len(entries[0][3])} vùng -> {patch_path} ({Path(patch_path).stat().st_size} byte)")
+    if skipped:
+        print(f"[OK] Bỏ qua {skipped} DS_GXT không đổi (dùng lại {out_wad_path} cũ)")
 
     # ROM.TOC: nếu user muốn, copy nguyên file (không sửa) để tiện đóng gói lại NDS
     if out_toc_path:
@@ -318,8 +824,505 @@ def import_rom_wad(rom_wad_path: str, txt_dir: str, out_wad_path: str, out_toc_p
             print(" -", e)
         if len(errors) > 80:
             print(f" ... và {len(errors)-80} lỗi nữa.")
+    return {"replaced": replaced, "skipped": skipped, "errors": errors, "fonts": fonts}
+
+def _patch_fonts(data, font_dir: str | None) -> tuple[list[str], list[str], list[tuple[int, int]]]:
+    """data là bản copy mới của WAD gốc: không có font_dir thì font đã là bản gốc, khỏi đọc report / sha1."""
+    if not font_dir:
+        return [], [], []
+    return font_assets.patch_fonts(data, font_dir)
+
+def _patch_ranges(manifest: list[dict], relocator: Relocator | None, src_size: int, dst_size: int) -> list[tuple[int, int]]:
+    """
+    Các vùng import có thể đã ghi: max_alloc của mọi block (kể cả block bỏ qua ở import tăng dần,
+    vì rom_nw.wad cũ có thể đã khác ROM.WAD ở đó), chỗ Relocator ghi và phần nối cuối WAD.
+    """
+    ranges = [(int(m["off"]), int(m["off"]) + int(m["max_alloc"])) for m in manifest]
+    if relocator is not None:
+        ranges += relocator.written
+    if dst_size > src_size:
+        ranges.append((src_size, dst_size))
+    return ranges
+
+def _rekey_manifest(manifest: list[dict], wad_path: Path) -> int:
+    """
+    Mục manifest có "name" (entry ROM.TOC lúc export) mà entry đó nay trỏ tới offset khác
+    (WAD build lại / bản khác) => cập nhật off/raw_end/max_end/max_alloc/num theo block mới.
+    Trả về số mục đã đổi.
+    """
+    if not any("name" in m for m in manifest):
+        return 0
+    moved = 0
+    with Workspace(wad_path, write_index=False) as ws:
+        for m in manifest:
+            b = ws.by_name(m["name"]) if "name" in m else None
+            if b is None or b.off == int(m["off"]):
+                continue
+            print(f"[OK] {m['name']}: DS_GXT 0x{int(m['off']):X} -> 0x{b.off:X} ({m['file']})")
+            m.update(off=b.off, raw_end=b.raw_end, max_end=b.max_end, max_alloc=b.max_alloc, num=b.num)
+            moved += 1
+    return moved
+
+def _can_reuse_out_wad(wad_path: Path, out_path: Path) -> bool:
+    """
+    rom_nw.wad cũ dùng lại được làm nền nếu: cùng kích thước với ROM.WAD và mới hơn ROM.WAD
+    (ROM.WAD không bị thay sau lần import trước). Nội dung từng block còn được kiểm lại bằng sha1.
+    """
+    try:
+        src, out = wad_path.stat(), out_path.stat()
+    except FileNotFoundError:
+        return False
+    if wad_path.resolve() == out_path.resolve():
+        return False
+    return out.st_size == src.st_size and out.st_mtime_ns >= src.st_mtime_ns
+
+def _patch_blocks(data, manifest: list[dict], txtp: Path, wad_path: Path, jobs: int = 1,
+                  src=None, relocator: Relocator | None = None) -> tuple[int, list[str], int]:
+    """
+    Vá các DS_GXT trong manifest vào data (bytearray hoặc mmap ghi được), tại chỗ.
+    Việc build từng block có thể chạy song song (jobs > 1); ghi vào data luôn theo thứ tự manifest.
+
+    src: ROM.WAD gốc khi data là rom_nw.wad cũ (import tăng dần). Block có TXT (sha1) và vùng
+    trong data (sha1) khớp lần import trước thì bỏ qua; block không vá được thì chép lại bản gốc.
+    Ghi trạng thái vào mỗi mục manifest: import_txt_sha1, import_sha1, import_error.
+
+    relocator: block quá dài được dời đi sau khi mọi block khác đã vá xong (xem Relocator),
+    mục manifest ghi thêm reloc_off.
+    Trả về (số block đã vá, danh sách lỗi, số block bỏ qua).
+    """
+    replaced = 0
+    errors: list[str] = []
+    skipped = 0
+
+    dirty: list[dict] = []
+    for m in manifest:
+        txt_sha1 = file_sha1(txtp / m["file"])
+        off, max_alloc = int(m["off"]), int(m["max_alloc"])
+        if (src is not None and "import_sha1" in m and m.get("import_txt_sha1") == txt_sha1
+                and hashlib.sha1(data[off:off + max_alloc]).hexdigest() == m["import_sha1"]):
+            skipped += 1
+            if m.get("import_error"):
+                errors.append(m["import_error"])
+            continue
+        m["import_txt_sha1"] = txt_sha1
+        dirty.append(m)
+
+    pending: list[tuple[dict, bytes, str]] = []
+    for m, (patch, err) in zip(dirty, _run_blocks(_build_patch, src if src is not None else data,
+                                                  dirty, (txtp, relocator is not None), wad_path, jobs)):
+        off, max_alloc = int(m["off"]), int(m["max_alloc"])
+        m.pop("reloc_off", None)
+        if patch is not None and len(patch) > max_alloc:
+            # quá dài: chờ Relocator, vùng cũ tạm giữ bản gốc
+            pending.append((m, patch, err))
+            patch = None
+        elif err:
+            errors.append(err)
+        if patch is not None:
+            data[off:off + len(patch)] = patch
+            replaced += 1
+            free_start = off + gxt_end(patch, 0)
+        else:
+            if src is not None:
+                # giữ nguyên bản gốc như import đầy đủ
+                data[off:off + max_alloc] = src[off:off + max_alloc]
+            free_start = int(m["raw_end"])
+        if relocator is not None:
+            relocator.add_free(free_start, off + max_alloc)
+        m["import_error"] = err
+        m["import_sha1"] = hashlib.sha1(data[off:off + max_alloc]).hexdigest()
+
+    if relocator is not None:
+        for m, err in relocator.relocate(data, pending):
+            if err:
+                errors.append(err)
+                m["import_error"] = err
+            else:
+                replaced += 1
+                # luôn build lại ở lần import sau
+                m["import_error"] = None
+                m["import_sha1"] = None
+
+    return replaced, errors, skipped
+
+def build_gxt_from_kv(strings, num: int, kv: dict[int, str]) -> bytes:
+    """DS_GXT mới: string có trong TXT (kv) thì encode lại, còn lại giữ nguyên string gốc (trừ null cuối)."""
+    new_strings: list[array] = []
+    for si in range(num):
+        if si in kv:
+            cps = encode_text_cached(kv[si])
+        else:
+            cps = strings.string(si)
+        new_strings.append(cps)
+    return build_gxt(new_strings)
+
+def _build_patch(data, m: dict, txtp: Path, relocate: bool = False) -> tuple[bytes | None, str | None]:
+    """
+    Build DS_GXT mới cho 1 mục manifest (đã đệm 0xAD đủ max_alloc).
+    Trả về (patch, None), (None, lỗi), hoặc (None, None) nếu không có file TXT.
+    relocate=True: block quá dài trả về (DS_GXT mới chưa đệm, lỗi) để Relocator thử dời.
+    """
+    idx = int(m["idx"])
+    off = int(m["off"])
+    max_alloc = int(m["max_alloc"])
+    num = int(m["num"])
+    txt_file = txtp / m["file"]
+    if not txt_file.exists():
+        return None, None
+
+    info = parse_gxt(data, off, packed=True)
+    if info is None:
+        return None, f"idx={idx} off=0x{off:X}: không parse được DS_GXT (bỏ qua)"
+
+    new_gxt = build_gxt_from_kv(info["cps"], num, read_txt_kv(txt_file))
+
+    if len(new_gxt) > max_alloc:
+        return (new_gxt if relocate else None), f"idx={idx} off=0x{off:X}: DS_GXT mới 0x{len(new_gxt):X} > max_alloc 0x{max_alloc:X} ({txt_file.name})"
+
+    return new_gxt + bytes([PAD_BYTE]) * (max_alloc - len(new_gxt)), None
+
+# =======================
+#  Watch (tự vá rom_nw.wad khi TXT đổi)
+# =======================
+def _dir_stamps(txtp: Path) -> dict[str, tuple[int, int]]:
+    """{tên file: (mtime_ns, size)} của cả thư mục TXT, 1 lượt scandir."""
+    stamps: dict[str, tuple[int, int]] = {}
+    with os.scandir(txtp) as it:
+        for e in it:
+            if e.is_file():
+                st = e.stat()
+                stamps[e.name] = (st.st_mtime_ns, st.st_size)
+    return stamps
+
+def watch_rom_wad(rom_wad_path: str, txt_dir: str, out_wad_path: str, out_toc_path: str | None = None,
+                  interval: float = 0.2, jobs: int = 1):
+    """
+    Import 1 lần (tăng dần) rồi giữ ROM.WAD + rom_nw.wad mở bằng mmap, poll thư mục TXT mỗi
+    interval giây (os.scandir, không cần thư viện ngoài). TXT nào đổi (mtime/size) thì chỉ
+    encode + vá lại block của TXT đó, ghi lại _manifest.json. _manifest.json đổi (export lại)
+    thì kiểm lại toàn bộ như import tăng dần. Dừng bằng Ctrl+C.
+    """
+    wad_path = Path(rom_wad_path)
+    txtp = Path(txt_dir)
+    man_path = txtp / "_manifest.json"
+    import_rom_wad(rom_wad_path, txt_dir, out_wad_path, out_toc_path, jobs=jobs)
+
+    with open_wad(wad_path) as src, open_wad(out_wad_path, writable=True) as data:
+        stamps = _dir_stamps(txtp)
+        manifest = json.loads(man_path.read_text(encoding="utf-8"))
+        print(f"[OK] Watch: {txtp} ({len(manifest)} DS_GXT, poll {interval}s), Ctrl+C để dừng")
+        try:
+            while True:
+                time.sleep(interval)
+                new_stamps = _dir_stamps(txtp)
+                if new_stamps == stamps:
+                    continue
+                changed = {name for name in stamps.keys() | new_stamps.keys()
+                           if stamps.get(name) != new_stamps.get(name)}
+                stamps = new_stamps
+                t0 = time.perf_counter()
+                if man_path.name in changed:
+                    manifest = json.loads(man_path.read_text(encoding="utf-8"))
+                    _rekey_manifest(manifest, wad_path)
+                    dirty = manifest
+                else:
+                    dirty = [m for m in manifest if m["file"] in changed]
+                if not dirty:
+                    continue
+                replaced, errors, skipped = _patch_blocks(data, dirty, txtp, wad_path, jobs, src=src)
+                flush_wad(data)
+                man_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+                stamps[man_path.name] = _dir_stamps(txtp).get(man_path.name)
+                ms = (time.perf_counter() - t0) * 1000
+                names = ", ".join(m["file"] for m in dirty[:3]) + (" ..." if len(dirty) > 3 else "")
+                print(f"[OK] {names}: vá {replaced}, bỏ qua {skipped} ({ms:.1f} ms)")
+                for e in errors:
+                    print(" -", e)
+        except KeyboardInterrupt:
+            print("\n[OK] Dừng watch.")
+
+# =======================
+#  Plan (kiểm tra trước khi import)
+# =======================
+def plan_import(rom_wad_path: str, txt_dir: str, jobs: int = 1) -> dict:
+    """
+    Build thử mọi DS_GXT trong bộ nhớ (không ghi file nào) và báo dung lượng dùng/còn lại
+    của từng block, kèm tổng vùng 0xAD trống trong cả WAD.
+    """
+    wad_path = Path(rom_wad_path)
+    txtp = Path(txt_dir)
+    man_path = txtp / "_manifest.json"
+    if not man_path.exists():
+        raise FileNotFoundError("Thiếu _manifest.json (hãy Export trước).")
+    manifest = json.loads(man_path.read_text(encoding="utf-8"))
+    _rekey_manifest(manifest, wad_path)
+
+    with Workspace(wad_path, write_index=False) as ws:
+        runs = ws.pad_runs
+        results = _run_blocks(_build_patch, ws.data, manifest, (txtp, True), wad_path, jobs)
+
+    blocks = []
+    for m, (patch, err) in zip(manifest, results):
+        if patch is None and err is None:
+            continue  # không có TXT
+        max_alloc = int(m["max_alloc"])
+        used = gxt_end(patch, 0) if patch is not None else None
+        blocks.append({
+            "idx": int(m["idx"]),
+            "file": m["file"],
+            "used": used,
+            "max_alloc": max_alloc,
+            "free": None if used is None else max_alloc - used,
+            "error": err,
+        })
+    return {
+        "blocks": blocks,
+        "over": sum(1 for b in blocks if b["error"]),
+        "pad_runs": len(runs),
+        "pad_bytes": sum(b - a for a, b in runs),
+    }
+
+def print_plan(plan: dict, near: float = 0.9):
+    """In các block lỗi / quá dài / đã dùng >= near * max_alloc, và tổng kết."""
+    for b in plan["blocks"]:
+        if b["error"]:
+            print(f"[!] {b['error']}")
+        elif b["used"] >= near * b["max_alloc"]:
+            print(f"[~] {b['file']}: 0x{b['used']:X}/0x{b['max_alloc']:X} (còn 0x{b['free']:X})")
+    used = sum(b["used"] or 0 for b in plan["blocks"] if not b["error"])
+    total = sum(b["max_alloc"] for b in plan["blocks"])
+    print(f"[OK] Plan: {len(plan['blocks'])} TXT, {plan['over']} quá dài, dùng 0x{used:X}/0x{total:X} byte")
+    print(f"[OK] Vùng 0xAD trống (>= 0x{ALIGN:X}): {plan['pad_runs']} dải, tổng 0x{plan['pad_bytes']:X} byte")
+
+# =======================
+#  Verify (export -> import không đổi TXT phải ra đúng WAD gốc)
+# =======================
+def verify_roundtrip(rom_wad_path: str, jobs: int = 1, from_toc: bool = False) -> dict:
+    """
+    Với mọi DS_GXT: dựng TXT trong bộ nhớ (format_txt), đọc lại (parse_txt_kv), build như import
+    rồi so với bản trong WAD. Không ghi file nào.
+    """
+    with Workspace(rom_wad_path, from_toc=from_toc, write_index=False) as ws:
+        tasks = [(b.idx, b.off, b.raw_end, b.max_end) for b in ws]
+        results = _run_blocks(_verify_block, ws.data, tasks, (), ws.path, jobs)
+    mismatches = [r for r in results if r is not None]
+    return {"blocks": len(tasks), "mismatches": mismatches}
+
+def _verify_block(data, task: tuple[int, int, int, int]) -> dict | None:
+    idx, off, raw_end, max_end = task
+    info = parse_gxt(data, off, packed=True)
+    strings = info["cps"]
+    kv = parse_txt_kv(format_txt(idx, off, raw_end, max_end, strings))
+    new_gxt = build_gxt_from_kv(strings, info["num"], kv)
+    old_gxt = data[off:raw_end]
+    if new_gxt == old_gxt:
+        return None
+    n = min(len(new_gxt), len(old_gxt))
+    diff = next((i for i in range(n) if new_gxt[i] != old_gxt[i]), n)
+    # string chứa byte khác đầu tiên (theo length của bản gốc)
+    si, p = None, 8
+    for i, cps in enumerate(strings):
+        p += 2 + 2 * len(cps)
+        if diff < p:
+            si = i
+            break
+    return {
+        "idx": idx,
+        "off": off,
+        "diff_off": off + diff,
+        "string": si,
+        "old_size": len(old_gxt),
+        "new_size": len(new_gxt),
+        "text": kv.get(si) if si is not None else None,
+    }
+
+def print_verify(result: dict, limit: int = 80):
+    for r in result["mismatches"][:limit]:
+        where = f"string {r['string']}" if r["string"] is not None else "header"
+        print(f"[!] idx={r['idx']} off=0x{r['off']:X}: khác tại 0x{r['diff_off']:X} ({where}), "
+              f"0x{r['old_size']:X} -> 0x{r['new_size']:X} byte: {(r['text'] or '')[:60]}")
+    if len(result["mismatches"]) > limit:
+        print(f" ... và {len(result['mismatches']) - limit} block nữa.")
+    print(f"[OK] Verify: {result['blocks']} DS_GXT, {len(result['mismatches'])} block không round-trip được")
+
+# =======================
+#  Process pool (--jobs)
+# =======================
+_worker_wad: tuple | None = None  # (key WAD, context open_wad, mmap) trong mỗi worker
+_pool: ProcessPoolExecutor | None = None
+_pool_jobs = 0
+
+def _worker_open(wad_path: str):
+    """
+    mmap WAD (read-only) trong worker, giữ lại cho các task sau của cùng WAD; các process dùng
+    chung page cache. Key gồm size/mtime nên WAD bị ghi lại (batch: output job trước) được map lại.
+    """
+    global _worker_wad
+    st = os.stat(wad_path)
+    key = (wad_path, st.st_size, st.st_mtime_ns)
+    if _worker_wad is None or _worker_wad[0] != key:
+        if _worker_wad is not None:
+            _worker_wad[1].__exit__(None, None, None)
+        ctx = open_wad(wad_path)
+        _worker_wad = (key, ctx, ctx.__enter__())
+    return _worker_wad[2]
+
+def _worker_call(fn, task, extra: tuple, wad_path: str):
+    return fn(_worker_open(wad_path), task, *extra)
+
+def get_pool(jobs: int) -> ProcessPoolExecutor:
+    """Process pool dùng chung cho mọi lần gọi trong process (batch nhiều WAD không tạo pool lại)."""
+    global _pool, _pool_jobs
+    if _pool is None or _pool_jobs != jobs:
+        shutdown_pool()
+        _pool, _pool_jobs = ProcessPoolExecutor(jobs), jobs
+    return _pool
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+def _run_blocks(fn, data, tasks: list, extra: tuple, wad_path: Path, jobs: int = 1) -> list:
+    """
+    fn(data, task, *extra) cho từng task. jobs > 1: chạy trên process pool, mỗi worker đọc
+    ROM.WAD gốc qua mmap riêng. Kết quả luôn trả về đúng thứ tự tasks (giống chạy tuần tự).
+    """
+    if jobs <= 1 or len(tasks) < 2 or wad_path.stat().st_size == 0:
+        return [fn(data, t, *extra) for t in tasks]
+    chunk = max(1, len(tasks) // (jobs * 4))
+    return list(get_pool(jobs).map(_worker_call, repeat(fn), tasks, repeat(extra), repeat(str(wad_path)),
+                                   chunksize=chunk))
+
+# =======================
+#  CLI / batch
+# =======================
+def _default_outputs(wad: str) -> tuple[str, str | None]:
+    """rom_nw.wad cạnh ROM.WAD; ROM.TOC (nếu có) được copy sang rom_nw.toc. game.nds -> game_nw.nds."""
+    wad_path = Path(wad)
+    if nds_rom.is_nds(wad_path):
+        return str(wad_path.with_name(wad_path.stem + "_nw.nds")), None
+    out_wad = str(wad_path.with_name("rom_nw.wad"))
+
+    # auto copy toc nếu có
+    toc_path = wad_path.with_name("ROM.TOC")
+    out_toc = None
+    if toc_path.exists():
+        out_toc = str(wad_path.with_name("rom_nw.toc"))
+        Path(out_toc).write_bytes(toc_path.read_bytes())
+    return out_wad, out_toc
+
+def run_plan(rom_wad_path: str, txt_dir: str, jobs: int = 1, font: str | None = None,
+             max_width: int = 256) -> int:
+    """Plan dung lượng (+ độ rộng dòng nếu có font), không ghi file. Trả về số lỗi."""
+    plan = plan_import(rom_wad_path, txt_dir, jobs=jobs)
+    print_plan(plan)
+    over = plan["over"]
+    if font:
+        import text_width
+        report = text_width.check_dir(txt_dir, text_width.load_font(font), max_width)
+        text_width.print_report(report)
+        over += report["over"]
+    return over
+
+def list_blocks(rom_wad_path: str, from_toc: bool = False):
+    with Workspace(rom_wad_path, from_toc=from_toc) as ws:
+        for b in ws:
+            name = f"  {b.name}" if b.name is not None else ""
+            print(f"{b.idx:4d}  off=0x{b.off:08X}  raw_end=0x{b.raw_end:08X}  max_alloc=0x{b.max_alloc:X}  num={b.num}{name}")
+        if from_toc:
+            print(f"[OK] {len(ws)} DS_GXT (theo {ws.toc_path or 'ROM.TOC trong image'})")
+        else:
+            print(f"[OK] {len(ws)} DS_GXT, {len(ws.pad_runs)} dải 0xAD trống")
 
-def main():
+def load_batch(path: str | Path) -> dict:
+    """
+    File job .json (hoặc .toml, Python 3.11+):
+      {"jobs": 4, "tasks": [
+         {"op": "export", "wad": "ROM.WAD", "out": "txt", "from_toc": false},
+         {"op": "import", "wad": "ROM.WAD", "txt": "txt", "out": "rom_nw.wad", "toc": "rom_nw.toc",
+          "relocate": false, "full": false, "patch": "build.wadpatch", "patch_only": false, "fonts": "fonts_vi"},
+         {"op": "plan", "wad": "ROM.WAD", "txt": "txt", "font": "fonts/gtafont.bin", "max_width": 240},
+         {"op": "verify", "wad": "ROM.WAD"},
+         {"op": "list", "wad": "ROM.WAD"},
+         {"op": "convert", "paths": ["GXT"]},
+         {"op": "build", "paths": ["GXT"]}
+      ]}
+    convert / build: gxt2txt GXT -> TXT / TXT -> GXT ("settings_dir": thư mục settings.dat, tags.dat).
+    Đường dẫn tương đối tính từ thư mục chứa file job.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".toml":
+        import tomllib
+        with open(path, "rb") as f:
+            batch = tomllib.load(f)
+    else:
+        batch = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(batch.get("tasks"), list):
+        raise ValueError(f"{path.name}: thiếu danh sách \"tasks\"")
+    return batch
+
+def run_task(task: dict, base: Path, jobs: int = 1) -> bool:
+    """Chạy 1 task của batch; True nếu không có lỗi."""
+    op = task.get("op")
+    rel = lambda key: str(base / task[key]) if task.get(key) else None
+    if op == "export":
+        export_rom_wad(rel("wad"), rel("out"), jobs=jobs, from_toc=task.get("from_toc", False))
+        return True
+    if op == "import":
+        if task.get("out"):
+            out_wad, out_toc = rel("out"), rel("toc")
+        else:
+            out_wad, out_toc = _default_outputs(rel("wad"))
+        res = import_rom_wad(rel("wad"), rel("txt"), None if task.get("patch_only") else out_wad, out_toc,
+                             jobs=jobs, incremental=not task.get("full", False),
+                             relocate=task.get("relocate", False), patch_path=rel("patch"), font_dir=rel("fonts"))
+        return not res["errors"]
+    if op == "plan":
+        return run_plan(rel("wad"), rel("txt"), jobs, rel("font"), task.get("max_width", 256)) == 0
+    if op == "verify":
+        result = verify_roundtrip(rel("wad"), jobs, task.get("from_toc", False))
+        print_verify(result)
+        return not result["mismatches"]
+    if op == "list":
+        list_blocks(rel("wad"), task.get("from_toc", False))
+        return True
+    if op in ("convert", "build"):
+        import gxt2txt
+        gxt2txt.read_settings_files(rel("settings_dir") or str(base))
+        paths = [str(base / p) for p in task.get("paths", ["."])]
+        if op == "convert":
+            return gxt2txt.convert_files(gxt2txt.expand_paths(paths, "*.gxt")) == 0
+        return gxt2txt.build_files(gxt2txt.expand_paths(paths, "*.txt")) == 0
+    raise ValueError(f"op không hợp lệ: {op!r}")
+
+def run_batch(path: str | Path, jobs: int | None = None) -> int:
+    """
+    Chạy mọi task trong 1 process: bảng decode/encode, cache encode và process pool
+    được dùng lại giữa các task. Task lỗi không dừng batch. Trả về số task lỗi.
+    """
+    path = Path(path)
+    batch = load_batch(path)
+    jobs = jobs or int(batch.get("jobs", 1))
+    failed = 0
+    try:
+        for i, task in enumerate(batch["tasks"]):
+            t0 = time.perf_counter()
+            print(f"\n=== [{i + 1}/{len(batch['tasks'])}] {task.get('op')} ===")
+            try:
+                ok = run_task(task, path.parent, jobs)
+            except Exception as e:
+                print(f"[!] {type(e).__name__}: {e}")
+                ok = False
+            failed += not ok
+            print(f"=== {'OK' if ok else 'LỖI'} ({time.perf_counter() - t0:.2f}s)")
+    finally:
+        shutdown_pool()
+    print(f"\n[OK] Batch: {len(batch['tasks']) - failed}/{len(batch['tasks'])} task OK")
+    return failed
+
+def interactive(jobs: int = 1, relocate: bool = False):
     print("ROM.WAD <-> TXT (DS_GXT) tool - GTA Chinatown Wars (NDS)")
     print("1) Xuất TXT")
     print("2) Nhập TXT -> rom_nw.wad")
@@ -328,26 +1331,110 @@ def main():
     if mode == "1":
         wad = input("Đường dẫn ROM.WAD: ").strip().strip('"')
         out_dir = input("Thư mục xuất TXT: ").strip().strip('"')
-        export_rom_wad(wad, out_dir)
+        export_rom_wad(wad, out_dir, jobs=jobs)
 
     elif mode == "2":
         wad = input("Đường dẫn ROM.WAD: ").strip().strip('"')
         txt_dir = input("Thư mục TXT: ").strip().strip('"')
 
-        wad_path = Path(wad)
-        out_wad = str(wad_path.with_name("rom_nw.wad"))
-
-        # auto copy toc nếu có
-        toc_path = wad_path.with_name("ROM.TOC")
-        out_toc = None
-        if toc_path.exists():
-            out_toc = str(wad_path.with_name("rom_nw.toc"))
-            Path(out_toc).write_bytes(toc_path.read_bytes())
-
-        import_rom_wad(wad, txt_dir, out_wad, out_toc)
+        out_wad, out_toc = _default_outputs(wad)
+        import_rom_wad(wad, txt_dir, out_wad, out_toc, jobs=jobs, relocate=relocate)
 
     else:
         print("Mode không hợp lệ.")
 
+def main(argv: list[str] | None = None) -> int:
+    # tùy chọn chung đặt được cả trước lẫn sau lệnh con ("-j 4 import ..." hoặc "import ... -j 4");
+    # SUPPRESS: parser con không ghi đè giá trị đã đặt trước lệnh con bằng default
+    jobs = argparse.ArgumentParser(add_help=False)
+    jobs.add_argument("--jobs", "-j", type=int, default=argparse.SUPPRESS,
+                      help="số process xử lý block song song (mặc định 1)")
+    reloc = argparse.ArgumentParser(add_help=False)
+    reloc.add_argument("--relocate", action="store_true", default=argparse.SUPPRESS,
+                       help="dời DS_GXT quá dài và sửa con trỏ trong rom_nw.toc")
+    toc = argparse.ArgumentParser(add_help=False)
+    toc.add_argument("--from-toc", action="store_true", default=argparse.SUPPRESS,
+                     help="lấy DS_GXT từ ROM.TOC thay vì scan cả WAD (xem rom_toc.py)")
+
+    ap = argparse.ArgumentParser(description="ROM.WAD <-> TXT (DS_GXT) tool - GTA Chinatown Wars (NDS)",
+                                 epilog="Không có lệnh con: chạy menu hỏi đáp như cũ.",
+                                 parents=[jobs, reloc, toc])
+    sub = ap.add_subparsers(dest="cmd", metavar="LỆNH")
+
+    p = sub.add_parser("export", help="ROM.WAD -> TXT", parents=[jobs, toc])
+    p.add_argument("wad")
+    p.add_argument("out_dir")
+
+    p = sub.add_parser("import", help="TXT -> rom_nw.wad", parents=[jobs, reloc])
+    p.add_argument("wad")
+    p.add_argument("txt_dir")
+    p.add_argument("--out", help="WAD xuất (mặc định rom_nw.wad cạnh ROM.WAD, kèm rom_nw.toc nếu có ROM.TOC)")
+    p.add_argument("--toc", help="với --out: ROM.TOC xuất (--relocate: ROM.TOC gốc cạnh ROM.WAD + con trỏ đã sửa)")
+    p.add_argument("--full", action="store_true", help="import đầy đủ, không dùng lại rom_nw.wad cũ")
+    p.add_argument("--patch", help="ghi thêm patch WADPATCH so với ROM.WAD / ROM.TOC gốc (xem wad_patch.py)")
+    p.add_argument("--patch-only", action="store_true", help="với --patch: không ghi rom_nw.wad")
+    p.add_argument("--fonts", help="thư mục font thay thế (tên như fonts/report.json), ghi cùng lượt (xem font_assets.py)")
+
+    p = sub.add_parser("plan", help="kiểm tra dung lượng (+ độ rộng dòng), không ghi file", parents=[jobs])
+    p.add_argument("wad")
+    p.add_argument("txt_dir")
+    p.add_argument("--font", help="kiểm tra thêm độ rộng dòng theo font (xem text_width.py)")
+    p.add_argument("--max-width", type=int, default=256, help="pixel tối đa mỗi dòng cho --font (mặc định 256)")
+
+    p = sub.add_parser("verify", help="export -> import trong bộ nhớ, báo block không ra đúng WAD gốc",
+                       parents=[jobs, toc])
+    p.add_argument("wad")
+
+    p = sub.add_parser("list", help="liệt kê các DS_GXT (dùng index cache cạnh WAD)", parents=[toc])
+    p.add_argument("wad")
+
+    p = sub.add_parser("watch", help="import rồi theo dõi TXT_DIR, tự vá rom_nw.wad mỗi khi TXT đổi",
+                       parents=[jobs])
+    p.add_argument("wad")
+    p.add_argument("txt_dir")
+    p.add_argument("--interval", type=float, default=0.2, help="chu kỳ poll (giây, mặc định 0.2)")
+
+    p = sub.add_parser("batch", help="chạy file job .json/.toml (nhiều WAD / thư mục trong 1 process)",
+                       parents=[jobs])
+    p.add_argument("job_file")
+    args = ap.parse_args(argv)
+    n_jobs = getattr(args, "jobs", 1)
+    relocate = getattr(args, "relocate", False)
+    from_toc = getattr(args, "from_toc", False)
+
+    if args.cmd is None:
+        interactive(n_jobs, relocate)
+        return 0
+    if args.cmd == "export":
+        export_rom_wad(args.wad, args.out_dir, jobs=n_jobs, from_toc=from_toc)
+        return 0
+    if args.cmd == "import":
+        if args.out:
+            out_wad, out_toc = args.out, args.toc
+        else:
+            out_wad, out_toc = _default_outputs(args.wad)
+        if args.patch_only and not args.patch:
+            ap.error("--patch-only cần --patch")
+        if relocate and args.out and not args.toc and not args.patch_only:
+            ap.error("--relocate với --out cần --toc (ROM.TOC xuất với con trỏ đã sửa)")
+        res = import_rom_wad(args.wad, args.txt_dir, None if args.patch_only else out_wad, out_toc,
+                             jobs=n_jobs, incremental=not args.full, relocate=relocate,
+                             patch_path=args.patch, font_dir=args.fonts)
+        return 1 if res["errors"] else 0
+    if args.cmd == "plan":
+        return 1 if run_plan(args.wad, args.txt_dir, n_jobs, args.font, args.max_width) else 0
+    if args.cmd == "verify":
+        result = verify_roundtrip(args.wad, n_jobs, from_toc)
+        print_verify(result)
+        return 1 if result["mismatches"] else 0
+    if args.cmd == "list":
+        list_blocks(args.wad, from_toc)
+        return 0
+    if args.cmd == "watch":
+        out_wad, out_toc = _default_outputs(args.wad)
+        watch_rom_wad(args.wad, args.txt_dir, out_wad, out_toc, interval=args.interval, jobs=n_jobs)
+        return 0
+    return 1 if run_batch(args.job_file, getattr(args, "jobs", None)) else 0
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kiểm tra độ rộng (pixel) từng dòng text theo font, trước khi import.
+
+  python text_width.py ../binfont/PSP_Hel12x12.bin export_txt --max-width 240
+  python text_width.py fonts/helv_16x16.bin ../GXT --max-width 256 --json
+
+Font hỗ trợ (glyph i <=> symbol 0x20 + i, như CBinFile.write_to_text_file của gxt2txt.py):
+  - .bin dạng CBinFile (PSP/iPhone): u16 số glyph, u16 chiều cao, rồi (width, x, y) u16 mỗi glyph.
+  - .txt của CBinFile ("BIN" / FONT_HEIGHT / FONT_SYMBOLS / "width x y").
+  - .bin font NDS (nds/fonts/*.bin): u16 số bảng, u16 số glyph, rồi 4 byte mỗi glyph
+    (u8 width, u8 cờ, u16 offset bitmap). Chỉ dùng width của bảng đầu (bitmap: xem nds_font.py).
+
+Độ rộng tính trên symbol của game (sau encode_text_to_units: a..z -> 0x5C..0x75, ~#HEX~, <HEX>),
+tách dòng ở 0x000A (~n~). Tag >= 0xFEF0 (màu, icon ...) tính 0 pixel. Symbol ngoài font được báo
+là "thiếu glyph"; chữ có dấu (ạ, ế, Đ ...) khi đó tạm tính bằng width của chữ gốc.
+
+TXT: thư mục export của romwad_2way_tool.py (N=text + _manifest.json) hoặc TXT của gxt2txt.py
+(UTF-16, dòng đầu "GXT", bỏ qua dòng ";;;").
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import struct
+import sys
+import unicodedata
+from array import array
+from pathlib import Path
+
+import romwad_2way_tool as rw
+
+FIRST_SYMBOL = 0x20
+TAG_FIRST = 0xFEF0
+
+class FontMetrics:
+    """
+    Bảng width (array('H') 0x10000 phần tử) đánh chỉ số theo symbol u16 của game,
+    kèm bảng no_glyph (1 = symbol không có trong font).
+    Symbol thiếu glyph lấy width của chữ gốc nếu có (ạ -> a, Đ -> D), ngược lại 0.
+    """
+    __slots__ = ("name", "height", "glyphs", "widths", "no_glyph")
+
+    def __init__(self, name: str, glyph_widths: list[int], height: int | None = None,
+                 first_symbol: int = FIRST_SYMBOL):
+        self.name = name
+        self.height = height
+        self.glyphs = len(glyph_widths)
+        end = min(first_symbol + len(glyph_widths), TAG_FIRST)
+        widths = array("H", bytes(2 * 0x10000))
+        widths[first_symbol:end] = array("H", glyph_widths[:end - first_symbol])
+        no_glyph = bytearray(0x10000)
+        for sym in range(0x10000):
+            if sym < first_symbol and sym not in (0x00, 0x0A) or end <= sym < TAG_FIRST:
+                no_glyph[sym] = 1
+                base = _base_symbol(sym)
+                if base is not None and first_symbol <= base < end:
+                    widths[sym] = widths[base]
+        self.widths = widths
+        self.no_glyph = bytes(no_glyph)
+
+    def line_widths(self, units: array) -> tuple[list[int], int]:
+        """Trả về (width từng dòng, số symbol thiếu glyph)."""
+        w = self.widths
+        missing = sum(map(self.no_glyph.__getitem__, units))
+        lines: list[int] = []
+        pos, n = 0, len(units)
+        while True:
+            try:
+                nl = units.index(0x0A, pos)
+            except ValueError:
+                nl = n
+            lines.append(sum(map(w.__getitem__, units[pos:nl])))
+            if nl == n:
+                return lines, missing
+            pos = nl + 1
+
+def _base_symbol(sym: int) -> int | None:
+    # chữ có dấu -> symbol của chữ gốc (theo mapping a..z của game)
+    if 0xD800 <= sym < 0xE000:
+        return None
+    base = unicodedata.normalize("NFD", chr(sym).replace("đ", "d").replace("Đ", "D"))[0]
+    if base == chr(sym) or not base.isascii():
+        return None
+    return rw.SYMBOLS.unmap_symbol(ord(base))
+
+def load_font(path: str | Path, first_symbol: int = FIRST_SYMBOL) -> FontMetrics:
+    path = Path(path)
+    data = path.read_bytes()
+    if data[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        return _load_bin_txt(path, data, first_symbol)
+    if len(data) < 4:
+        raise ValueError(f"{path.name}: file font quá ngắn")
+    a, b = struct.unpack_from("<HH", data)
+    if len(data) == 4 + 6 * a:
+        # CBinFile: numSymbolsInFont, fontHeight, (width, x, y)*
+        widths = [w for (w, _, _) in struct.iter_unpack("<HHH", data[4:])]
+        return FontMetrics(path.name, widths, b, first_symbol)
+    if 1 <= a <= 4 and 4 + 4 * b <= len(data):
+        # font NDS: số bảng, số glyph, (u8 width, u8 cờ, u16 offset)*
+        return FontMetrics(path.name, list(data[4:4 + 4 * b:4]), None, first_symbol)
+    raise ValueError(f"{path.name}: không nhận ra định dạng font")
+
+def _load_bin_txt(path: Path, data: bytes, first_symbol: int) -> FontMetrics:
+    height = None
+    widths: list[int] = []
+    for line in data.decode("utf-16").splitlines():
+        parts = line.split(";", 1)[0].split()
+        if len(parts) == 2 and parts[0] == "FONT_HEIGHT":
+            height = int(parts[1])
+        elif len(parts) >= 3 and parts[0].isdigit():
+            widths.append(int(parts[0]))
+    return FontMetrics(path.name, widths, height, first_symbol)
+
+# =======================
+#  Đọc TXT
+# =======================
+def read_strings(txt_path: Path) -> dict[int, str]:
+    """TXT export (N=text, UTF-8) hoặc TXT gxt2txt (UTF-16, 'GXT') -> {index: text}."""
+    raw = txt_path.read_bytes()
+    if raw[:2] not in (b"\xff\xfe", b"\xfe\xff"):
+        return rw.read_txt_kv(txt_path)
+    lines = raw.decode("utf-16").replace("\r\n", "\n").split("\n")[1:]
+    if lines and lines[-1] == "":
+        lines.pop()
+    return dict(enumerate(l for l in lines if not l.startswith(";;;")))
+
+def iter_txt_files(txt_dir: Path) -> list[Path]:
+    man_path = txt_dir / "_manifest.json"
+    if man_path.exists():
+        manifest = json.loads(man_path.read_text(encoding="utf-8"))
+        return [txt_dir / m["file"] for m in manifest if (txt_dir / m["file"]).exists()]
+    return sorted(txt_dir.glob("*.txt"))
+
+# =======================
+#  Kiểm tra
+# =======================
+def check_text(text: str, font: FontMetrics, max_width: int) -> dict | None:
+    """1 string -> None nếu vừa, ngược lại {"widths", "over", "missing"}."""
+    widths, missing = font.line_widths(rw.encode_text_cached(text))
+    over = [i for i, w in enumerate(widths) if w > max_width]
+    if not over and not missing:
+        return None
+    return {"widths": widths, "over": over, "missing": missing}
+
+def check_file(txt_path: Path, font: FontMetrics, max_width: int) -> list[dict]:
+    issues = []
+    for si, text in read_strings(txt_path).items():
+        r = check_text(text, font, max_width)
+        if r is not None:
+            r.update(file=txt_path.name, idx=si, text=text)
+            issues.append(r)
+    return issues
+
+def check_dir(txt_dir: str | Path, font: FontMetrics, max_width: int) -> dict:
+    txt_dir = Path(txt_dir)
+    issues: list[dict] = []
+    files = iter_txt_files(txt_dir)
+    for f in files:
+        issues += check_file(f, font, max_width)
+    return {
+        "font": font.name,
+        "max_width": max_width,
+        "files": len(files),
+        "issues": issues,
+        "over": sum(1 for i in issues if i["over"]),
+        "missing": sum(1 for i in issues if i["missing"]),
+    }
+
+def print_report(report: dict, show_missing: bool = False):
+    for i in report["issues"]:
+        if i["over"]:
+            lines = ", ".join(f"dòng {n}: {i['widths'][n]}px" for n in i["over"])
+            print(f"[!] {i['file']}:{i['idx']} quá {report['max_width']}px ({lines}): {i['text'][:60]}")
+        elif show_missing:
+            print(f"[?] {i['file']}:{i['idx']} thiếu {i['missing']} glyph: {i['text'][:60]}")
+    print(f"[OK] Width ({report['font']}, max {report['max_width']}px): {report['files']} TXT, "
+          f"{report['over']} string quá dài, {report['missing']} string có symbol thiếu glyph")
+
+def main():
+    ap = argparse.ArgumentParser(description="Kiểm tra độ rộng dòng text theo font")
+    ap.add_argument("font", help="font .bin (CBinFile / NDS) hoặc .txt của CBinFile")
+    ap.add_argument("txt_dir", help="thư mục TXT (export của romwad_2way_tool hoặc gxt2txt)")
+    ap.add_argument("--max-width", type=int, default=256, help="pixel tối đa mỗi dòng (mặc định 256)")
+    ap.add_argument("--first-symbol", type=lambda s: int(s, 0), default=FIRST_SYMBOL,
+                    help="symbol của glyph 0 (mặc định 0x20)")
+    ap.add_argument("--missing", action="store_true", help="liệt kê cả string có symbol thiếu glyph")
+    ap.add_argument("--json", action="store_true", help="in báo cáo dạng JSON")
+    args = ap.parse_args()
+
+    font = load_font(args.font, args.first_symbol)
+    report = check_dir(args.txt_dir, font, args.max_width)
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=1)
+        print()
+    else:
+        print_report(report, args.missing)
+    sys.exit(1 if report["over"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Mở ROM.WAD (file rời hoặc nằm trong image .nds) bằng mmap, dùng chung cho romwad_2way_tool.py
+và font_assets.py.
+"""
+
+from __future__ import annotations
+import mmap
+from contextlib import contextmanager
+from pathlib import Path
+
+import nds_rom
+
+ALIGN = 0x200
+PAD_BYTE = 0xAD
+
+@contextmanager
+def open_wad(path: str | Path, writable: bool = False, whole: bool = False):
+    """
+    Mở WAD bằng mmap. writable=True: ghi thẳng lên file (dùng cho bản copy rom_nw.wad).
+    Các hàm scan/parse chỉ dùng find/slice/unpack_from nên chạy được trực tiếp trên mmap.
+
+    File .nds: trả về memoryview đúng vùng ROM.WAD trong image (xem nds_rom.py);
+    whole=True: mmap cả image.
+    """
+    path = Path(path)
+    if nds_rom.is_nds(path) and not whole:
+        with nds_rom.open_file(path, "ROM.WAD", writable) as view:
+            yield view
+        return
+    if path.stat().st_size == 0:
+        # mmap không map được file rỗng
+        yield bytearray() if writable else b""
+        return
+    with open(path, "r+b" if writable else "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        try:
+            yield mm
+            if writable:
+                mm.flush()
+        finally:
+            mm.close()
+
+def flush_wad(data):
+    """
+    Ghi xuống đĩa các thay đổi trên data (từ open_wad(writable=True)) mà không đóng file.
+    File .nds: data là memoryview, flush mmap của cả image bên dưới.
+    """
+    mm = data.obj if isinstance(data, memoryview) else data
+    if isinstance(mm, mmap.mmap):
+        mm.flush()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Patch nhị phân cho ROM.WAD / ROM.TOC (thay cho việc phát hành nguyên rom_nw.wad).
+
+  python romwad_2way_tool.py import ROM.WAD export_txt --patch build.wadpatch --patch-only
+  python wad_patch.py apply build.wadpatch ROM.WAD rom_nw.wad [--toc ROM.TOC rom_nw.toc]
+  python wad_patch.py apply build.wadpatch game.nds game_nw.nds   (patch tạo từ import trên .nds)
+  python wad_patch.py info build.wadpatch
+
+Vùng cần đưa vào patch lấy từ chính import (vùng max_alloc của từng DS_GXT, chỗ Relocator ghi,
+phần nối cuối WAD, các con trỏ đã sửa trong ROM.TOC), KHÔNG so sánh toàn bộ 2 file.
+Trong mỗi vùng chỉ giữ đoạn từ byte khác đầu tiên đến byte khác cuối cùng so với bản gốc.
+IPS không dùng được (offset 24 bit, ROM.WAD ~64 MiB) nên dùng định dạng riêng, chỉ cần stdlib:
+
+  "WADPATCH" u16 version, u16 số entry
+  mỗi entry: name[8], u64 size gốc, u64 size mới, sha1 gốc[20], sha1 mới[20], u32 số record, u32 zlen
+             + zlib(record*), record = u64 offset, u32 len, len byte dữ liệu mới
+
+Apply: copy file gốc (reflink / copy_file_range nếu FS hỗ trợ), cắt / nối theo size mới rồi ghi
+các record tại chỗ; sha1 gốc được kiểm trước, sha1 kết quả kiểm sau khi ghi.
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import shutil
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+MAGIC = b"WADPATCH"
+VERSION = 1
+HEAD = struct.Struct("<8sHH")
+ENTRY = struct.Struct("<8sQQ20s20sII")
+RECORD = struct.Struct("<QI")
+_CHUNK = 4096
+
+def _first_diff(src, dst, lo: int, hi: int) -> int:
+    """Offset byte khác đầu tiên trong [lo, hi) (hi nếu giống hệt). src phải dài >= hi."""
+    while lo < hi:
+        n = min(_CHUNK, hi - lo)
+        if src[lo:lo + n] != dst[lo:lo + n]:
+            return next(i for i, (a, b) in enumerate(zip(src[lo:lo + n], dst[lo:lo + n])) if a != b) + lo
+        lo += n
+    return hi
+
+def _last_diff(src, dst, lo: int, hi: int) -> int:
+    """Offset ngay sau byte khác cuối cùng trong [lo, hi) (lo nếu giống hệt)."""
+    while lo < hi:
+        n = min(_CHUNK, hi - lo)
+        a, b = src[hi - n:hi], dst[hi - n:hi]
+        if a != b:
+            return hi - next(i for i in range(n) if a[n - 1 - i] != b[n - 1 - i])
+        hi -= n
+    return lo
+
+def merge_ranges(ranges) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for a, b in sorted(r for r in ranges if r[1] > r[0]):
+        if merged and a <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+        else:
+            merged.append((a, b))
+    return merged
+
+def diff_ranges(src, dst, ranges) -> list[tuple[int, bytes]]:
+    """
+    Record (offset, dữ liệu mới) cho các vùng [start, end) có thể đã bị ghi.
+    Phần vượt quá size gốc luôn được giữ; vùng giống hệt bản gốc bị bỏ.
+    """
+    records: list[tuple[int, bytes]] = []
+    src_size, dst_size = len(src), len(dst)
+    for a, b in merge_ranges(ranges):
+        b = min(b, dst_size)
+        if a >= b:
+            continue
+        common = min(b, src_size)
+        start = _first_diff(src, dst, a, common)
+        end = b if b > src_size else _last_diff(src, dst, start, common)
+        if start < end:
+            records.append((start, bytes(dst[start:end])))
+    return records
+
+def write_patch(path: str | Path, entries: list[tuple[str, bytes, bytes, list[tuple[int, bytes]]]]):
+    """entries: [(tên, dữ liệu gốc, dữ liệu mới, records)]; gốc / mới có thể là mmap."""
+    with open(path, "wb") as f:
+        f.write(HEAD.pack(MAGIC, VERSION, len(entries)))
+        for name, src, dst, records in entries:
+            body = zlib.compress(b"".join(RECORD.pack(off, len(d)) + d for off, d in records), 9)
+            f.write(ENTRY.pack(name.encode("ascii"), len(src), len(dst), hashlib.sha1(src).digest(),
+                               hashlib.sha1(dst).digest(), len(records), len(body)))
+            f.write(body)
+
+def read_patch(path: str | Path) -> dict[str, dict]:
+    data = Path(path).read_bytes()
+    magic, version, count = HEAD.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{Path(path).name}: không phải WADPATCH v{VERSION}")
+    pos = HEAD.size
+    entries: dict[str, dict] = {}
+    for _ in range(count):
+        name, src_size, dst_size, src_sha1, dst_sha1, nrec, zlen = ENTRY.unpack_from(data, pos)
+        pos += ENTRY.size
+        body = zlib.decompress(data[pos:pos + zlen])
+        pos += zlen
+        records, p = [], 0
+        for _ in range(nrec):
+            off, n = RECORD.unpack_from(body, p)
+            p += RECORD.size
+            records.append((off, body[p:p + n]))
+            p += n
+        entries[name.rstrip(b"\0").decode("ascii")] = {
+            "src_size": src_size, "dst_size": dst_size, "src_sha1": src_sha1, "dst_sha1": dst_sha1,
+            "records": records, "zlen": zlen,
+        }
+    return entries
+
+def file_sha1(path: Path) -> bytes:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.digest()
+
+def apply_entry(entry: dict, src_path: str | Path, out_path: str | Path, verify: bool = True):
+    src_path, out_path = Path(src_path), Path(out_path)
+    if src_path.stat().st_size != entry["src_size"] or (verify and file_sha1(src_path) != entry["src_sha1"]):
+        raise ValueError(f"{src_path.name}: không khớp file gốc của patch")
+    if src_path.resolve() != out_path.resolve():
+        shutil.copyfile(src_path, out_path)
+    with open(out_path, "r+b") as f:
+        f.truncate(entry["dst_size"])
+        for off, d in entry["records"]:
+            f.seek(off)
+            f.write(d)
+    if verify and file_sha1(out_path) != entry["dst_sha1"]:
+        raise ValueError(f"{out_path.name}: sha1 sau khi apply không khớp")
+
+def apply_patch(patch_path: str | Path, files: dict[str, tuple[str, str]], verify: bool = True):
+    """
+    files: {"wad": (ROM.WAD, rom_nw.wad), "toc": (ROM.TOC, rom_nw.toc), "nds": (game.nds, game_nw.nds)};
+    entry không có file bị bỏ qua.
+    """
+    entries = read_patch(patch_path)
+    for name, entry in entries.items():
+        if name not in files:
+            print(f"[!] Bỏ qua entry {name} (không có file gốc)")
+            continue
+        apply_entry(entry, *files[name], verify=verify)
+        print(f"[OK] {name}: {len(entry['records'])} vùng -> {files[name][1]}")
+
+def print_info(patch_path: str | Path):
+    for name, e in read_patch(patch_path).items():
+        size = sum(len(d) for _, d in e["records"])
+        print(f"{name}: 0x{e['src_size']:X} -> 0x{e['dst_size']:X} byte, {len(e['records'])} vùng, "
+              f"0x{size:X} byte dữ liệu (nén 0x{e['zlen']:X}), sha1 {e['dst_sha1'].hex()}")
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Apply / xem patch WADPATCH")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("apply", help="ROM.WAD + patch -> rom_nw.wad")
+    p.add_argument("patch")
+    p.add_argument("wad")
+    p.add_argument("out_wad")
+    p.add_argument("--toc", nargs=2, metavar=("ROM_TOC", "OUT_TOC"), help="apply cả phần ROM.TOC (nếu có)")
+    p.add_argument("--no-verify", action="store_true", help="bỏ kiểm tra sha1 trước / sau khi apply")
+    p = sub.add_parser("info", help="liệt kê nội dung patch")
+    p.add_argument("patch")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "info":
+        print_info(args.patch)
+        return 0
+    # patch tạo từ .nds có entry "nds" (cả image) thay cho "wad"
+    files = {"wad": (args.wad, args.out_wad), "nds": (args.wad, args.out_wad)}
+    if args.toc:
+        files["toc"] = tuple(args.toc)
+    try:
+        apply_patch(args.patch, files, verify=not args.no_verify)
+    except ValueError as e:
+        print(f"[!] {e}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import json
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+NDS = ROOT / "nds"
+GXT_DIR = ROOT / "GXT"
+sys.path.insert(0, str(NDS))
+
+import benchmark  # noqa: E402
+import romwad_2way_tool as rw  # noqa: E402
+
+@pytest.fixture
+def wad(tmp_path) -> Path:
+    """ROM.WAD giả ~256 KiB: 24 DS_GXT xen rác, đệm 0xAD ngẫu nhiên (benchmark.make_wad)."""
+    path = tmp_path / "ROM.WAD"
+    path.write_bytes(benchmark.make_wad(256 * 1024, 24, seed=7))
+    return path
+
+@pytest.fixture(autouse=True)
+def _shutdown_pool():
+    yield
+    rw.shutdown_pool()
+
+def write_toc(wad_path: Path) -> Path:
+    """ROM.TOC giả cạnh WAD: mỗi DS_GXT 1 record (u32 offset, u32 size)."""
+    with rw.open_wad(wad_path) as data:
+        blocks = rw.scan_gxt_blocks(data)
+    toc = wad_path.with_name("ROM.TOC")
+    toc.write_bytes(b"".join(struct.pack("<II", off, end - off) for off, end in blocks))
+    return toc
+
+def txt_files(txt_dir: Path) -> list[Path]:
+    return [txt_dir / m["file"] for m in json.loads((txt_dir / "_manifest.json").read_text(encoding="utf-8"))]
+
+def set_string(txt: Path, si: int, text: str):
+    """Sửa string si trong 1 TXT export."""
+    lines = txt.read_text(encoding="utf-8").split("\n")
+    for i, line in enumerate(lines):
+        if line.split("=", 1)[0] == str(si):
+            lines[i] = f"{si}={text}"
+            break
+    else:
+        raise KeyError(si)
+    txt.write_text("\n".join(lines), encoding="utf-8")
+
+def block_texts(wad_bytes: bytes, off: int) -> list[str]:
+    info = rw.parse_gxt(wad_bytes, off, packed=True)
+    return [rw.string_to_txt(info["cps"][si], si == info["num"] - 1) for si in range(info["num"])]
+
+def make_nds(path: Path, files: dict[str, bytes]) -> Path:
+    """
+    Image .nds giả: header + FAT + FNT, file ở gốc hoặc trong 1 thư mục con ("data/ROM.WAD"),
+    mỗi file align 0x200, đệm 0xFF.
+    """
+    root = [(n, d) for n, d in files.items() if "/" not in n]
+    dirs: dict[str, list[tuple[str, bytes]]] = {}
+    for n, d in files.items():
+        if "/" in n:
+            sub, name = n.split("/", 1)
+            dirs.setdefault(sub, []).append((name, d))
+    order = [f for sub in dirs.values() for f in sub] + root  # file id: thư mục con trước
+    tables = []
+    first_id = len(order) - len(root)
+    root_t = b"".join(bytes([len(n)]) + n.encode() for n, _ in root)
+    root_t += b"".join(bytes([0x80 | len(sub)]) + sub.encode() + struct.pack("<H", 0xF001 + i)
+                       for i, sub in enumerate(dirs)) + b"\0"
+    tables.append((root_t, first_id, len(dirs) + 1))
+    file_id = 0
+    for sub in dirs.values():
+        tables.append((b"".join(bytes([len(n)]) + n.encode() for n, _ in sub) + b"\0", file_id, 0xF000))
+        file_id += len(sub)
+    pos = 8 * len(tables)
+    fnt_dirs, fnt_subs = b"", b""
+    for t, fid, parent in tables:
+        fnt_dirs += struct.pack("<IHH", pos + len(fnt_subs), fid, parent)
+        fnt_subs += t
+    fnt = fnt_dirs + fnt_subs
+    fat_off = 0x200
+    fnt_off = fat_off + 8 * len(order)
+    base = -(-(fnt_off + len(fnt)) // 0x200) * 0x200
+    fat, body = b"", bytearray()
+    for _, d in order:
+        fat += struct.pack("<II", base + len(body), base + len(body) + len(d))
+        body += d + b"\xff" * (-len(d) % 0x200)
+    header = bytearray(0x200)
+    header[0:16] = b"CHINATOWN\0\0\0YGXE"
+    struct.pack_into("<IIII", header, 0x40, fnt_off, len(fnt), fat_off, len(fat))
+    image = header + fat + fnt
+    image += b"\xff" * (base - len(image)) + body
+    path.write_bytes(image)
+    return path
@@ -0,0 +1,59 @@
+"""Non-interactive CLI and batch job files of romwad_2way_tool / gxt2txt."""
+import json
+import shutil
+
+import gxt2txt
+import romwad_2way_tool as rw
+from conftest import GXT_DIR, set_string, txt_files, write_toc
+
+def test_cli_common_options(wad, tmp_path):
+    write_toc(wad)
+    txt = tmp_path / "txt"
+    assert rw.main(["export", str(wad), str(txt), "-j", "2"]) == 0
+    set_string(txt_files(txt)[4], 0, "dời đi " * 300)
+    out, out_toc = tmp_path / "a.wad", tmp_path / "a.toc"
+    # tùy chọn chung trước lệnh con không bị default của lệnh con ghi đè
+    assert rw.main(["--relocate", "import", str(wad), str(txt), "--out", str(out), "--toc", str(out_toc)]) == 0
+    out2, out_toc2 = tmp_path / "b.wad", tmp_path / "b.toc"
+    assert rw.main(["import", str(wad), str(txt), "--out", str(out2), "--toc", str(out_toc2),
+                    "-j", "2", "--relocate", "--full"]) == 0
+    assert out.read_bytes() == out2.read_bytes() and out_toc.read_bytes() == out_toc2.read_bytes()
+    assert out_toc.read_bytes() != (tmp_path / "ROM.TOC").read_bytes()
+    assert rw.main(["verify", str(wad), "--jobs", "2"]) == 0
+    assert rw.main(["-j", "2", "list", str(wad), "--from-toc"]) == 0
+
+def test_batch_doc_example_is_json():
+    doc = rw.load_batch.__doc__
+    example = doc[doc.index("{"):doc.rindex("}") + 1]
+    batch = json.loads(example)
+    assert [t["op"] for t in batch["tasks"]] == ["export", "import", "plan", "verify", "list", "convert", "build"]
+
+def test_batch_run(wad, tmp_path):
+    gxt = tmp_path / "gxt"
+    gxt.mkdir()
+    shutil.copy(GXT_DIR / "J_AMBRACE.txt", gxt)
+    batch = tmp_path / "batch.json"
+    batch.write_text(json.dumps({"jobs": 2, "tasks": [
+        {"op": "export", "wad": "ROM.WAD", "out": "txt"},
+        {"op": "import", "wad": "ROM.WAD", "txt": "txt", "out": "rom_nw.wad", "full": True},
+        {"op": "verify", "wad": "ROM.WAD"},
+        {"op": "list", "wad": "ROM.WAD"},
+        {"op": "build", "paths": ["gxt"]},
+        {"op": "export", "wad": "missing.wad", "out": "x"},
+    ]}), encoding="utf-8")
+    assert rw.run_batch(batch) == 1  # chỉ task cuối lỗi, các task khác vẫn chạy
+    assert (tmp_path / "rom_nw.wad").read_bytes() == wad.read_bytes()
+    assert (gxt / "J_AMBRACE.gxt").exists()
+
+def test_gxt2txt_cli(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    shutil.copy(GXT_DIR / "J_AMBRACE.txt", tmp_path)
+    settings = tmp_path / "settings"
+    settings.mkdir()
+    # --settings-dir trước hoặc sau lệnh con
+    assert gxt2txt.main(["--settings-dir", str(settings), "build", "J_AMBRACE.txt"]) == 0
+    built = (tmp_path / "J_AMBRACE.gxt").read_bytes()
+    (tmp_path / "J_AMBRACE.txt").unlink()
+    assert gxt2txt.main(["convert", "J_AMBRACE.gxt", "--settings-dir", str(settings)]) == 0
+    assert gxt2txt.main(["build", str(tmp_path)]) == 0
+    assert (tmp_path / "J_AMBRACE.gxt").read_bytes() == built
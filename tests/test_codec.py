@@ -0,0 +1,107 @@
+"""Golden tests over the 223 text files in GXT/: table-driven codec vs the original if-chain."""
+import re
+
+import pytest
+
+import gxt2txt
+import romwad_2way_tool as rw
+from conftest import GXT_DIR
+
+GXT_FILES = sorted(GXT_DIR.glob("*.txt"))
+
+# encode_text_to_symbols as it was before the table-driven codec (reference implementation)
+_TAG_RE = re.compile(r"~#([0-9A-Fa-f]{1,8})~")
+_ALT_TAG_RE = re.compile(r"<([0-9A-Fa-f]{2,8})>")
+
+def reference_encode(s: str) -> list[int]:
+    cps: list[int] = []
+    i = 0
+    while i < len(s):
+        if s.startswith("~n~", i):
+            cps.append(0x000A)
+            i += 3
+            continue
+        m = _TAG_RE.match(s, i) or _ALT_TAG_RE.match(s, i)
+        if m:
+            cps.append(int(m.group(1), 16))
+            i = m.end()
+            continue
+        ch = s[i]
+        cps.append(0x5C + ord(ch) - ord("a") if "a" <= ch <= "z" else ord(ch))
+        i += 1
+    return cps
+
+def gxt_lines(path) -> list[str]:
+    data = path.read_bytes()
+    if data[:2] == b"\xff\xfe":
+        data = data[2:]
+    lines = gxt2txt.split_text_lines(data.decode("utf-16-le"))
+    assert lines[0].startswith("GXT")
+    return [line for line in lines[1:] if not line.startswith(";;;")]
+
+def test_gxt_dir_complete():
+    assert len(GXT_FILES) == 223
+
+@pytest.mark.parametrize("path", GXT_FILES, ids=lambda p: p.stem)
+def test_encode_matches_reference(path):
+    for line in gxt_lines(path):
+        expected = reference_encode(line)
+        assert list(rw.encode_text_to_units(line)) == expected, line
+        assert rw.encode_text_to_symbols(line) == expected, line
+
+@pytest.mark.parametrize("path", GXT_FILES, ids=lambda p: p.stem)
+def test_decode_roundtrip(path):
+    lines = gxt_lines(path)
+    for i, line in enumerate(lines):
+        units = rw.encode_text_to_units(line)
+        last = i == len(lines) - 1
+        if last:
+            units.append(0)
+        text = rw.string_to_txt(units, last)
+        assert rw.parse_txt_kv(f"0={text}") == {0: text}
+        assert rw.encode_text_to_units(text) == (units[:-1] if last else units), line
+
+def test_decode_table_matches_decode_symbol():
+    for cp in range(0x10000):
+        assert rw.DECODE_TABLE.get(cp, chr(cp)) == rw.decode_symbol(cp)
+
+@pytest.mark.parametrize("path", GXT_FILES, ids=lambda p: p.stem)
+def test_gxt2txt_build_convert_stable(path, tmp_path):
+    """TXT -> GXT -> TXT -> GXT gives the same GXT bytes both times."""
+    first = gxt2txt.CGXTFile()
+    assert first.read_from_text_file(str(path))
+    if not first.strings:
+        pytest.skip("no strings")
+    first.write(str(tmp_path / "a.gxt"))
+    gxt2txt.CGXTFile(str(tmp_path / "a.gxt")).write_to_text_file(str(tmp_path / "a.txt"))
+    second = gxt2txt.CGXTFile()
+    assert second.read_from_text_file(str(tmp_path / "a.txt"))
+    second.write(str(tmp_path / "b.gxt"))
+    assert (tmp_path / "a.gxt").read_bytes() == (tmp_path / "b.gxt").read_bytes()
+
+# "~" / "<" thật ngay trước khoảng trắng đầu / cuối string (ghi dạng ~#HEX~), hoặc trước 1 "<"
+# đã bị escape, không được ghép thành token mới
+EDGE_CASES = [
+    [0x7E, 0x69, 0x20],                          # "~n" + space -> ~n~#20~
+    [0x7E, 0x23, 0x31, 0x20],                    # "~#1" + space
+    [0x20, 0x7E, 0x6E, 0x7E],
+    [0x7E, 0x23, 0x46, 0x46, 0x3000],
+    [0x3000, 0x7E, 0x69, 0x3C, 0x41, 0x46, 0x3E],  # "~n" + escaped "<AF>"
+    [0x3C, 0x41, 0x20],
+]
+
+def txt_roundtrip(units: list[int]) -> list[int]:
+    text = rw.string_to_txt(units)
+    return list(rw.encode_text_to_units(rw.parse_txt_kv(f"0={text}").get(0, "")))
+
+@pytest.mark.parametrize("units", EDGE_CASES, ids=lambda u: "_".join(f"{c:X}" for c in u))
+def test_edge_escape_roundtrip(units):
+    assert txt_roundtrip(units) == units
+
+def test_random_escape_roundtrip():
+    import random
+    rng = random.Random(0)
+    alphabet = [0x7E, 0x3C, 0x3E, 0x23, 0x31, 0x41, 0x46, 0x69, 0x6E, 0x20, 0x3000, 0x0A]
+    for _ in range(20000):
+        units = [rng.choice(alphabet) for _ in range(rng.randint(1, 8))]
+        assert txt_roundtrip(units) == units, units
@@ -0,0 +1,51 @@
+"""ds_gxt: the shared DS_GXT reader / writer."""
+import shutil
+
+import pytest
+
+import benchmark
+import ds_gxt
+import gxt2txt
+from conftest import GXT_DIR
+
+CASES = [
+    ["Hello", "~n~ world", ""],
+    ["a\U0001F600b", "x"],  # surrogate pair: read_texts decodes string by string
+    ["", ""],
+    ["ạệ", "＀"],
+    ["only"],
+]
+
+@pytest.mark.parametrize("strings", CASES)
+def test_read_texts_matches_read(strings, tmp_path):
+    data = b"junk" + ds_gxt.build(strings) + b"\xAD" * 8
+    parsed = ds_gxt.read(data, 4)
+    assert ds_gxt.read_texts(data, 4) == (parsed[0].texts(), parsed[1])
+    assert ds_gxt.read_texts(data, 4)[0] == strings
+    path = tmp_path / "a.gxt"
+    path.write_bytes(ds_gxt.build(strings))
+    assert benchmark.baseline_read_gxt(str(path))[:-1] == strings[:-1]
+
+def test_read_texts_invalid():
+    data = ds_gxt.build(["abc", "def"])
+    assert ds_gxt.read_texts(data[:-3]) is None
+    assert ds_gxt.read_texts(b"DS_GXX" + data[6:]) is None
+
+def test_bench_names_unique(tmp_path):
+    shutil.copy(GXT_DIR / "J_AMBRACE.txt", tmp_path)
+    benchmark.make_gxt_files(tmp_path / "gxt", 2, 0, (0, 20), "uniform")
+    results = benchmark.bench_gxt2txt(str(tmp_path), 1) + benchmark.bench_gxt_files(tmp_path / "gxt", 1)
+    names = [r["name"] for r in results]
+    assert len(names) == len(set(names)) and "gxt2txt.CGXTFile.read.baseline" in names
+
+def test_build_empty(tmp_path):
+    # ROM.WAD: DS_GXT rỗng chỉ có header, read -> build giữ nguyên độ dài block
+    assert ds_gxt.build([]) == b"DS_GXT\0\0"
+    assert ds_gxt.gxt_end(ds_gxt.build([])) == 8
+    # gxt2txt: .gxt luôn kết thúc bằng u16 0 như writer cũ
+    path = tmp_path / "empty.gxt"
+    gxt = gxt2txt.CGXTFile()
+    gxt.strings = []
+    gxt.write(str(path))
+    assert path.read_bytes() == b"DS_GXT\0\0\0\0"
+    assert ds_gxt.read_texts(path.read_bytes()) == ([], 8)
@@ -0,0 +1,82 @@
+"""font_assets: fonts at the offsets recorded in report.json, patched by import --fonts."""
+import hashlib
+import json
+
+import pytest
+
+import font_assets
+import romwad_2way_tool as rw
+
+FONT = bytes(range(64))
+SLOT = 96  # font gốc + 32 byte 0xAD cuối WAD
+
+@pytest.fixture
+def font_wad(wad, tmp_path, monkeypatch):
+    """Thêm 1 font giả vào cuối ROM.WAD và report.json trỏ tới nó."""
+    off = wad.stat().st_size
+    wad.write_bytes(wad.read_bytes() + FONT + b"\xAD" * (SLOT - len(FONT)))
+    report = tmp_path / "report.json"
+    report.write_text(json.dumps([{"name": "test.bin", "rom_wad_offset": hex(off), "size": len(FONT),
+                                   "sha1": hashlib.sha1(FONT).hexdigest()}]), encoding="utf-8")
+    monkeypatch.setattr(font_assets, "REPORT", report)
+    return wad, off
+
+def font_slot(path, off):
+    return path.read_bytes()[off:off + SLOT]
+
+def test_check_extract(font_wad, tmp_path):
+    wad, off = font_wad
+    assets = font_assets.load_report()
+    assert font_assets.check(wad, assets) == [{"name": "test.bin", "off": off, "size": len(FONT),
+                                               "ok": True, "slot": SLOT, "abs_ok": None}]
+    assert font_assets.main(["extract", str(wad), str(tmp_path / "out")]) == 0
+    assert (tmp_path / "out" / "test.bin").read_bytes() == FONT
+    data = bytearray(wad.read_bytes())
+    data[off] ^= 1
+    wad.write_bytes(data)
+    assert not font_assets.check(wad, assets)[0]["ok"]
+    assert font_assets.main(["check", str(wad)]) == 1
+
+def test_import_patch_and_restore(font_wad, tmp_path):
+    wad, off = font_wad
+    txt, fonts, out = tmp_path / "txt", tmp_path / "fonts_vi", tmp_path / "rom_nw.wad"
+    rw.export_rom_wad(str(wad), str(txt))
+    fonts.mkdir()
+    new = b"\x01" * 80
+    (fonts / "test.bin").write_bytes(new)
+    result = rw.import_rom_wad(str(wad), str(txt), str(out), font_dir=str(fonts))
+    assert result["fonts"] == ["test.bin"] and result["errors"] == []
+    assert font_slot(out, off) == new + b"\xAD" * (SLOT - len(new))
+    # font không vừa chỗ: báo lỗi, giữ font gốc
+    (fonts / "test.bin").write_bytes(b"\x02" * (SLOT + 1))
+    result = rw.import_rom_wad(str(wad), str(txt), str(out), font_dir=str(fonts))
+    assert result["fonts"] == [] and len(result["errors"]) == 1
+    assert font_slot(out, off) == font_slot(wad, off)
+    # import tăng dần trên rom_nw.wad cũ, không --fonts: font của lần trước được chép lại bản gốc
+    (fonts / "test.bin").write_bytes(new)
+    rw.import_rom_wad(str(wad), str(txt), str(out), font_dir=str(fonts))
+    result = rw.import_rom_wad(str(wad), str(txt), str(out))
+    assert result["skipped"] == 24 and out.read_bytes() == wad.read_bytes()
+
+def test_import_without_fonts_skips_report(wad, tmp_path, monkeypatch):
+    txt = tmp_path / "txt"
+    rw.export_rom_wad(str(wad), str(txt))
+    monkeypatch.setattr(font_assets, "load_report", lambda path=None: pytest.fail("load_report"))
+    monkeypatch.setattr(font_assets, "sha1_of", lambda *a: pytest.fail("sha1_of"))
+    for use_mmap in (True, False):
+        out = tmp_path / f"rom_nw_{use_mmap}.wad"
+        rw.import_rom_wad(str(wad), str(txt), str(out), use_mmap=use_mmap)
+        assert out.read_bytes() == wad.read_bytes()
+
+def test_missing_report_not_fatal(wad, tmp_path, monkeypatch):
+    monkeypatch.setattr(font_assets, "REPORT", tmp_path / "missing.json")
+    txt, out = tmp_path / "txt", tmp_path / "rom_nw.wad"
+    rw.export_rom_wad(str(wad), str(txt))
+    fonts = tmp_path / "fonts_vi"
+    fonts.mkdir()
+    (fonts / "test.bin").write_bytes(FONT)
+    result = rw.import_rom_wad(str(wad), str(txt), str(out), font_dir=str(fonts))
+    assert result["fonts"] == [] and result["errors"] == []
+    # import tăng dần (rom_nw.wad cũ) cũng không cần report
+    result = rw.import_rom_wad(str(wad), str(txt), str(out))
+    assert result["skipped"] == 24 and out.read_bytes() == wad.read_bytes()
@@ -0,0 +1,23 @@
+"""gxt2txt: symbol / tag lookups follow the current settings."""
+import gxt2txt
+
+def test_symbols_follow_tag_changes(monkeypatch):
+    monkeypatch.setattr(gxt2txt, "tags", [{"symbol": 0xFF01, "tagname": "red"}])
+    monkeypatch.setattr(gxt2txt, "symbols_cache", None)
+    assert gxt2txt.get_tag(0xFF01) == "red"
+    # sửa tại chỗ (cùng list, cùng id): không được dùng bảng cũ
+    gxt2txt.tags[0]["tagname"] = "blue"
+    assert gxt2txt.get_tag(0xFF01) == "blue"
+    # list mới thay list cũ, kể cả khi trùng độ dài
+    monkeypatch.setattr(gxt2txt, "tags", [{"symbol": 0xFF02, "tagname": "green"}])
+    assert gxt2txt.get_tag(0xFF01) is None and gxt2txt.get_tag(0xFF02) == "green"
+    table = gxt2txt.get_symbols()
+    assert gxt2txt.get_symbols() is table
+
+def test_symbols_follow_mapping_switch(monkeypatch):
+    monkeypatch.setattr(gxt2txt, "symbols_cache", None)
+    monkeypatch.setattr(gxt2txt, "use_mapping", True)
+    mapped = gxt2txt.unmap_symbol(ord("a"))
+    assert mapped != ord("a")
+    monkeypatch.setattr(gxt2txt, "use_mapping", False)
+    assert gxt2txt.unmap_symbol(ord("a")) == ord("a")
@@ -0,0 +1,31 @@
+"""Incremental import: only blocks whose TXT changed are re-encoded, result equals a full import."""
+import romwad_2way_tool as rw
+from conftest import set_string, txt_files
+
+def test_incremental_matches_full(wad, tmp_path):
+    txt = tmp_path / "txt"
+    rw.export_rom_wad(str(wad), str(txt))
+    files = txt_files(txt)
+    out = tmp_path / "out.wad"
+    set_string(files[1], 0, "lần một")
+    rw.import_rom_wad(str(wad), str(txt), str(out))
+    set_string(files[1], 0, "lần hai")
+    set_string(files[8], 0, "khối khác")
+    res = rw.import_rom_wad(str(wad), str(txt), str(out))
+    assert res["skipped"] == 22
+    full = tmp_path / "full.wad"
+    rw.import_rom_wad(str(wad), str(txt), str(full), incremental=False)
+    assert out.read_bytes() == full.read_bytes()
+
+def test_incremental_restores_reverted_block(wad, tmp_path):
+    """TXT sửa rồi trả lại như cũ: block trong rom_nw.wad cũ phải quay về bản gốc."""
+    txt = tmp_path / "txt"
+    rw.export_rom_wad(str(wad), str(txt))
+    files = txt_files(txt)
+    original = files[4].read_bytes()
+    out = tmp_path / "out.wad"
+    set_string(files[4], 0, "tạm thời")
+    rw.import_rom_wad(str(wad), str(txt), str(out))
+    files[4].write_bytes(original)
+    rw.import_rom_wad(str(wad), str(txt), str(out))
+    assert out.read_bytes() == wad.read_bytes()
@@ -0,0 +1,22 @@
+"""--jobs: process pool gives the same TXT / WAD as a sequential run."""
+import romwad_2way_tool as rw
+from conftest import set_string, txt_files
+
+def test_export_jobs_same_txt(wad, tmp_path):
+    rw.export_rom_wad(str(wad), str(tmp_path / "a"))
+    rw.export_rom_wad(str(wad), str(tmp_path / "b"), jobs=2)
+    for a, b in zip(txt_files(tmp_path / "a"), txt_files(tmp_path / "b")):
+        assert a.read_bytes() == b.read_bytes()
+
+def test_import_jobs_same_wad(wad, tmp_path):
+    txt = tmp_path / "txt"
+    rw.export_rom_wad(str(wad), str(txt), jobs=2)
+    out = tmp_path / "out.wad"
+    res = rw.import_rom_wad(str(wad), str(txt), str(out), jobs=2, incremental=False)
+    assert res["errors"] == [] and out.read_bytes() == wad.read_bytes()
+    for i in (0, 7, 19):
+        set_string(txt_files(txt)[i], 0, f"song song {i}")
+    seq = tmp_path / "seq.wad"
+    rw.import_rom_wad(str(wad), str(txt), str(out), jobs=2, incremental=False)
+    rw.import_rom_wad(str(wad), str(txt), str(seq), incremental=False)
+    assert out.read_bytes() == seq.read_bytes()
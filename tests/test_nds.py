@@ -0,0 +1,54 @@
+import pytest
+
+import nds_rom
+import romwad_2way_tool as rw
+from conftest import block_texts, make_nds, set_string, txt_files, write_toc
+
+@pytest.fixture
+def nds(wad, tmp_path):
+    """Image .nds giả chứa data/ROM.TOC, data/ROM.WAD (fixture wad) và 1 file khác."""
+    toc = write_toc(wad)
+    return make_nds(tmp_path / "game.nds", {"data/ROM.TOC": toc.read_bytes(), "data/ROM.WAD": wad.read_bytes(),
+                                            "other.bin": b"x" * 1000})
+
+def test_fnt_fat(nds, wad):
+    img = nds_rom.NdsImage.open(nds)
+    assert img.title == "CHINATOWN" and img.code == "YGXE"
+    assert set(img.files) == {"data/ROM.TOC", "data/ROM.WAD", "other.bin"}
+    assert img.find("rom.wad") == "data/ROM.WAD"
+    start, end = img.span("ROM.WAD")
+    assert nds.read_bytes()[start:end] == wad.read_bytes()
+    assert img.room("ROM.WAD") == img.span("other.bin")[0] - start
+    assert nds_rom.read_file(nds, "ROM.TOC") == (wad.parent / "ROM.TOC").read_bytes()
+    assert nds_rom.read_file(nds, "missing.bin") is None
+
+def test_nds_export_import_identity(nds, tmp_path):
+    txt = tmp_path / "txt"
+    assert len(rw.export_rom_wad(str(nds), str(txt))) == 24
+    out = tmp_path / "game_nw.nds"
+    res = rw.import_rom_wad(str(nds), str(txt), str(out), incremental=False)
+    assert res["errors"] == []
+    assert out.read_bytes() == nds.read_bytes()
+
+def test_watch_nds(nds, tmp_path, monkeypatch):
+    """watch trên .nds: data là memoryview của mmap image, vá xong phải ghi được xuống file."""
+    txt = tmp_path / "txt"
+    rw.export_rom_wad(str(nds), str(txt))
+    out = tmp_path / "game_nw.nds"
+    calls = []
+
+    def fake_sleep(_):
+        calls.append(1)
+        if len(calls) == 1:
+            set_string(txt_files(txt)[3], 0, "sua khi watch")
+        elif len(calls) > 2:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(rw.time, "sleep", fake_sleep)
+    rw.watch_rom_wad(str(nds), str(txt), str(out))
+    fresh = tmp_path / "fresh.nds"
+    rw.import_rom_wad(str(nds), str(txt), str(fresh), incremental=False)
+    assert out.read_bytes() == fresh.read_bytes()
+    start, end = nds_rom.wad_span(out)
+    man = rw.export_rom_wad(str(nds), str(tmp_path / "again"))
+    assert block_texts(out.read_bytes()[start:end], man[3]["off"])[0] == "sua khi watch"
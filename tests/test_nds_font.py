@@ -0,0 +1,91 @@
+"""nds_font: decode a small synthetic NDS font and render it to PNG."""
+import struct
+import zlib
+
+import pytest
+
+import nds_font
+import romwad_2way_tool as rw
+
+BASE = 0x7C  # offset trong bảng tính từ gốc lệch như font thật
+# (width, cờ, bitmap): 1 dải 8 pixel, lưu theo cột (LSB = hàng trên); 1 bit / pixel: 1 byte / cột
+GLYPHS = [
+    (4, 2, bytes([0x01, 0xFF, 0x80])),        # cờ bit 1: 3 cột lưu + 1 cột khoảng cách
+    (2, 0, bytes([0x0F, 0xF0])),
+    (3, 3, bytes([0x1B, 0xE4, 0xFF, 0x00])),  # 2 bit / pixel: 2 byte / cột
+]
+PIXELS = [
+    [[3, 3, 0, 0]] + [[0, 3, 0, 0]] * 6 + [[0, 3, 3, 0]],
+    [[3, 0]] * 4 + [[0, 3]] * 4,
+    [[3, 3, 0], [2, 3, 0], [1, 3, 0], [0, 3, 0], [0, 0, 0], [1, 0, 0], [2, 0, 0], [3, 0, 0]],
+]
+
+def make_font() -> bytes:
+    table_end = 4 + 4 * len(GLYPHS)
+    records, bitmaps = [], b""
+    for w, flags, bitmap in GLYPHS:
+        records.append(struct.pack("<BBH", w, flags, BASE + table_end + len(bitmaps)))
+        bitmaps += bitmap
+    return struct.pack("<HH", 1, len(GLYPHS)) + b"".join(records) + bitmaps
+
+@pytest.fixture
+def font():
+    return nds_font.NdsFont.parse(make_font(), "test.bin")
+
+def test_decode(font):
+    assert len(font) == 3 and font.height == 8
+    assert font.widths == bytes([4, 2, 3])
+    for i, expected in enumerate(PIXELS):
+        assert [list(row) for row in font.glyph_rows(i)] == expected
+    assert font.glyph_index(0x21) == 1 and font.glyph_index(0x1F) is None and font.glyph_index(0x23) is None
+
+def test_parse_invalid():
+    with pytest.raises(ValueError):
+        nds_font.NdsFont.parse(b"\0\0")
+    with pytest.raises(ValueError):
+        nds_font.NdsFont.parse(struct.pack("<HH", 1, 100) + bytes(8))
+
+def read_png(path) -> tuple[int, int, list[bytes]]:
+    data = path.read_bytes()
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks, p = {}, 8
+    while p < len(data):
+        n, kind = struct.unpack_from(">I4s", data, p)
+        body = data[p + 8:p + 8 + n]
+        assert struct.unpack_from(">I", data, p + 8 + n)[0] == zlib.crc32(kind + body)
+        chunks[kind] = body
+        p += 12 + n
+    width, height, depth, color = struct.unpack_from(">IIBB", chunks[b"IHDR"])
+    assert (depth, color) == (8, 0)
+    raw = zlib.decompress(chunks[b"IDAT"])
+    stride = width + 1
+    assert all(raw[r * stride] == 0 for r in range(height))  # filter 0
+    return width, height, [raw[r * stride + 1:(r + 1) * stride] for r in range(height)]
+
+def test_render_and_png(font, tmp_path):
+    units = rw.encode_text_to_units(' !"')
+    width, rows = font.render_units(units)
+    assert width == 9
+    assert [list(row) for row in rows] == [a + b + c for a, b, c in zip(*PIXELS)]
+    path = tmp_path / "line.png"
+    nds_font.write_image(path, width, rows, scale=2)
+    w, h, png = read_png(path)
+    assert (w, h) == (18, 16)
+    assert png[0][:4] == bytes([0x00] * 4) and png[0][4:8] == bytes([0xFF] * 4)  # pixel 3 = đen, 0 = trắng
+    assert png == [row.translate(nds_font.GRAY) for row in nds_font.scale_rows(rows, 2)]
+    # symbol thiếu glyph: ô khung rộng max(4, height / 2)
+    width, rows = font.render_units(rw.encode_text_to_units(" A"))
+    assert width == 8 and rows[1][4:] == bytes([0, nds_font.MISSING, nds_font.MISSING, 0])
+
+def test_cli_atlas_and_preview(wad, tmp_path):
+    path = tmp_path / "test.bin"
+    path.write_bytes(make_font())
+    atlas = tmp_path / "atlas.png"
+    assert nds_font.main(["atlas", str(path), str(atlas)]) == 0
+    w, h, _ = read_png(atlas)
+    assert (w, h) == ((4 + 2) * nds_font.COLUMNS, 8 + 2)
+    txt = tmp_path / "txt"
+    rw.export_rom_wad(str(wad), str(txt))
+    out = tmp_path / "png"
+    assert nds_font.preview_dir(nds_font.NdsFont.load(path), txt, out, max_width=40) > 0
+    assert len(list(out.glob("*.png"))) == 24
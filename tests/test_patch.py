@@ -0,0 +1,66 @@
+"""WADPATCH: binary patch written by import, applied by wad_patch.py."""
+import pytest
+
+import romwad_2way_tool as rw
+import wad_patch
+from conftest import set_string, txt_files, write_toc
+
+def test_diff_ranges():
+    src = bytes(range(256)) * 4
+    dst = bytearray(src)
+    dst[10:12] = b"xy"
+    dst[500] ^= 1
+    dst += b"tail"
+    # vùng không đổi bị bỏ, mỗi vùng cắt từ byte khác đầu tới byte khác cuối, phần nối luôn giữ
+    assert wad_patch.diff_ranges(src, dst, [(0, 100), (200, 300), (400, 600), (1020, 1028)]) == [
+        (10, b"xy"), (500, bytes([dst[500]])), (1024, b"tail")]
+    assert wad_patch.merge_ranges([(5, 8), (0, 3), (2, 6), (9, 9)]) == [(0, 8)]
+
+def test_patch_apply(wad, tmp_path):
+    write_toc(wad)
+    txt = tmp_path / "txt"
+    rw.export_rom_wad(str(wad), str(txt))
+    files = txt_files(txt)
+    set_string(files[0], 0, "vá nhị phân")
+    set_string(files[4], 0, "dời đi " * 300)
+    out, out_toc, patch = tmp_path / "rom_nw.wad", tmp_path / "rom_nw.toc", tmp_path / "build.wadpatch"
+    rw.import_rom_wad(str(wad), str(txt), str(out), str(out_toc), relocate=True, patch_path=str(patch))
+    assert patch.stat().st_size < out.stat().st_size // 4
+    wad_patch.apply_patch(patch, {"wad": (wad, tmp_path / "p.wad"), "toc": (tmp_path / "ROM.TOC", tmp_path / "p.toc")})
+    assert (tmp_path / "p.wad").read_bytes() == out.read_bytes()
+    assert (tmp_path / "p.toc").read_bytes() == out_toc.read_bytes()
+    # CLI, và patch-only cho cùng kết quả
+    only = tmp_path / "only.wadpatch"
+    rw.import_rom_wad(str(wad), str(txt), None, relocate=True, patch_path=str(only))
+    assert wad_patch.main(["apply", str(only), str(wad), str(tmp_path / "c.wad"),
+                           "--toc", str(tmp_path / "ROM.TOC"), str(tmp_path / "c.toc")]) == 0
+    assert (tmp_path / "c.wad").read_bytes() == out.read_bytes()
+    assert (tmp_path / "c.toc").read_bytes() == out_toc.read_bytes()
+
+def test_patch_incremental_base(wad, tmp_path):
+    """Import tăng dần trên rom_nw.wad cũ: patch vẫn so với ROM.WAD gốc."""
+    txt = tmp_path / "txt"
+    rw.export_rom_wad(str(wad), str(txt))
+    files = txt_files(txt)
+    out, patch = tmp_path / "rom_nw.wad", tmp_path / "build.wadpatch"
+    original = files[2].read_bytes()
+    set_string(files[2], 0, "lần một")
+    rw.import_rom_wad(str(wad), str(txt), str(out))
+    files[2].write_bytes(original)  # block 2 quay về bản gốc, chỉ có trong rom_nw.wad cũ
+    set_string(files[9], 0, "lần hai")
+    rw.import_rom_wad(str(wad), str(txt), str(out), patch_path=str(patch))
+    wad_patch.apply_patch(patch, {"wad": (wad, tmp_path / "p.wad")})
+    assert (tmp_path / "p.wad").read_bytes() == out.read_bytes()
+
+def test_patch_rejects_other_source(wad, tmp_path):
+    txt = tmp_path / "txt"
+    rw.export_rom_wad(str(wad), str(txt))
+    set_string(txt_files(txt)[0], 0, "khác")
+    patch = tmp_path / "build.wadpatch"
+    rw.import_rom_wad(str(wad), str(txt), None, patch_path=str(patch))
+    other = tmp_path / "other.wad"
+    data = bytearray(wad.read_bytes())
+    data[-1] ^= 0xFF
+    other.write_bytes(data)
+    with pytest.raises(ValueError):
+        wad_patch.apply_patch(patch, {"wad": (other, tmp_path / "x.wad")})
@@ -0,0 +1,77 @@
+"""--relocate: DS_GXT that outgrow their 0xAD padding move elsewhere, ROM.TOC pointers follow."""
+import struct
+
+import pytest
+
+import romwad_2way_tool as rw
+import wad_patch
+from conftest import block_texts, set_string, txt_files, write_toc
+
+LONG_TEXT = "dời đi " * 299 + "dời đi"
+
+def test_relocate(wad, tmp_path):
+    write_toc(wad)
+    txt = tmp_path / "txt"
+    man = rw.export_rom_wad(str(wad), str(txt))
+    set_string(txt_files(txt)[2], 0, LONG_TEXT)
+    out, out_toc = tmp_path / "rom_nw.wad", tmp_path / "rom_nw.toc"
+    res = rw.import_rom_wad(str(wad), str(txt), str(out), str(out_toc), relocate=True)
+    assert res["errors"] == []
+    data, toc = out.read_bytes(), out_toc.read_bytes()
+    new_off, size = struct.unpack_from("<II", toc, 2 * 8)
+    assert new_off != man[2]["off"] and new_off % rw.ALIGN == 0
+    assert block_texts(data, new_off)[0] == LONG_TEXT
+    assert rw.gxt_end(data, new_off) - new_off == size
+    # các con trỏ khác không đổi
+    src_toc = (tmp_path / "ROM.TOC").read_bytes()
+    assert toc[:16] == src_toc[:16] and toc[24:] == src_toc[24:]
+
+def test_relocate_rerun_reads_source_toc(wad, tmp_path):
+    """Lần import sau (cùng --out / --toc) vẫn đọc con trỏ từ ROM.TOC gốc, không từ rom_nw.toc đã sửa."""
+    write_toc(wad)
+    txt = tmp_path / "txt"
+    rw.export_rom_wad(str(wad), str(txt))
+    set_string(txt_files(txt)[4], 0, "dời đi " * 300)
+    out, out_toc = tmp_path / "rom_nw.wad", tmp_path / "rom_nw.toc"
+    rw.import_rom_wad(str(wad), str(txt), str(out), str(out_toc), relocate=True)
+    first_wad, first_toc = out.read_bytes(), out_toc.read_bytes()
+    assert first_toc != (tmp_path / "ROM.TOC").read_bytes()
+    res = rw.import_rom_wad(str(wad), str(txt), str(out), str(out_toc), relocate=True)
+    assert res["errors"] == []
+    assert out.read_bytes() == first_wad and out_toc.read_bytes() == first_toc
+    # TXT sửa lại cho vừa: rom_nw.toc quay về ROM.TOC gốc
+    set_string(txt_files(txt)[4], 0, "ngắn")
+    rw.import_rom_wad(str(wad), str(txt), str(out), str(out_toc), relocate=True)
+    assert out_toc.read_bytes() == (tmp_path / "ROM.TOC").read_bytes()
+
+def test_relocate_needs_toc_output(wad, tmp_path, capsys):
+    """--relocate mà không có ROM.TOC xuất: báo lỗi, không âm thầm bỏ qua relocate."""
+    write_toc(wad)
+    txt = tmp_path / "txt"
+    rw.export_rom_wad(str(wad), str(txt))
+    set_string(txt_files(txt)[4], 0, LONG_TEXT)
+    out = tmp_path / "out.wad"
+    with pytest.raises(ValueError, match="out_toc_path"):
+        rw.import_rom_wad(str(wad), str(txt), str(out), relocate=True)
+    with pytest.raises(SystemExit):
+        rw.main(["import", str(wad), str(txt), "--out", str(out), "--relocate"])
+    assert "--toc" in capsys.readouterr().err
+    batch = tmp_path / "batch.json"
+    batch.write_text('{"tasks": [{"op": "import", "wad": "ROM.WAD", "txt": "txt", "out": "out.wad", "relocate": true}]}')
+    assert rw.run_batch(batch) == 1
+    assert not out.exists()
+
+def test_relocate_patch_only(wad, tmp_path):
+    """--patch-only --relocate: không cần ROM.TOC xuất, patch mang cả ROM.TOC đã sửa."""
+    write_toc(wad)
+    txt = tmp_path / "txt"
+    rw.export_rom_wad(str(wad), str(txt))
+    set_string(txt_files(txt)[4], 0, LONG_TEXT)
+    patch = tmp_path / "build.wadpatch"
+    res = rw.import_rom_wad(str(wad), str(txt), None, relocate=True, patch_path=str(patch))
+    assert res["errors"] == []
+    out, out_toc = tmp_path / "rom_nw.wad", tmp_path / "rom_nw.toc"
+    rw.import_rom_wad(str(wad), str(txt), str(out), str(out_toc), relocate=True)
+    wad_patch.apply_patch(patch, {"wad": (wad, tmp_path / "p.wad"), "toc": (tmp_path / "ROM.TOC", tmp_path / "p.toc")})
+    assert (tmp_path / "p.wad").read_bytes() == out.read_bytes()
+    assert (tmp_path / "p.toc").read_bytes() == out_toc.read_bytes()
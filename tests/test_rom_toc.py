@@ -0,0 +1,66 @@
+import struct
+
+import rom_toc
+import romwad_2way_tool as rw
+from conftest import block_texts, set_string, txt_files, write_toc
+
+def write_named_toc(wad_path, records=None):
+    """ROM.TOC giả dạng (tên 16 byte, u32 offset / 0x200, u32 số block 0x200)."""
+    with rw.open_wad(wad_path) as data:
+        blocks = rw.scan_gxt_blocks(data)
+    toc = wad_path.with_name("ROM.TOC")
+    toc.write_bytes(b"".join(
+        struct.pack("<16sII", f"text{i:03d}.gxt".encode(), off // rw.ALIGN, -(-(end - off) // rw.ALIGN))
+        for i, (off, end) in enumerate(blocks) if records is None or i in records))
+    return toc
+
+def relocate_block(wad, tmp_path, i):
+    txt = tmp_path / "txt"
+    rw.export_rom_wad(str(wad), str(txt))
+    long_text = "dời đi " * 299 + "dời đi"
+    set_string(txt_files(txt)[i], 0, long_text)
+    out, out_toc = tmp_path / "rom_nw.wad", tmp_path / "rom_nw.toc"
+    res = rw.import_rom_wad(str(wad), str(txt), str(out), str(out_toc), relocate=True)
+    assert res["errors"] == []
+    return long_text, out.read_bytes(), out_toc.read_bytes()
+
+def test_layout_plain(wad):
+    toc = write_toc(wad)
+    with rw.open_wad(wad) as data:
+        index = rom_toc.TocIndex.load(toc, data)
+        blocks = rw.scan_gxt_blocks(data)
+    lay = index.layout
+    assert (lay.start, lay.count, lay.stride, lay.ptr, lay.unit) == (0, 24, 8, 0, 1)
+    assert (lay.size, lay.size_unit, lay.name) == (4, 1, None)
+    assert [(e.off, e.off + e.size) for e in index.entries] == blocks
+
+def test_layout_named(wad):
+    toc = write_named_toc(wad)
+    with rw.open_wad(wad) as data:
+        index = rom_toc.TocIndex.load(toc, data)
+    lay = index.layout
+    assert (lay.stride, lay.ptr, lay.unit, lay.size, lay.size_unit, lay.name) == (24, 16, rw.ALIGN, 20, rw.ALIGN, 0)
+    assert index.entries[5].name == "text005.gxt"
+
+def test_relocate_via_index(wad, tmp_path):
+    """Layout đoán được: con trỏ / size sửa theo layout (đơn vị 0x200), tên giữ nguyên."""
+    src_toc = write_named_toc(wad).read_bytes()
+    long_text, data, toc = relocate_block(wad, tmp_path, 2)
+    name, ptr, blocks = struct.unpack_from("<16sII", toc, 2 * 24)
+    new_off = ptr * rw.ALIGN
+    assert block_texts(data, new_off)[0] == long_text
+    assert name.rstrip(b"\0") == b"text002.gxt"
+    assert blocks == -(-(rw.gxt_end(data, new_off) - new_off) // rw.ALIGN)
+    assert toc[:2 * 24] == src_toc[:2 * 24] and toc[3 * 24:] == src_toc[3 * 24:]
+
+def test_relocate_scan_fallback(wad, tmp_path):
+    """Quá ít record để đoán layout: quay về tìm u32 = offset, size (số block) vẫn được sửa."""
+    toc_path = write_named_toc(wad, records={2, 7})
+    with rw.open_wad(wad) as data:
+        assert rom_toc.TocIndex.load(toc_path, data) is None
+    long_text, data, toc = relocate_block(wad, tmp_path, 2)
+    name, ptr, blocks = struct.unpack_from("<16sII", toc, 0)
+    new_off = ptr * rw.ALIGN
+    assert block_texts(data, new_off)[0] == long_text
+    assert blocks == -(-(rw.gxt_end(data, new_off) - new_off) // rw.ALIGN)
+    assert toc[24:] == toc_path.read_bytes()[24:]
@@ -0,0 +1,37 @@
+"""Synthetic ROM.WAD: export -> import is byte-identical, edits land in the right block."""
+import pytest
+
+import romwad_2way_tool as rw
+from conftest import block_texts, set_string, txt_files
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_export_import_identity(wad, tmp_path, use_mmap):
+    txt = tmp_path / "txt"
+    man = rw.export_rom_wad(str(wad), str(txt), use_mmap=use_mmap)
+    assert len(man) == 24
+    out = tmp_path / "out.wad"
+    res = rw.import_rom_wad(str(wad), str(txt), str(out), use_mmap=use_mmap, incremental=False)
+    assert res["errors"] == []
+    assert out.read_bytes() == wad.read_bytes()
+
+def test_import_edit(wad, tmp_path):
+    txt = tmp_path / "txt"
+    man = rw.export_rom_wad(str(wad), str(txt))
+    set_string(txt_files(txt)[3], 0, "Xin chao ~#FF00~ thế giới~n~dong hai")
+    out = tmp_path / "out.wad"
+    res = rw.import_rom_wad(str(wad), str(txt), str(out))
+    assert res["replaced"] == 24 and res["errors"] == []
+    data = out.read_bytes()
+    assert block_texts(data, man[3]["off"])[0] == "Xin chao ~#FF00~ thế giới~n~dong hai"
+    assert len(data) == wad.stat().st_size
+
+def test_import_too_long_keeps_original(wad, tmp_path):
+    txt = tmp_path / "txt"
+    man = rw.export_rom_wad(str(wad), str(txt))
+    set_string(txt_files(txt)[5], 0, "dài quá " * 2000)
+    out = tmp_path / "out.wad"
+    res = rw.import_rom_wad(str(wad), str(txt), str(out))
+    assert len(res["errors"]) == 1
+    m = man[5]
+    src = wad.read_bytes()
+    assert out.read_bytes()[m["off"]:m["off"] + m["max_alloc"]] == src[m["off"]:m["off"] + m["max_alloc"]]
@@ -0,0 +1,64 @@
+"""text_width: line measurement and overflow report on a small synthetic width table."""
+import struct
+
+import pytest
+
+import romwad_2way_tool as rw
+import text_width
+from conftest import set_string, txt_files
+
+GLYPHS = 0x60  # symbol 0x20..0x7F
+WIDTHS = [i % 7 + 2 for i in range(GLYPHS)]
+
+def w(sym: int) -> int:
+    return WIDTHS[sym - text_width.FIRST_SYMBOL]
+
+@pytest.fixture
+def font_bin(tmp_path):
+    path = tmp_path / "font.bin"
+    path.write_bytes(struct.pack("<HH", GLYPHS, 12) + b"".join(struct.pack("<HHH", wd, 0, 0) for wd in WIDTHS))
+    return path
+
+def test_formats_agree(font_bin, tmp_path):
+    font = text_width.load_font(font_bin)
+    assert (font.glyphs, font.height) == (GLYPHS, 12)
+    txt = tmp_path / "font.txt"
+    lines = ["BIN", "FONT_HEIGHT 12", f"FONT_SYMBOLS {GLYPHS}"] + [f"{wd} 0 0" for wd in WIDTHS]
+    txt.write_bytes("\r\n".join(lines).encode("utf-16"))
+    nds = tmp_path / "font_nds.bin"
+    nds.write_bytes(struct.pack("<HH", 1, GLYPHS) + b"".join(struct.pack("<BBH", wd, 0, 0) for wd in WIDTHS))
+    for other in (text_width.load_font(txt), text_width.load_font(nds)):
+        assert other.widths == font.widths and other.no_glyph == font.no_glyph
+
+def test_line_widths(font_bin):
+    font = text_width.load_font(font_bin)
+    units = rw.encode_text_to_units("AB~n~C ~#FF00~z")
+    lines, missing = font.line_widths(units)
+    z = rw.SYMBOLS.unmap_symbol(ord("z"))
+    assert lines == [w(0x41) + w(0x42), w(0x43) + w(0x20) + w(z)]  # tag: 0 pixel
+    assert missing == 0
+    # chữ có dấu ngoài font: báo thiếu glyph, tính bằng width chữ gốc
+    lines, missing = font.line_widths(rw.encode_text_to_units("ạĐ"))
+    assert lines == [w(rw.SYMBOLS.unmap_symbol(ord("a"))) + w(ord("D"))] and missing == 2
+
+def test_check_text(font_bin):
+    font = text_width.load_font(font_bin)
+    short = "AB~n~C"
+    assert text_width.check_text(short, font, 100) is None
+    long_line = "A" * 40
+    r = text_width.check_text(f"{short}~n~{long_line}", font, 100)
+    assert r == {"widths": [w(0x41) + w(0x42), w(0x43), 40 * w(0x41)], "over": [2], "missing": 0}
+    r = text_width.check_text("ạ", font, 100)
+    assert r["over"] == [] and r["missing"] == 1
+
+def test_check_dir(font_bin, wad, tmp_path):
+    txt = tmp_path / "txt"
+    rw.export_rom_wad(str(wad), str(txt))
+    font = text_width.load_font(font_bin)
+    base = text_width.check_dir(txt, font, 10 ** 6)
+    assert base["files"] == 24 and base["over"] == 0
+    set_string(txt_files(txt)[6], 1, "A" * 500)
+    report = text_width.check_dir(txt, font, 500 * w(0x41) - 1)
+    over = [i for i in report["issues"] if i["over"]]
+    assert report["over"] == len(over) >= 1
+    assert any(i["file"] == txt_files(txt)[6].name and i["idx"] == 1 for i in over)
@@ -0,0 +1,60 @@
+"""gxt_tm: SQLite translation memory, and the shared-string encode cache."""
+import gxt_tm
+import romwad_2way_tool as rw
+from conftest import set_string, txt_files
+
+def test_insert_lookup_dedup(tmp_path):
+    db = tmp_path / "tm.db"
+    with gxt_tm.TranslationMemory(str(db)) as tm:
+        assert tm.add_file("a.txt", [(0, "Mission passed", "Hoàn thành"), (1, "Wasted", None), (2, "Wasted", None)]) == 3
+        assert tm.add_file("b.txt", [(5, "Mission passed", None)]) == 1
+        assert tm.lookup("Mission passed") == "Hoàn thành"
+        assert tm.lookup("Wasted") is None and tm.lookup("missing") is None
+        # 1 entry cho mỗi source, mọi vị trí đều được giữ
+        assert tm.stats() == {"entries": 2, "translated": 1, "locations": 4, "files": 2}
+        assert tm.locations("Mission passed") == [("a.txt", 0), ("b.txt", 5)]
+        assert tm.duplicates(3) == []
+        assert tm.duplicates(2) == [("Mission passed", 2), ("Wasted", 2)]
+        # bản dịch mới ghi đè, None không xoá bản dịch cũ
+        tm.add_file("c.txt", [(0, "Wasted", "Toi rồi")])
+        tm.add_file("d.txt", [(0, "Wasted", None)])
+        assert tm.lookup("Wasted") == "Toi rồi"
+
+def test_reindex_and_prune(tmp_path):
+    with gxt_tm.TranslationMemory(str(tmp_path / "tm.db")) as tm:
+        tm.add_file("a.txt", [(0, "old line", None), (1, "kept", None)])
+        tm.add_file("a.txt", [(0, "kept", None)])
+        tm.prune()
+        assert tm.lookup("old line") is None and tm.locations("old line") == []
+        assert tm.stats()["entries"] == 1 and tm.fuzzy("old line") == []
+
+def test_persists_across_reopen(tmp_path):
+    db = tmp_path / "tm.db"
+    with gxt_tm.TranslationMemory(str(db)) as tm:
+        tm.add_file("a.txt", [(0, "Khách hàng bị giết.", "Customer killed.")])
+    with gxt_tm.TranslationMemory(str(db)) as tm:
+        assert tm.lookup("Khách hàng bị giết.") == "Customer killed."
+        assert tm.locations("Khách hàng bị giết.") == [("a.txt", 0)]
+        score, source, target = tm.fuzzy("khach hang bi giet")[0]
+        assert source == "Khách hàng bị giết." and target == "Customer killed." and score > 0.8
+
+def test_read_gxt_text_pairs(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_bytes("﻿GXT\r\n;;;Hello\r\nXin chào\r\nplain\r\n;;;untranslated\r\n".encode("utf-16-le"))
+    assert list(gxt_tm.read_gxt_text_pairs(str(path))) == [
+        (0, "Hello", "Xin chào"), (1, "plain", None), (2, "untranslated", None)]
+
+def test_build_from_export(wad, tmp_path):
+    txt = tmp_path / "txt"
+    rw.export_rom_wad(str(wad), str(txt))
+    set_string(txt_files(txt)[0], 0, "dịch rồi")
+    stats = gxt_tm.build(str(tmp_path / "tm.db"), export=(str(wad), str(txt)))
+    assert stats["files"] == 24 and stats["translated"] >= 1
+    with gxt_tm.TranslationMemory(str(tmp_path / "tm.db")) as tm:
+        assert tm.db.execute("SELECT COUNT(*) FROM entries WHERE target = 'dịch rồi'").fetchone()[0] == 1
+
+def test_encode_cache_bounded():
+    rw.encode_text_cached.cache_clear()
+    for i in range(rw.ENCODE_CACHE_SIZE + 10):
+        assert rw.encode_text_cached(f"s{i}") == rw.encode_text_to_units(f"s{i}")
+    assert rw.encode_text_cached.cache_info().currsize == rw.ENCODE_CACHE_SIZE
@@ -0,0 +1,118 @@
+"""gxt_translate against a local stub of the Yandex translate API (base_url)."""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from xml.sax.saxutils import escape
+
+import pytest
+
+import gxt_translate
+
+pytest.importorskip("requests")
+
+class StubServer:
+    """Trả về text viết hoa; ghi lại mọi request. Batch đầu tiên trả lời chậm nhất."""
+
+    def __init__(self):
+        self.requests = []  # list[list[str]] theo thứ tự nhận
+        self.in_flight = self.max_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8"),
+                                keep_blank_values=True)
+                texts = form.get("text", [])
+                with stub.lock:
+                    n = len(stub.requests)
+                    stub.requests.append(texts)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                time.sleep(max(0.0, 0.15 - 0.05 * n))
+                with stub.lock:
+                    stub.in_flight -= 1
+                if any("FAIL" in t for t in texts):
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                body = '<Translation code="200" lang="{}">{}</Translation>'.format(
+                    form["lang"][0], "".join(f"<text>{escape(t.upper())}</text>" for t in texts)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/xml; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/translate"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    yield server
+    server.close()
+
+def make_translator(stub, cache_path=None, workers=4):
+    backend = gxt_translate.YandexBackend("key", "en-vi", base_url=stub.url, max_workers=workers)
+    return gxt_translate.Translator(backend, "en-vi", gxt_translate.TranslationCache(cache_path), workers), backend
+
+def test_batching(stub):
+    texts = [f"line {i:03d}" for i in range(150)] + ["line 007", "  "]
+    translator, backend = make_translator(stub)
+    result = translator.translate_all(texts)
+    backend.close()
+    # trùng lặp / chỉ khoảng trắng không gửi đi; tối đa MAX_BATCH_STRINGS string mỗi request
+    assert sorted(len(r) for r in stub.requests) == [22, 64, 64]
+    assert sorted(t for r in stub.requests for t in r) == sorted(set(texts) - {"  "})
+    assert result["  "] == "  "
+
+def test_batch_char_limit(stub):
+    texts = [c * 3000 for c in "abcde"]
+    translator, backend = make_translator(stub)
+    translator.translate_all(texts)
+    backend.close()
+    assert all(sum(map(len, r)) <= gxt_translate.MAX_BATCH_CHARS for r in stub.requests)
+    assert len(stub.requests) == 3
+
+def test_concurrent_results_in_order(stub):
+    """Batch trả về không theo thứ tự gửi: mỗi text vẫn khớp đúng bản dịch của nó."""
+    texts = [f"text {i}" for i in range(4 * gxt_translate.MAX_BATCH_STRINGS)]
+    translator, backend = make_translator(stub)
+    result = translator.translate_all(texts)
+    backend.close()
+    assert len(stub.requests) == 4 and stub.max_in_flight > 1
+    assert result == {t: t.upper() for t in texts}
+
+def test_cache_persists(stub, tmp_path):
+    cache = tmp_path / "translations.cache.json"
+    texts = ["hello", "world", "hello"]
+    translator, backend = make_translator(stub, str(cache))
+    assert translator.translate_all(texts) == {"hello": "HELLO", "world": "WORLD"}
+    backend.close()
+    assert len(stub.requests) == 1 and cache.exists()
+    # lần chạy sau: đọc cache từ đĩa, không gọi backend
+    translator, backend = make_translator(stub, str(cache))
+    assert translator.translate_all(texts) == {"hello": "HELLO", "world": "WORLD"}
+    assert translator.translate("world") == "WORLD"
+    backend.close()
+    assert len(stub.requests) == 1
+
+def test_failed_batch_falls_back(stub, tmp_path):
+    cache = tmp_path / "translations.cache.json"
+    texts = [f"ok {i}" for i in range(gxt_translate.MAX_BATCH_STRINGS)] + ["FAIL me"]
+    translator, backend = make_translator(stub, str(cache), workers=1)
+    result = translator.translate_all(texts)
+    assert "FAIL me" not in result and result["ok 1"] == "OK 1"
+    assert translator.translate("FAIL me") == "FAIL me"
+    backend.close()
+    assert gxt_translate.TranslationCache(str(cache)).get("FAIL me", "en-vi") is None
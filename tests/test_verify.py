@@ -0,0 +1,12 @@
+"""verify: export -> import round trip in memory, byte for byte."""
+import romwad_2way_tool as rw
+
+def test_verify_roundtrip(wad):
+    result = rw.verify_roundtrip(str(wad), jobs=2)
+    assert result["blocks"] == 24 and result["mismatches"] == []
+
+def test_verify_reports_mismatch(wad, monkeypatch):
+    # string_to_txt làm mất khoảng trắng cuối: verify phải bắt được
+    monkeypatch.setattr(rw, "string_to_txt", lambda cps, last=False: rw.decode_units(cps[:-1] if last else cps) + " ")
+    result = rw.verify_roundtrip(str(wad))
+    assert result["mismatches"]
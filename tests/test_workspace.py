@@ -0,0 +1,55 @@
+"""Workspace: blocks of ROM.WAD with a sidecar index (ROM.WAD.gxtidx.json)."""
+import os
+
+import romwad_2way_tool as rw
+from conftest import set_string, txt_files, write_toc
+
+def index_path(wad):
+    return wad.with_name(wad.name + rw.INDEX_SUFFIX)
+
+def test_blocks_match_scan(wad):
+    with rw.Workspace(wad) as ws:
+        spans = [(b.off, b.raw_end) for b in ws]
+        assert spans == rw.scan_gxt_blocks(wad.read_bytes())
+        assert ws.pad_runs == rw.scan_pad_runs(wad.read_bytes())
+        assert ws.by_off(spans[3][0]).idx == 3 and ws.by_off(1) is None
+
+def test_index_reused_and_invalidated(wad, monkeypatch):
+    with rw.Workspace(wad) as ws:
+        expected = [(b.off, b.raw_end, b.max_end, b.num) for b in ws]
+    assert index_path(wad).exists()
+    # cache nóng: không scan lại
+    monkeypatch.setattr(rw, "scan_gxt_blocks", lambda buf: (_ for _ in ()).throw(AssertionError("scan")))
+    with rw.Workspace(wad) as ws:
+        assert [(b.off, b.raw_end, b.max_end, b.num) for b in ws] == expected
+    monkeypatch.undo()
+    # WAD đổi (size/mtime/sha1 mẫu khác): index bị bỏ, scan lại
+    data = bytearray(wad.read_bytes())
+    data[:6] = rw.SIG
+    wad.write_bytes(data)
+    st = wad.stat()
+    os.utime(wad, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    with rw.Workspace(wad) as ws:
+        assert len(ws) == len(rw.scan_gxt_blocks(bytes(data)))
+
+def test_by_name_from_toc(wad):
+    write_toc(wad)
+    with rw.Workspace(wad) as ws:
+        assert ws.toc is not None
+        name = ws.toc.name_of(ws[5].off)
+        assert ws.by_name(name) is ws[5]
+    with rw.Workspace(wad, from_toc=True, use_index=False) as ws:
+        assert [b.off for b in ws] == [b[0] for b in rw.scan_gxt_blocks(wad.read_bytes())]
+
+def test_plan_verify_write_nothing(wad, tmp_path):
+    write_toc(wad)
+    txt = tmp_path / "txt"
+    rw.export_rom_wad(str(wad), str(txt))
+    for p in tmp_path.glob("*.gxtidx.json"):
+        p.unlink()
+    set_string(txt_files(txt)[0], 0, "dài quá " * 2000)
+    before = {p: p.stat().st_mtime_ns for p in tmp_path.rglob("*")}
+    plan = rw.plan_import(str(wad), str(txt), jobs=2)
+    assert plan["over"] == 1 and plan["pad_runs"] > 0
+    assert rw.verify_roundtrip(str(wad))["mismatches"] == []
+    assert {p: p.stat().st_mtime_ns for p in tmp_path.rglob("*")} == before